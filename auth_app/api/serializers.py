@@ -1,7 +1,12 @@
 from django.contrib.auth.models import User
 
 from rest_framework import serializers
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+
+from auth_app.tokens import RevocableRefreshToken, RotatingRefreshToken
+from auth_app.authentication import user_states
 
 class RegisterSerializer(serializers.ModelSerializer):
     """
@@ -47,9 +52,17 @@ class RegisterSerializer(serializers.ModelSerializer):
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     """
     Custom JWT token serializer that extends TokenObtainPairSerializer.
-    Includes additional user information (id, username, email) in the token response.
+    Includes additional user information (id, username, email) in the token response
+    and as token claims, which the token-user mode authenticates read requests with.
     """
     
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token['username'] = user.username
+        token['email'] = user.email
+        return token
+    
     def validate(self, attrs):
         data = super().validate(attrs)
         
@@ -60,3 +73,34 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         }
         
         return data
+
+
+class CookieTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Token refresh serializer with fewer queries than simplejwt's.
+    The user state comes from the per-process cache, and with rotation the presented token is
+    blacklisted atomically instead of checked first, so a token can only be rotated once.
+    """
+    
+    def validate(self, attrs):
+        rotating = api_settings.ROTATE_REFRESH_TOKENS and api_settings.BLACKLIST_AFTER_ROTATION
+        token_class = RotatingRefreshToken if rotating else RevocableRefreshToken
+        refresh = token_class(attrs['refresh'])
+        
+        user_id = refresh.payload.get(api_settings.USER_ID_CLAIM)
+        if user_id and not user_states.is_active(user_id):
+            raise AuthenticationFailed(self.error_messages['no_active_account'], 'no_active_account')
+        
+        if rotating:
+            refresh.blacklist()
+        
+        data = {'access': str(refresh.access_token)}
+        
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            refresh.outstand()
+            data['refresh'] = str(refresh)
+        
+        return data
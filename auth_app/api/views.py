@@ -1,18 +1,21 @@
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 
+from asgiref.sync import sync_to_async
+
 from rest_framework import status
-from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
-from .serializers import RegisterSerializer, CustomTokenObtainPairSerializer
+from core.views import AsyncAPIView
+from auth_app.tokens import RevocableRefreshToken
+
+from .serializers import RegisterSerializer, CustomTokenObtainPairSerializer, CookieTokenRefreshSerializer
 
 
 @method_decorator(csrf_exempt, name='dispatch')
-class RegisterView(APIView):
+class RegisterView(AsyncAPIView):
     """
     API view for user registration.
     Allows any user to create a new account with username, email, and password.
@@ -20,17 +23,17 @@ class RegisterView(APIView):
     
     permission_classes = [AllowAny]
     
-    def post(self, request):
+    async def post(self, request):
         serializer = RegisterSerializer(data=request.data)
-        if serializer.is_valid():
-            saved_account = serializer.save()
+        if await sync_to_async(serializer.is_valid)():
+            saved_account = await sync_to_async(serializer.save)()
             data = {'detail': "User created successfully."}
             return Response(data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
 
 @method_decorator(csrf_exempt, name='dispatch')
-class CookieLoginView(TokenObtainPairView):
+class CookieLoginView(AsyncAPIView, TokenObtainPairView):
     """
     API view for user login with JWT tokens stored in HTTP-only cookies.
     Returns access and refresh tokens in secure cookies along with user data.
@@ -38,8 +41,8 @@ class CookieLoginView(TokenObtainPairView):
     
     serializer_class = CustomTokenObtainPairSerializer
 
-    def post(self, request, *args, **kwargs):
-        response = super().post(request, *args, **kwargs)
+    async def post(self, request, *args, **kwargs):
+        response = await sync_to_async(super().post)(request, *args, **kwargs)
         refresh_token = response.data.get('refresh')
         access_token = response.data.get('access')
         user_data = response.data.get('user')
@@ -66,13 +69,16 @@ class CookieLoginView(TokenObtainPairView):
     
 
 @method_decorator(csrf_exempt, name='dispatch')
-class CookieTokenRefreshView(TokenRefreshView):
+class CookieTokenRefreshView(AsyncAPIView, TokenRefreshView):
     """
     API view for refreshing JWT access tokens using refresh token from cookies.
     Validates the refresh token and issues a new access token in a secure cookie.
+    With token rotation the new refresh token replaces the old one in its cookie.
     """
     
-    def post(self, request, *args, **kwargs):
+    serializer_class = CookieTokenRefreshSerializer
+    
+    async def post(self, request, *args, **kwargs):
         refresh_token = request.COOKIES.get('refresh')
         
         if refresh_token is None:
@@ -81,11 +87,12 @@ class CookieTokenRefreshView(TokenRefreshView):
         serializer = self.get_serializer(data={'refresh': refresh_token})
         
         try:
-            serializer.is_valid(raise_exception=True)
+            await sync_to_async(serializer.is_valid)(raise_exception=True)
         except:
             return Response({'detail': 'Invalid refresh token!'}, status=status.HTTP_401_UNAUTHORIZED)
         
         access_token = serializer.validated_data.get('access')
+        rotated_refresh_token = serializer.validated_data.get('refresh')
         
         response = Response({'detail': 'Token refreshed'})
         response.set_cookie(
@@ -96,11 +103,20 @@ class CookieTokenRefreshView(TokenRefreshView):
             samesite='Lax'
         )
         
+        if rotated_refresh_token:
+            response.set_cookie(
+                key='refresh', 
+                value=rotated_refresh_token, 
+                httponly=True,
+                secure=True,
+                samesite='Lax'
+            )
+        
         return response
     
 
 @method_decorator(csrf_exempt, name='dispatch')    
-class LogoutView(APIView):
+class LogoutView(AsyncAPIView):
     """
     API view for user logout.
     Blacklists the refresh token and deletes authentication cookies for authenticated users.
@@ -108,12 +124,12 @@ class LogoutView(APIView):
     
     permission_classes = [IsAuthenticated]
 
-    def post(self, request):
+    async def post(self, request):
         try:
             refresh_token = request.COOKIES.get('refresh')
             if refresh_token:
-                token = RefreshToken(refresh_token)
-                token.blacklist()
+                token = await sync_to_async(RevocableRefreshToken)(refresh_token)
+                await sync_to_async(token.blacklist)()
         except Exception:
             pass
         
@@ -1,5 +1,13 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_save, post_delete
 
 
 class AuthAppConfig(AppConfig):
     name = 'auth_app'
+
+    def ready(self):
+        from django.contrib.auth.models import User
+        from .authentication import invalidate_user_state
+
+        post_save.connect(invalidate_user_state, sender=User)
+        post_delete.connect(invalidate_user_state, sender=User)
@@ -0,0 +1,100 @@
+from django.conf import settings
+from django.utils.functional import cached_property
+from django.contrib.auth.models import User
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.exceptions import InvalidToken, AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+import time
+import threading
+
+
+class ClaimsUser(TokenUser):
+    """User built from the claims of an access token (id, username, email) without a database row."""
+
+    @cached_property
+    def id(self):
+        return User._meta.pk.to_python(self.token[api_settings.USER_ID_CLAIM])
+
+    @cached_property
+    def email(self) -> str:
+        return self.token.get('email', '')
+
+
+class UserStateCache:
+    """
+    Per-process cache of whether a user may still authenticate (exists and is active).
+    Entries expire after JWT_USER_STATE_CACHE_TTL seconds and are dropped when the user is
+    saved or deleted in this process, so a deactivation takes effect within the TTL everywhere.
+    """
+
+    max_entries = 10000
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = {}
+
+    def is_active(self, user_id) -> bool:
+        user_id = User._meta.pk.to_python(user_id)
+        now = time.monotonic()
+
+        with self.lock:
+            entry = self.entries.get(user_id)
+        if entry and entry[1] > now:
+            return entry[0]
+
+        active = User.objects.filter(pk=user_id, is_active=True).exists()
+
+        with self.lock:
+            if len(self.entries) >= self.max_entries:
+                self.entries = {key: value for key, value in self.entries.items() if value[1] > now}
+            self.entries[user_id] = (active, now + settings.JWT_USER_STATE_CACHE_TTL)
+
+        return active
+
+    def invalidate(self, user_id) -> None:
+        with self.lock:
+            self.entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+
+
+user_states = UserStateCache()
+
+
+def invalidate_user_state(sender, instance, **kwargs):
+    """post_save/post_delete receiver for User that drops the cached state of the user."""
+
+    user_states.invalidate(instance.pk)
+
+
+class CookieJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication with an optional token-user mode.
+    With JWT_TOKEN_USER_READS enabled, read-only requests (GET, HEAD, OPTIONS) are authenticated as a
+    ClaimsUser built from the token claims instead of loading the User row; only the cached user state
+    is checked. Writes always load the full user from the database.
+    """
+
+    def get_user(self, validated_token):
+        if not settings.JWT_TOKEN_USER_READS or self.request_method not in SAFE_METHODS:
+            return super().get_user(validated_token)
+
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        user = ClaimsUser(validated_token)
+        if not user_states.is_active(user.id):
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        return user
+
+    def authenticate(self, request):
+        self.request_method = request.method
+        return super().authenticate(request)
@@ -0,0 +1,43 @@
+from django.conf import settings
+from django.db import close_old_connections
+from django.core.management.base import BaseCommand
+
+import time
+import logging
+
+from auth_app.tokens import prune_expired_tokens
+
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Management command that deletes expired outstanding refresh tokens and their blacklist entries.
+    Run it from cron, or once per deployment with --loop as a long-running scheduled task.
+    """
+
+    help = 'Delete expired outstanding and blacklisted refresh tokens in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Tokens deleted per batch')
+        parser.add_argument('--loop', action='store_true', help='Keep running and prune every --interval seconds')
+        parser.add_argument('--interval', type=float, default=settings.JWT_TOKEN_PRUNE_INTERVAL, help='Seconds between prunes with --loop')
+
+    def handle(self, *args, **options):
+        if not options['loop']:
+            deleted = prune_expired_tokens(options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired tokens."))
+            return
+
+        try:
+            while True:
+                close_old_connections()
+                try:
+                    deleted = prune_expired_tokens(options['batch_size'])
+                    logger.info(f"Deleted {deleted} expired tokens")
+                except Exception as e:
+                    logger.warning(f"Failed to prune expired tokens: {str(e)}")
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write("Token pruning stopped.")
@@ -1,12 +1,32 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+
 class JWTAuthCookieMiddleware:
-    """Middleware to extract JWT access token from cookies and set it in the Authorization header."""
-    
+    """
+    Middleware to extract JWT access token from cookies and set it in the Authorization header.
+    Works in both sync (WSGI) and async (ASGI) request handling.
+    """
+
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
 
     def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        self.set_authorization_header(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        self.set_authorization_header(request)
+        return await self.get_response(request)
+
+    def set_authorization_header(self, request):
         access_token = request.COOKIES.get("access")
         if access_token:
             request.META["HTTP_AUTHORIZATION"] = f"Bearer {access_token}"
-        return self.get_response(request)
-    
\ No newline at end of file
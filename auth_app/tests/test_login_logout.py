@@ -190,4 +190,23 @@ class RefreshTokenTests(APITestCase):
         
         self.assertEqual(refresh_response.status_code, status.HTTP_401_UNAUTHORIZED)
         self.assertEqual(refresh_response.data['detail'], 'Invalid refresh token!')
-        
\ No newline at end of file
+            
+    async def test_login_refresh_logout_async(self):
+        """Test the cookie flow through the ASGI request handler (async views and middleware)"""
+        
+        login_data = {
+            'username': 'testuser',
+            'password': 'testpassword123'
+        }
+        login_response = await self.async_client.post(reverse('login'), login_data, content_type='application/json')
+        self.assertEqual(login_response.status_code, status.HTTP_200_OK)
+        self.assertIn('access', self.async_client.cookies)
+        
+        refresh_response = await self.async_client.post(reverse('token_refresh'))
+        self.assertEqual(refresh_response.status_code, status.HTTP_200_OK)
+        
+        logout_response = await self.async_client.post(reverse('logout'))
+        self.assertEqual(logout_response.status_code, status.HTTP_200_OK)
+        
+        refresh_response = await self.async_client.post(reverse('token_refresh'))
+        self.assertEqual(refresh_response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,60 @@
+from django.urls import reverse
+from django.contrib.auth.models import User
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from core.testing import QueryBudgetTestMixin
+
+
+class AuthQueryBudgetTests(QueryBudgetTestMixin, APITestCase):
+    """Query count and latency budgets of the authentication endpoints"""
+    
+    def setUp(self):
+        """Create a test user"""
+        
+        self.user = User.objects.create_user(username='testuser', email='testuser@example.com', password='testpassword123')
+    
+    def login(self):
+        response = self.client.post(reverse('login'), {'username': 'testuser', 'password': 'testpassword123'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response
+    
+    def test_register_budget(self):
+        """Test that registration stays within the budget"""
+        
+        data = {
+            'username': 'newuser',
+            'email': 'newuser@example.com',
+            'password': 'newpassword123',
+            'confirmed_password': 'newpassword123'
+        }
+        response = self.client.post(reverse('register'), data, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertWithinBudget(response)
+    
+    def test_login_budget(self):
+        """Test that login stays within the budget"""
+        
+        self.assertWithinBudget(self.login())
+    
+    def test_token_refresh_budget(self):
+        """Test that refreshing (and rotating) the token stays within the budget"""
+        
+        self.login()
+        
+        response = self.client.post(reverse('token_refresh'))
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertWithinBudget(response)
+    
+    def test_logout_budget(self):
+        """Test that logout with blacklisting stays within the budget"""
+        
+        self.login()
+        
+        response = self.client.post(reverse('logout'))
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertWithinBudget(response)
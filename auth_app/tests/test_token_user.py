@@ -0,0 +1,99 @@
+from django.urls import reverse
+from django.test import override_settings
+from django.contrib.auth.models import User
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from auth_app.authentication import user_states
+from quizzes_app.models import Quiz, QuizGenerationJob
+
+
+@override_settings(JWT_TOKEN_USER_READS=True)
+class TokenUserModeTests(APITestCase):
+    """
+    Test cases for the token-user mode.
+    Read-only requests are authenticated from the token claims and the cached user state.
+    """
+    
+    def setUp(self):
+        """Create a user, log in and reset the user state cache"""
+        
+        user_states.clear()
+        self.user = User.objects.create_user(username='testuser', email='testuser@example.com', password='testpassword123')
+        self.client.post(reverse('login'), {'username': 'testuser', 'password': 'testpassword123'}, format='json')
+        
+    def test_token_contains_user_claims(self):
+        """Test that login issues access tokens with username and email claims"""
+        
+        token = AccessToken(self.client.cookies['access'].value)
+        
+        self.assertEqual(token['user_id'], str(self.user.id))
+        self.assertEqual(token['username'], 'testuser')
+        self.assertEqual(token['email'], 'testuser@example.com')
+        
+    def test_read_skips_user_lookup(self):
+        """Test that reads only check the user state once per TTL instead of loading the user"""
+        
+        url = reverse('quizzes')
+        
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+    def test_read_own_quiz(self):
+        """Test that ownership checks work with the claims user"""
+        
+        quiz = Quiz.objects.create(user=self.user, title='Quiz', video_url='https://www.youtube.com/watch?v=dQw4w9WgXcQ')
+        
+        response = self.client.get(reverse('quiz-detail', kwargs={'pk': quiz.pk}))
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['id'], quiz.pk)
+        
+    def test_deactivated_user_rejected(self):
+        """Test that deactivating a user drops the cached state and rejects the next read"""
+        
+        url = reverse('quizzes')
+        self.client.get(url)
+        
+        self.user.is_active = False
+        self.user.save()
+        
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        
+    def test_string_user_id_claim_rejected_after_deactivation(self):
+        """Test that a state cached under the string user_id claim is dropped when the user is deactivated"""
+        
+        token = AccessToken(self.client.cookies['access'].value)
+        self.assertTrue(user_states.is_active(token['user_id']))
+        
+        self.user.is_active = False
+        self.user.save()
+        
+        self.assertFalse(user_states.is_active(token['user_id']))
+        response = self.client.get(reverse('quizzes'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        
+    def test_writes_load_user(self):
+        """Test that writes still authenticate with the user from the database"""
+        
+        response = self.client.post(reverse('quizzes'), {'url': 'https://www.youtube.com/watch?v=dQw4w9WgXcQ'}, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(QuizGenerationJob.objects.get().user, self.user)
+        
+    @override_settings(JWT_TOKEN_USER_READS=False)
+    def test_disabled_loads_user(self):
+        """Test that reads load the user from the database when the mode is off"""
+        
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('quizzes'))
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -0,0 +1,131 @@
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.urls import reverse
+from django.utils import timezone
+from django.core.management import call_command
+from django.contrib.auth.models import User
+
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+from rest_framework_simplejwt.state import token_backend
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken, BlacklistedToken
+
+from core.testing import QueryBudgetTestMixin
+from auth_app.tokens import RotatingRefreshToken, revoked_tokens, prune_expired_tokens
+
+
+class RefreshRotationTests(QueryBudgetTestMixin, APITestCase):
+    """
+    Test cases for refresh token rotation.
+    The presented token is blacklisted atomically and revoked tokens are remembered per process.
+    """
+    
+    def setUp(self):
+        """Create a test user, log in and reset the revocation cache"""
+        
+        revoked_tokens.clear()
+        self.user = User.objects.create_user(username='testuser', email='testuser@example.com', password='testpassword123')
+        login_response = self.client.post(reverse('login'), {'username': 'testuser', 'password': 'testpassword123'}, format='json')
+        self.refresh_token = login_response.cookies['refresh'].value
+        
+    def refresh(self, refresh_token):
+        client = APIClient()
+        client.cookies['refresh'] = refresh_token
+        return client.post(reverse('token_refresh'))
+        
+    def test_refresh_rotates_cookie(self):
+        """Test that a refresh replaces the refresh cookie and the new token can be refreshed again"""
+        
+        response = self.refresh(self.refresh_token)
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertWithinBudget(response)
+        rotated_token = response.cookies['refresh'].value
+        self.assertNotEqual(rotated_token, self.refresh_token)
+        self.assertTrue(BlacklistedToken.objects.filter(token__jti=token_backend.decode(self.refresh_token)['jti']).exists())
+        
+        self.assertEqual(self.refresh(rotated_token).status_code, status.HTTP_200_OK)
+        
+    def test_reused_token_rejected(self):
+        """Test that a rotated token cannot be used again and later replays need no query"""
+        
+        self.refresh(self.refresh_token)
+        revoked_tokens.clear()
+        
+        response = self.refresh(self.refresh_token)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        
+        with self.assertNumQueries(0):
+            response = self.refresh(self.refresh_token)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        
+    def test_concurrent_rotation_only_once(self):
+        """Test that two uses of the same token that both passed verification rotate it only once"""
+        
+        first = RotatingRefreshToken(self.refresh_token)
+        second = RotatingRefreshToken(self.refresh_token)
+        
+        first.blacklist()
+        with self.assertRaises(TokenError):
+            second.blacklist()
+        
+    def test_inactive_user_cannot_refresh(self):
+        """Test that refresh tokens of deactivated users are rejected"""
+        
+        self.user.is_active = False
+        self.user.save()
+        
+        response = self.refresh(self.refresh_token)
+        
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class TokenPruningTests(APITestCase):
+    """Test cases for pruning expired outstanding and blacklisted tokens"""
+    
+    def setUp(self):
+        """Create expired and valid outstanding tokens, some of them blacklisted"""
+        
+        user = User.objects.create_user(username='testuser', password='testpassword123')
+        now = timezone.now()
+        
+        for i in range(3):
+            token = OutstandingToken.objects.create(user=user, jti=f'expired{i}', token='x', expires_at=now - timedelta(minutes=1))
+            BlacklistedToken.objects.create(token=token)
+        self.valid = OutstandingToken.objects.create(user=user, jti='valid', token='x', expires_at=now + timedelta(days=1))
+        BlacklistedToken.objects.create(token=self.valid)
+        
+    def test_prune_expired_tokens(self):
+        """Test that only expired tokens are deleted, in batches"""
+        
+        self.assertEqual(prune_expired_tokens(batch_size=2), 3)
+        
+        self.assertEqual(list(OutstandingToken.objects.values_list('jti', flat=True)), ['valid'])
+        self.assertEqual(BlacklistedToken.objects.get().token, self.valid)
+        
+    def test_prune_tokens_command(self):
+        """Test the prune_tokens management command"""
+        
+        out = StringIO()
+        call_command('prune_tokens', stdout=out)
+        
+        self.assertIn('Deleted 3 expired tokens.', out.getvalue())
+        self.assertEqual(OutstandingToken.objects.count(), 1)
+        
+    @patch('auth_app.management.commands.prune_tokens.close_old_connections')
+    @patch('auth_app.management.commands.prune_tokens.time.sleep', side_effect=[None, KeyboardInterrupt])
+    
+    def test_prune_tokens_command_loop(self, mock_sleep, mock_close):
+        """Test that the prune_tokens command prunes every interval with --loop until interrupted"""
+        
+        out = StringIO()
+        with patch('auth_app.management.commands.prune_tokens.prune_expired_tokens', wraps=prune_expired_tokens) as mock_prune:
+            call_command('prune_tokens', '--loop', '--interval', '60', stdout=out)
+        
+        self.assertEqual(mock_prune.call_count, 2)
+        mock_sleep.assert_called_with(60.0)
+        self.assertIn('Token pruning stopped.', out.getvalue())
+        self.assertEqual(OutstandingToken.objects.count(), 1)
@@ -0,0 +1,125 @@
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import aware_utcnow, datetime_from_epoch
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken, BlacklistedToken
+
+import time
+import logging
+import threading
+
+
+logger = logging.getLogger(__name__)
+
+
+class RevocationCache:
+    """
+    Per-process set of revoked refresh token IDs (jti), each kept until the token expires.
+    Replays of revoked tokens are rejected without a database query. Only revocations are cached:
+    a token missing from the cache is still checked against the blacklist (or blacklisted atomically).
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.entries = {}
+
+    def add(self, jti: str, expires_at: float) -> None:
+        with self.lock:
+            if len(self.entries) >= self.max_entries:
+                now = time.time()
+                self.entries = {key: exp for key, exp in self.entries.items() if exp > now}
+                if len(self.entries) >= self.max_entries:
+                    self.entries.pop(min(self.entries, key=self.entries.get))
+            self.entries[jti] = expires_at
+
+    def contains(self, jti: str) -> bool:
+        with self.lock:
+            expires_at = self.entries.get(jti)
+        return expires_at is not None and expires_at > time.time()
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+
+
+revoked_tokens = RevocationCache(settings.JWT_REVOCATION_CACHE_SIZE)
+
+
+class RevocableRefreshToken(RefreshToken):
+    """
+    RefreshToken that checks the per-process revocation cache before the blacklist table
+    and does not load the user to blacklist or register itself.
+    With blacklisted_on_use, the blacklist query is skipped on verification: the token is blacklisted
+    when it is used, and a token that was already blacklisted fails at that point. The unique
+    constraint of the blacklist makes this safe against two concurrent uses of the same token.
+    """
+
+    blacklisted_on_use = False
+
+    def check_blacklist(self) -> None:
+        if revoked_tokens.contains(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
+
+        if not self.blacklisted_on_use:
+            super().check_blacklist()
+
+    def blacklist(self):
+        jti = self.payload[api_settings.JTI_CLAIM]
+
+        try:
+            token = OutstandingToken.objects.get(jti=jti)
+        except OutstandingToken.DoesNotExist:
+            token = self.outstand()[0]
+
+        blacklisted, created = BlacklistedToken.objects.get_or_create(token=token)
+        revoked_tokens.add(jti, self.payload['exp'])
+
+        if not created and self.blacklisted_on_use:
+            raise TokenError(_("Token is blacklisted"))
+
+        return blacklisted, created
+
+    def outstand(self):
+        return OutstandingToken.objects.get_or_create(
+            jti=self.payload[api_settings.JTI_CLAIM],
+            defaults={
+                'user_id': self.payload.get(api_settings.USER_ID_CLAIM),
+                'created_at': self.current_time,
+                'token': str(self),
+                'expires_at': datetime_from_epoch(self.payload['exp']),
+            },
+        )
+
+
+class RotatingRefreshToken(RevocableRefreshToken):
+    """Refresh token presented for rotation: it is blacklisted as part of its use."""
+
+    blacklisted_on_use = True
+
+
+def prune_expired_tokens(batch_size: int = 1000) -> int:
+    """
+    Delete expired outstanding tokens (and with them their blacklist entries) in batches
+    so that the tables stay small and no single delete locks them for long.
+    Returns the number of deleted outstanding tokens.
+    """
+
+    deleted = 0
+    now = aware_utcnow()
+
+    while True:
+        ids = list(OutstandingToken.objects.filter(expires_at__lte=now).values_list('id', flat=True)[:batch_size])
+        if not ids:
+            break
+        BlacklistedToken.objects.filter(token_id__in=ids).delete()
+        OutstandingToken.objects.filter(id__in=ids).delete()
+        deleted += len(ids)
+
+    if deleted:
+        logger.info(f"Pruned {deleted} expired refresh tokens")
+
+    return deleted
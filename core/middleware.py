@@ -0,0 +1,128 @@
+from django.conf import settings
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+import time
+import logging
+import contextvars
+
+
+logger = logging.getLogger(__name__)
+
+current_stats = contextvars.ContextVar('query_stats', default=None)
+
+
+class QueryStats:
+    """SQL queries and timings recorded for one request."""
+
+    def __init__(self):
+        self.queries = []
+        self.url_name = None
+        self.wall_time = 0.0
+
+    @property
+    def count(self) -> int:
+        return len(self.queries)
+
+    @property
+    def db_time(self) -> float:
+        return sum(duration for _, duration in self.queries)
+
+
+def record_query(execute, sql, params, many, context):
+    """Database execute wrapper that adds each query to the stats of the current request."""
+
+    stats = current_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries.append((sql, time.perf_counter() - start))
+
+
+def install_query_recorder(sender=None, connection=None, **kwargs):
+    """
+    connection_created receiver that installs record_query on every new database connection.
+    It is inserted first so that connection.execute_wrapper() blocks, which pop the last wrapper, keep working.
+    """
+
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
+
+
+def budget_violations(stats: QueryStats, budget: dict) -> list[str]:
+    """Return a description of every limit of the budget ({'queries': n, 'ms': t}) that the request exceeded."""
+
+    violations = []
+
+    if 'queries' in budget and stats.count > budget['queries']:
+        violations.append(f"{stats.count} queries (budget {budget['queries']})")
+    if 'ms' in budget and stats.wall_time * 1000 > budget['ms']:
+        violations.append(f"{stats.wall_time * 1000:.1f} ms (budget {budget['ms']} ms)")
+
+    return violations
+
+
+class QueryBudgetMiddleware:
+    """
+    Middleware that records the SQL query count, database time and wall time of every request.
+    The stats are attached to the response as response.query_stats (used by the budget assertions
+    in core.testing) and, in debug mode, sent as X-DB-Queries, X-DB-Time and X-Response-Time headers.
+    Requests exceeding their budget in settings.QUERY_BUDGETS are logged as warnings.
+    Queries of streaming responses that run after the response was returned are not counted.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        stats = QueryStats()
+        token = current_stats.set(stats)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_stats.reset(token)
+
+        return self.finish(request, response, stats, start)
+
+    async def __acall__(self, request):
+        stats = QueryStats()
+        token = current_stats.set(stats)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_stats.reset(token)
+
+        return self.finish(request, response, stats, start)
+
+    def finish(self, request, response, stats, start):
+        stats.wall_time = time.perf_counter() - start
+        resolver_match = getattr(request, 'resolver_match', None)
+        stats.url_name = resolver_match.url_name if resolver_match else None
+        response.query_stats = stats
+
+        if settings.DEBUG:
+            response['X-DB-Queries'] = str(stats.count)
+            response['X-DB-Time'] = f"{stats.db_time * 1000:.3f}"
+            response['X-Response-Time'] = f"{stats.wall_time * 1000:.3f}"
+
+        budget = settings.QUERY_BUDGETS.get(stats.url_name)
+        if budget:
+            violations = budget_violations(stats, budget)
+            if violations:
+                logger.warning(f"{request.method} {request.path} ({stats.url_name}) exceeded its budget: {', '.join(violations)}")
+
+        return response
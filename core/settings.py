@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
 import os
+import tempfile
 from pathlib import Path
 from datetime import timedelta
 from dotenv import load_dotenv
@@ -47,11 +48,13 @@ INSTALLED_APPS = [
     'rest_framework',
     'rest_framework_simplejwt',
     'rest_framework_simplejwt.token_blacklist',
+    'core',
     'auth_app',
     'quizzes_app',
 ]
 
 MIDDLEWARE = [
+    'core.middleware.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -114,6 +117,11 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Transactions take the write lock when they begin, so a check and the write it guards
+        # (e.g. quiz job admission) cannot interleave with another process
+        'OPTIONS': {
+            'transaction_mode': 'IMMEDIATE',
+        },
     }
 }
 
@@ -156,7 +164,7 @@ STATIC_URL = 'static/'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'auth_app.authentication.CookieJWTAuthentication',
     ),
 }
 
@@ -167,6 +175,17 @@ SIMPLE_JWT = {
     'BLACKLIST_AFTER_ROTATION': True,
 }
 
+# Token-user mode: authenticate read-only requests from the access token claims (id, username, email)
+# instead of loading the user from the database. Whether the user still exists and is active is cached
+# per process for JWT_USER_STATE_CACHE_TTL seconds, so deactivated users are locked out within the TTL.
+JWT_TOKEN_USER_READS = os.environ.get('JWT_TOKEN_USER_READS', 'False').lower() in ('true', '1', 'yes')
+JWT_USER_STATE_CACHE_TTL = int(os.environ.get('JWT_USER_STATE_CACHE_TTL', 30))
+# Revoked refresh tokens remembered per process (until they expire) to reject replays without a query
+JWT_REVOCATION_CACHE_SIZE = int(os.environ.get('JWT_REVOCATION_CACHE_SIZE', 100000))
+# `python manage.py prune_tokens --loop` deletes expired outstanding/blacklisted tokens every
+# JWT_TOKEN_PRUNE_INTERVAL seconds; run it as one service per deployment (or prune from cron without --loop)
+JWT_TOKEN_PRUNE_INTERVAL = int(os.environ.get('JWT_TOKEN_PRUNE_INTERVAL', 3600))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/6.0/ref/settings/#default-auto-field
 
@@ -184,9 +203,143 @@ GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY')
 if not GEMINI_API_KEY:
     raise ValueError("GEMINI_API_KEY environment variable is not set. Please add it to your .env file.")
 
+GEMINI_MODEL = os.environ.get('GEMINI_MODEL', 'gemini-2.5-flash')
+# Optional: point the client at another endpoint (e.g. a proxy or a local fake server in tests)
+GEMINI_BASE_URL = os.environ.get('GEMINI_BASE_URL') or None
+# Per-call timeout in seconds and maximum number of concurrent calls per process
+GEMINI_TIMEOUT = float(os.environ.get('GEMINI_TIMEOUT', 120))
+GEMINI_MAX_CONCURRENCY = int(os.environ.get('GEMINI_MAX_CONCURRENCY', 4))
+# Retries for rate limits (429), server errors (5xx) and network errors, with exponential backoff and jitter
+GEMINI_MAX_ATTEMPTS = int(os.environ.get('GEMINI_MAX_ATTEMPTS', 4))
+GEMINI_BACKOFF_BASE = float(os.environ.get('GEMINI_BACKOFF_BASE', 1))
+GEMINI_BACKOFF_MAX = float(os.environ.get('GEMINI_BACKOFF_MAX', 30))
+# Ask Gemini for JSON that follows the quiz schema (structured output) instead of relying on the prompt alone
+GEMINI_STRUCTURED_OUTPUT = os.environ.get('GEMINI_STRUCTURED_OUTPUT', 'True').lower() in ('true', '1', 'yes')
+
+# Transcript compaction
+# Transcripts are stripped of filler sounds and repeated sentences before they go into the quiz prompt.
+# Above QUIZ_TRANSCRIPT_TOKEN_BUDGET tokens they are summarized in chunks of QUIZ_SUMMARY_CHUNK_TOKENS
+# (in parallel, up to QUIZ_SUMMARY_MAX_ROUNDS times) and the quiz is generated from the summaries.
+QUIZ_TRANSCRIPT_TOKEN_BUDGET = int(os.environ.get('QUIZ_TRANSCRIPT_TOKEN_BUDGET', 12000))
+QUIZ_SUMMARY_CHUNK_TOKENS = int(os.environ.get('QUIZ_SUMMARY_CHUNK_TOKENS', 4000))
+QUIZ_SUMMARY_MAX_ROUNDS = int(os.environ.get('QUIZ_SUMMARY_MAX_ROUNDS', 2))
+TIKTOKEN_ENCODING = os.environ.get('TIKTOKEN_ENCODING', 'cl100k_base')
+# Directory with the downloaded tiktoken encoding; seed it with `python manage.py preload_tiktoken_encoding`
+# at deploy time so no worker downloads it at runtime.
+TIKTOKEN_CACHE_DIR = os.environ.get('TIKTOKEN_CACHE_DIR', str(BASE_DIR / 'tiktoken_cache'))
+
 # FFmpeg configuration
 # Optional: Set custom FFmpeg path via environment variable if not in system PATH
 # Example: FFMPEG_PATH=/usr/local/bin/ffmpeg or C:\ffmpeg\bin
 FFMPEG_PATH = os.environ.get('FFMPEG_PATH', None)
 
-# Note: For production, configure webserver timeout (Gunicorn/uWSGI) to 300s+ for long video processing
+# Whisper configuration
+# WHISPER_MODEL is used for transcription; WHISPER_MODELS lists all sizes kept resident per process.
+# Models are loaded once per process and evicted least recently used first above the memory cap.
+WHISPER_MODEL = os.environ.get('WHISPER_MODEL', 'base')
+WHISPER_MODELS = [name.strip() for name in os.environ.get('WHISPER_MODELS', WHISPER_MODEL).split(',') if name.strip()]
+WHISPER_MODEL_CACHE_MAX_BYTES = int(os.environ.get('WHISPER_MODEL_CACHE_MAX_BYTES', 2 * 1024 ** 3))
+# Load WHISPER_MODELS when Django starts (quiz workers always warm up on start)
+WHISPER_PRELOAD = os.environ.get('WHISPER_PRELOAD', 'False').lower() in ('true', '1', 'yes')
+# Chunked transcription: audio longer than WHISPER_CHUNK_MIN_DURATION seconds is split on silence
+# into overlapping chunks that are transcribed in parallel by up to WHISPER_CHUNK_WORKERS processes, which share
+# the cores of the transcription slot (see TRANSCRIPTION_TORCH_THREADS)
+WHISPER_CHUNKED = os.environ.get('WHISPER_CHUNKED', 'False').lower() in ('true', '1', 'yes')
+WHISPER_CHUNK_MIN_DURATION = int(os.environ.get('WHISPER_CHUNK_MIN_DURATION', 600))
+WHISPER_CHUNK_SECONDS = int(os.environ.get('WHISPER_CHUNK_SECONDS', 120))
+WHISPER_CHUNK_OVERLAP_SECONDS = float(os.environ.get('WHISPER_CHUNK_OVERLAP_SECONDS', 2))
+WHISPER_CHUNK_WORKERS = int(os.environ.get('WHISPER_CHUNK_WORKERS', 4))
+
+# Transcription backends
+# Tried in order until one returns a transcript: 'youtube-captions' (YouTube's own captions via yt-dlp,
+# no audio download), 'faster-whisper' (quantized Whisper on CTranslate2, needs `pip install faster-whisper`)
+# and 'whisper' (openai-whisper on torch). Transcripts are cached per backend and model.
+TRANSCRIPTION_BACKENDS = [name.strip() for name in os.environ.get('TRANSCRIPTION_BACKENDS', 'whisper').split(',') if name.strip()]
+# Caption languages in order of preference; automatic captions are used if no uploaded subtitles exist
+TRANSCRIPTION_CAPTION_LANGUAGES = [lang.strip() for lang in os.environ.get('TRANSCRIPTION_CAPTION_LANGUAGES', 'en').split(',') if lang.strip()]
+TRANSCRIPTION_AUTO_CAPTIONS = os.environ.get('TRANSCRIPTION_AUTO_CAPTIONS', 'True').lower() in ('true', '1', 'yes')
+# faster-whisper model size, weight quantization (int8, int8_float32, float32) and CPU threads
+# (0 = the cores of one transcription slot, see TRANSCRIPTION_TORCH_THREADS)
+FASTER_WHISPER_MODEL = os.environ.get('FASTER_WHISPER_MODEL', WHISPER_MODEL)
+FASTER_WHISPER_COMPUTE_TYPE = os.environ.get('FASTER_WHISPER_COMPUTE_TYPE', 'int8')
+FASTER_WHISPER_CPU_THREADS = int(os.environ.get('FASTER_WHISPER_CPU_THREADS', 0))
+
+# Transcription scheduler
+# At most TRANSCRIPTION_MAX_CONCURRENCY transcriptions run at once on this node (across all worker and web
+# processes, coordinated with lock files in TRANSCRIPTION_LOCK_DIR); the others wait for a slot. Each runs
+# with TRANSCRIPTION_TORCH_THREADS torch threads (0 = the CPU cores divided by TRANSCRIPTION_MAX_CONCURRENCY).
+TRANSCRIPTION_MAX_CONCURRENCY = max(1, int(os.environ.get('TRANSCRIPTION_MAX_CONCURRENCY', 1)))
+TRANSCRIPTION_TORCH_THREADS = int(os.environ.get('TRANSCRIPTION_TORCH_THREADS', 0))
+TRANSCRIPTION_LOCK_DIR = os.environ.get('TRANSCRIPTION_LOCK_DIR', os.path.join(tempfile.gettempdir(), 'quizly-transcription-slots'))
+
+# Audio extraction
+# Stream audio from yt-dlp through ffmpeg into memory instead of downloading a temporary file
+AUDIO_STREAMING = os.environ.get('AUDIO_STREAMING', 'False').lower() in ('true', '1', 'yes')
+# Downloaded audio is kept in a content-addressed cache (by video ID and format) of at most AUDIO_CACHE_MAX_BYTES
+# bytes; the least recently used files are evicted first. 0 disables the cache and temporary files are deleted.
+AUDIO_CACHE_MAX_BYTES = int(os.environ.get('AUDIO_CACHE_MAX_BYTES', 0))
+AUDIO_CACHE_DIR = os.environ.get('AUDIO_CACHE_DIR', str(MEDIA_ROOT / 'audio_cache'))
+# Partial downloads older than this (seconds) were left behind by a crashed worker and are deleted
+AUDIO_CACHE_PARTIAL_MAX_AGE = int(os.environ.get('AUDIO_CACHE_PARTIAL_MAX_AGE', 3600))
+
+# Quiz generation jobs
+# POST /api/quizzes/ only queues a job; `python manage.py run_quiz_workers` runs the pipeline
+# in a pool of local worker processes, so web workers never wait for downloads or transcription.
+QUIZ_JOB_WORKERS = int(os.environ.get('QUIZ_JOB_WORKERS', 2))
+QUIZ_JOB_POLL_INTERVAL = float(os.environ.get('QUIZ_JOB_POLL_INTERVAL', 1.0))
+# Running jobs older than this (seconds) are considered orphaned by a crashed worker and requeued
+QUIZ_JOB_STALE_AFTER = int(os.environ.get('QUIZ_JOB_STALE_AFTER', 3600))
+# Upper limit (seconds) for long polling a job with GET /api/quizzes/jobs/<id>/?wait=<seconds>
+QUIZ_JOB_MAX_WAIT = float(os.environ.get('QUIZ_JOB_MAX_WAIT', 30))
+# Upper limit (seconds) for relaying a job with POST /api/quizzes/stream/; the client then polls the job
+QUIZ_STREAM_MAX_DURATION = float(os.environ.get('QUIZ_STREAM_MAX_DURATION', 600))
+# Pending jobs workers choose from; users take turns within this window
+QUIZ_JOB_CLAIM_WINDOW = int(os.environ.get('QUIZ_JOB_CLAIM_WINDOW', 50))
+# Back-pressure: new quizzes are rejected with 429 and Retry-After (seconds) while this many jobs are
+# pending in total or for the requesting user
+QUIZ_QUEUE_MAX_PENDING = int(os.environ.get('QUIZ_QUEUE_MAX_PENDING', 50))
+QUIZ_QUEUE_MAX_PENDING_PER_USER = int(os.environ.get('QUIZ_QUEUE_MAX_PENDING_PER_USER', 3))
+QUIZ_QUEUE_RETRY_AFTER = int(os.environ.get('QUIZ_QUEUE_RETRY_AFTER', 30))
+# Per-user rate limit of quiz creation (POST /api/quizzes/ and /api/quizzes/stream/): a token bucket of
+# QUIZ_RATE_LIMIT_BURST quizzes that refills one quiz every QUIZ_RATE_LIMIT_REFILL_SECONDS, and at most
+# QUIZ_DAILY_QUOTA quizzes per day (0 = no quota). Counters live in sharded JSON files in QUIZ_RATE_LIMIT_LOCK_DIR,
+# updated under a flock, so the limits are shared by all processes of this node.
+QUIZ_RATE_LIMIT = os.environ.get('QUIZ_RATE_LIMIT', 'False').lower() in ('true', '1', 'yes')
+QUIZ_RATE_LIMIT_BURST = int(os.environ.get('QUIZ_RATE_LIMIT_BURST', 5))
+QUIZ_RATE_LIMIT_REFILL_SECONDS = float(os.environ.get('QUIZ_RATE_LIMIT_REFILL_SECONDS', 60))
+QUIZ_DAILY_QUOTA = int(os.environ.get('QUIZ_DAILY_QUOTA', 50))
+QUIZ_RATE_LIMIT_LOCK_DIR = os.environ.get('QUIZ_RATE_LIMIT_LOCK_DIR', os.path.join(tempfile.gettempdir(), 'quizly-throttle-locks'))
+# Single-flight: concurrent requests for the same video share one pipeline run. The run's lease
+# (seconds) is renewed while it works; a run whose lease expired is taken over by the next request.
+QUIZ_SINGLE_FLIGHT_LEASE = int(os.environ.get('QUIZ_SINGLE_FLIGHT_LEASE', 60))
+QUIZ_SINGLE_FLIGHT_POLL_INTERVAL = float(os.environ.get('QUIZ_SINGLE_FLIGHT_POLL_INTERVAL', 1.0))
+# Gemini calls per quiz when the response is not a valid quiz; the transcript stages are not repeated.
+# Valid questions are kept and only the missing or invalid ones are asked for again.
+QUIZ_GENERATION_ATTEMPTS = int(os.environ.get('QUIZ_GENERATION_ATTEMPTS', 2))
+
+# Metrics
+# Per-stage pipeline timings in the Prometheus text format, kept per process. Web processes serve them at
+# GET /api/internal/metrics/ to clients sending "Authorization: Bearer <METRICS_TOKEN>" (closed while unset);
+# quiz workers started with a metrics port serve them on 127.0.0.1:QUIZ_JOB_METRICS_PORT + worker index.
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+QUIZ_JOB_METRICS_PORT = int(os.environ['QUIZ_JOB_METRICS_PORT']) if os.environ.get('QUIZ_JOB_METRICS_PORT') else None
+
+# Query budgets
+# Maximum number of SQL queries and wall time (ms) per request, by URL name. core.middleware.QueryBudgetMiddleware
+# logs requests over budget, and the API tests fail when an endpoint exceeds its budget (see core/testing.py).
+# The budgets are the measured query counts of the most expensive regular path of each route. A long poll of a
+# job (?wait=<seconds>) adds one status query per QUIZ_JOB_POLL_INTERVAL while the job is still running.
+QUERY_BUDGETS = {
+    # auth_app
+    'register': {'queries': 3, 'ms': 2000},
+    'login': {'queries': 2, 'ms': 2000},
+    'logout': {'queries': 8, 'ms': 500},
+    'token_refresh': {'queries': 10, 'ms': 500},
+    # quizzes_app
+    'quizzes': {'queries': 5, 'ms': 500},
+    'quiz-stream': {'queries': 5, 'ms': 500},
+    'quiz-detail': {'queries': 6, 'ms': 500},
+    'quiz-job-detail': {'queries': 4, 'ms': 500},
+    'quiz-job-retry': {'queries': 3, 'ms': 500},
+    'metrics': {'queries': 0, 'ms': 500},
+}
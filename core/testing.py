@@ -0,0 +1,41 @@
+from django.conf import settings
+from django.urls import get_resolver
+
+from .middleware import budget_violations
+
+
+def url_names(urlconf=None) -> set[str]:
+    """Return the names of all URL patterns of the project (or of one URLconf module)."""
+
+    names = set()
+    patterns = list(get_resolver(urlconf).url_patterns)
+
+    while patterns:
+        pattern = patterns.pop()
+        if hasattr(pattern, 'url_patterns'):
+            patterns.extend(pattern.url_patterns)
+        elif pattern.name:
+            names.add(pattern.name)
+
+    return names
+
+
+class QueryBudgetTestMixin:
+    """
+    Test case mixin that checks responses against the query and latency budgets in settings.QUERY_BUDGETS.
+    The stats come from core.middleware.QueryBudgetMiddleware, so requests must go through the test client.
+    """
+
+    def assertWithinBudget(self, response):
+        stats = getattr(response, 'query_stats', None)
+        self.assertIsNotNone(stats, "Response has no query stats; is QueryBudgetMiddleware installed?")
+
+        budget = settings.QUERY_BUDGETS.get(stats.url_name)
+        self.assertIsNotNone(budget, f"No budget declared for URL name {stats.url_name!r} in QUERY_BUDGETS")
+
+        violations = budget_violations(stats, budget)
+        if violations:
+            queries = '\n'.join(f"  {i + 1}. {sql}" for i, (sql, _) in enumerate(stats.queries))
+            self.fail(f"{stats.url_name} exceeded its budget: {', '.join(violations)}\nQueries:\n{queries}")
+
+        return stats
@@ -0,0 +1,39 @@
+from asgiref.sync import sync_to_async
+
+from rest_framework.views import APIView
+
+import asyncio
+
+
+class AsyncAPIView(APIView):
+    """
+    APIView with coroutine handlers (async def get/post/...).
+    Authentication, permission and throttling checks may query the database, so they run
+    in a thread via sync_to_async; the handlers themselves run on the event loop and can
+    await I/O without holding a thread.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            if asyncio.iscoroutine(response):
+                response = await response
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
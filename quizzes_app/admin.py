@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Quiz, Question
+from .models import Quiz, Question, QuizGenerationJob, Transcript, QuizPipelineRun
+from .api.services import save_questions
 
 
 class QuestionInline(admin.TabularInline):
@@ -17,22 +18,34 @@ class QuizAdmin(admin.ModelAdmin):
     """
     Admin interface for Quiz model.
     Provides list display, search, filtering, and inline question editing capabilities.
+    New questions are inserted with one bulk insert, like quizzes created by the quiz generation.
     """
     
     list_display = ['title', 'user', 'created_at', 'updated_at']
     list_filter = ['created_at', 'updated_at', 'user']
-    search_fields = ['title', 'description', 'user__username']
-    readonly_fields = ['created_at', 'updated_at']
+    search_fields = ['title', 'description', 'user__username', 'video_id']
+    readonly_fields = ['video_id', 'created_at', 'updated_at']
     inlines = [QuestionInline]
     fieldsets = (
         ('Quiz Information', {
-            'fields': ('user', 'title', 'description', 'video_url')
+            'fields': ('user', 'title', 'description', 'video_url', 'video_id')
         }),
         ('Timestamps', {
             'fields': ('created_at', 'updated_at'),
             'classes': ('collapse',)
         }),
     )
+    
+    def save_formset(self, request, form, formset, change):
+        if formset.model is not Question:
+            return super().save_formset(request, form, formset, change)
+        
+        formset.save(commit=False)
+        for question in formset.deleted_objects:
+            question.delete()
+        for question, _ in formset.changed_objects:
+            question.save()
+        save_questions(form.instance, formset.new_objects)
 
 
 class QuestionAdmin(admin.ModelAdmin):
@@ -56,5 +69,46 @@ class QuestionAdmin(admin.ModelAdmin):
     )
 
 
+class QuizGenerationJobAdmin(admin.ModelAdmin):
+    """
+    Admin interface for QuizGenerationJob model.
+    Provides list display and filtering to monitor queued, running and failed quiz generation jobs.
+    """
+    
+    list_display = ['id', 'video_url', 'user', 'status', 'quiz', 'created_at', 'finished_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['video_url', 'user__username', 'error']
+    readonly_fields = ['created_at', 'updated_at', 'started_at', 'finished_at', 'retried_at']
+    raw_id_fields = ['quiz']
+
+
+class TranscriptAdmin(admin.ModelAdmin):
+    """
+    Admin interface for Transcript model.
+    Allows inspecting cached transcripts and deleting them to force a new transcription.
+    """
+    
+    list_display = ['video_id', 'model_name', 'model_version', 'created_at']
+    list_filter = ['model_name', 'model_version']
+    search_fields = ['video_id']
+    readonly_fields = ['created_at']
+
+
+class QuizPipelineRunAdmin(admin.ModelAdmin):
+    """
+    Admin interface for QuizPipelineRun model.
+    Shows the shared pipeline run per video that concurrent quiz requests attach to,
+    with the stage it reached and the checkpointed artifacts of completed stages.
+    """
+    
+    list_display = ['video_id', 'status', 'stage', 'started_at', 'finished_at', 'lease_expires_at']
+    list_filter = ['status', 'stage']
+    search_fields = ['video_id', 'error']
+    readonly_fields = ['owner', 'stage', 'checkpoint', 'started_at', 'finished_at', 'lease_expires_at', 'updated_at']
+
+
 admin.site.register(Quiz, QuizAdmin)
 admin.site.register(Question, QuestionAdmin)
+admin.site.register(QuizGenerationJob, QuizGenerationJobAdmin)
+admin.site.register(Transcript, TranscriptAdmin)
+admin.site.register(QuizPipelineRun, QuizPipelineRunAdmin)
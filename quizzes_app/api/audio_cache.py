@@ -0,0 +1,139 @@
+from django.conf import settings
+
+import os
+import glob
+import time
+import uuid
+import hashlib
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+# Files used within this many seconds are not evicted, so a file is not deleted while it is being transcribed
+EVICTION_GRACE_SECONDS = 300
+
+
+class AudioCache:
+    """
+    Content-addressed on-disk cache of downloaded audio.
+    Files are named by a hash of video ID and format and written atomically: yt-dlp downloads into tmp/
+    and the finished file is renamed into place. A hit refreshes the file's modification time, and
+    when the cache exceeds its byte budget the least recently used files are evicted.
+    """
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = str(root)
+        self.max_bytes = max_bytes
+        self.tmp_dir = os.path.join(self.root, 'tmp')
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def key(self, video_id: str, audio_format: str) -> str:
+        return hashlib.sha256(f'{video_id}\0{audio_format}'.encode()).hexdigest()[:32]
+
+    def get(self, video_id: str, audio_format: str) -> str | None:
+        """Return the cached file for a video and format (marking it as recently used), or None."""
+
+        for path in glob.glob(os.path.join(self.root, f'{self.key(video_id, audio_format)}.*')):
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                continue
+            return path
+
+        return None
+
+    def fetch(self, video_id: str, audio_format: str, download) -> str:
+        """
+        Return the cached file for a video, calling download(filename_base) on a miss.
+        download must write the audio to filename_base plus an extension and return the file's path.
+        """
+
+        path = self.get(video_id, audio_format)
+        if path:
+            logger.info(f"Using cached audio for {video_id}")
+            return path
+
+        key = self.key(video_id, audio_format)
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        downloaded = download(os.path.join(self.tmp_dir, f'{key}-{uuid.uuid4().hex}'))
+
+        try:
+            path = os.path.join(self.root, key + os.path.splitext(downloaded)[1])
+            os.replace(downloaded, path)
+        except OSError:
+            remove_file(downloaded)
+            raise
+
+        self.evict(keep=path)
+        self.sweep()
+        return path
+
+    def evict(self, keep: str | None = None) -> int:
+        """Delete least recently used files until the cache fits its byte budget; returns the freed bytes."""
+
+        entries = []
+        for entry in os.scandir(self.root):
+            if entry.is_file():
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        freed = 0
+        now = time.time()
+
+        for mtime, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path == keep or now - mtime < EVICTION_GRACE_SECONDS:
+                continue
+            if remove_file(path):
+                total -= size
+                freed += size
+
+        if freed:
+            logger.info(f"Evicted {freed / 1024 ** 2:.1f} MB from the audio cache")
+
+        return freed
+
+    def sweep(self, max_age: float | None = None) -> int:
+        """
+        Delete partial downloads older than max_age seconds (default AUDIO_CACHE_PARTIAL_MAX_AGE), left behind
+        by crashed workers, in the cache's tmp/ directory and temporary audio files in MEDIA_ROOT.
+        Returns the number of deleted files.
+        """
+
+        max_age = settings.AUDIO_CACHE_PARTIAL_MAX_AGE if max_age is None else max_age
+        cutoff = time.time() - max_age
+        deleted = 0
+
+        paths = glob.glob(os.path.join(self.tmp_dir, '*')) + glob.glob(os.path.join(str(settings.MEDIA_ROOT), 'temp_audio_*'))
+        for path in paths:
+            try:
+                if os.path.getmtime(path) < cutoff and remove_file(path):
+                    deleted += 1
+            except FileNotFoundError:
+                continue
+
+        if deleted:
+            logger.info(f"Deleted {deleted} orphaned partial audio files")
+
+        return deleted
+
+
+def remove_file(path: str) -> bool:
+    try:
+        os.remove(path)
+        return True
+    except FileNotFoundError:
+        return False
+    except OSError as e:
+        logger.warning(f"Failed to delete {path}: {str(e)}")
+        return False
+
+
+def get_audio_cache() -> AudioCache:
+    return AudioCache(settings.AUDIO_CACHE_DIR, settings.AUDIO_CACHE_MAX_BYTES)
@@ -0,0 +1,291 @@
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+import re
+import html
+import json
+import logging
+import importlib.util
+import yt_dlp
+import whisper
+import numpy as np
+
+from abc import ABC, abstractmethod
+from functools import lru_cache
+
+from .youtube import parse_youtube_url
+from .metrics import stage_span
+from .audio_cache import get_audio_cache
+from .scheduler import transcription_slot, torch_threads
+from .transcription import SAMPLE_RATE
+from .utils import (
+    stream_youtube_audio,
+    download_youtube_audio,
+    transcribe_audio,
+    cleanup_temp_file,
+    YouTubeDownloadError,
+    TranscriptionError,
+    TranscriptUnavailable,
+)
+
+
+logger = logging.getLogger(__name__)
+
+VTT_TIMESTAMP_RE = re.compile(r'-->')
+VTT_TAG_RE = re.compile(r'<[^>]+>')
+
+
+class TranscriptionBackend(ABC):
+    """
+    Abstract base class of the transcription backends.
+    name identifies the backend in TRANSCRIPTION_BACKENDS. cache_key() returns the (model name, model version)
+    its transcripts are stored under, so transcripts of different backends and models are never mixed up.
+    transcribe() raises TranscriptUnavailable when the backend cannot handle a video, and the next backend is tried.
+    """
+
+    name = None
+
+    def is_available(self) -> bool:
+        return True
+
+    @abstractmethod
+    def cache_key(self) -> tuple[str, str]:
+        ...
+
+    @abstractmethod
+    def transcribe(self, video_url: str) -> str:
+        ...
+
+
+class WhisperBackend(TranscriptionBackend):
+    """
+    openai-whisper on torch. The audio is downloaded (or streamed with AUDIO_STREAMING) and transcribed locally.
+    With AUDIO_CACHE_MAX_BYTES set, downloads of YouTube videos are kept in the audio cache.
+    """
+
+    name = 'whisper'
+
+    # yt-dlp format selector of the downloaded audio; part of the audio cache key
+    audio_format = 'bestaudio/best'
+
+    def cache_key(self) -> tuple[str, str]:
+        return settings.WHISPER_MODEL, whisper.__version__
+
+    def transcribe(self, video_url: str) -> str:
+        if settings.AUDIO_STREAMING:
+            return self.transcribe_audio(stream_youtube_audio(video_url))
+
+        audio_cache = get_audio_cache()
+        video_ref = parse_youtube_url(video_url)
+
+        if audio_cache.enabled and video_ref:
+            audio_path = audio_cache.fetch(
+                video_ref.video_id,
+                self.audio_format,
+                lambda filename_base: download_youtube_audio(video_url, filename_base),
+            )
+            return self.transcribe_audio(audio_path)
+
+        temp_audio_path = None
+
+        try:
+            temp_audio_path = download_youtube_audio(video_url)
+
+            return self.transcribe_audio(temp_audio_path)
+
+        finally:
+            if temp_audio_path:
+                cleanup_temp_file(temp_audio_path)
+
+    def transcribe_audio(self, audio: str | np.ndarray) -> str:
+        return transcribe_audio(audio)
+
+
+@lru_cache(maxsize=2)
+def get_faster_whisper_model(name: str, compute_type: str, cpu_threads: int):
+    """Load a faster-whisper model once per process."""
+
+    from faster_whisper import WhisperModel
+
+    logger.info(f"Loading faster-whisper model '{name}' ({compute_type})")
+    return WhisperModel(name, device='cpu', compute_type=compute_type, cpu_threads=cpu_threads)
+
+
+class FasterWhisperBackend(WhisperBackend):
+    """
+    Whisper on CTranslate2 with quantized (int8 by default) weights, several times faster on CPU.
+    Needs the optional faster-whisper package.
+    """
+
+    name = 'faster-whisper'
+
+    def is_available(self) -> bool:
+        return importlib.util.find_spec('faster_whisper') is not None
+
+    def cache_key(self) -> tuple[str, str]:
+        import faster_whisper
+
+        return f'faster-whisper-{settings.FASTER_WHISPER_MODEL}', f'{faster_whisper.__version__}-{settings.FASTER_WHISPER_COMPUTE_TYPE}'
+
+    def transcribe_audio(self, audio: str | np.ndarray) -> str:
+        try:
+            with stage_span('transcribe') as span:
+                if isinstance(audio, str):
+                    audio = whisper.load_audio(audio)
+
+                span['audio_seconds'] = round(len(audio) / SAMPLE_RATE, 2)
+
+                with transcription_slot() as waited:
+                    span['slot_wait'] = round(waited, 3)
+
+                    # Loading the model takes as much memory and CPU as transcribing, so it counts against the slot too
+                    model = get_faster_whisper_model(
+                        settings.FASTER_WHISPER_MODEL,
+                        settings.FASTER_WHISPER_COMPUTE_TYPE,
+                        settings.FASTER_WHISPER_CPU_THREADS or torch_threads(),
+                    )
+                    segments, _ = model.transcribe(audio)
+                    return ''.join(segment.text for segment in segments).strip()
+
+        except Exception as e:
+            raise TranscriptionError(f"Failed to transcribe audio: {str(e)}")
+
+
+def select_caption_track(info: dict, languages: list[str], automatic: bool) -> dict | None:
+    """
+    Pick a caption track from yt-dlp video info.
+    Uploaded subtitles are preferred over automatic captions, languages in the configured order
+    (a language also matches its regional variants, e.g. 'en' matches 'en-US'), and WebVTT over json3.
+    """
+
+    sources = [info.get('subtitles') or {}]
+    if automatic:
+        sources.append(info.get('automatic_captions') or {})
+
+    for tracks in sources:
+        for language in languages:
+            candidates = [key for key in tracks if key == language] + [key for key in tracks if key.startswith(f'{language}-')]
+            for key in candidates:
+                formats = {track.get('ext'): track for track in tracks[key] if track.get('url')}
+                for ext in ('vtt', 'json3'):
+                    if ext in formats:
+                        return formats[ext]
+
+    return None
+
+
+def parse_vtt(content: str) -> str:
+    """Return the text of a WebVTT caption file, without cue timings, markup and rolling duplicates."""
+
+    lines = []
+    in_header = True
+
+    for block in content.replace('\r\n', '\n').split('\n\n'):
+        block_lines = block.strip().split('\n')
+        if in_header:
+            in_header = False
+            if block_lines[0].startswith('WEBVTT'):
+                continue
+        if block_lines[0].startswith(('NOTE', 'STYLE', 'REGION')):
+            continue
+
+        for line in block_lines:
+            if not line.strip() or VTT_TIMESTAMP_RE.search(line) or line.strip().isdigit():
+                continue
+            text = html.unescape(VTT_TAG_RE.sub('', line)).strip()
+            if text and (not lines or lines[-1] != text):
+                lines.append(text)
+
+    return ' '.join(lines)
+
+
+def parse_json3(content: str) -> str:
+    """Return the text of a YouTube json3 caption track."""
+
+    events = json.loads(content).get('events', [])
+    text = ''.join(segment.get('utf8', '') for event in events for segment in event.get('segs') or [])
+    return ' '.join(text.split())
+
+
+class YouTubeCaptionsBackend(TranscriptionBackend):
+    """
+    Use YouTube's own captions (uploaded subtitles, optionally automatic captions) fetched with yt-dlp.
+    No audio is downloaded or transcribed; videos without captions in TRANSCRIPTION_CAPTION_LANGUAGES
+    are left to the next backend.
+    """
+
+    name = 'youtube-captions'
+
+    def cache_key(self) -> tuple[str, str]:
+        languages = ','.join(settings.TRANSCRIPTION_CAPTION_LANGUAGES)
+        return 'youtube-captions', f"{languages}{'+auto' if settings.TRANSCRIPTION_AUTO_CAPTIONS else ''}"
+
+    def transcribe(self, video_url: str) -> str:
+        try:
+            with stage_span('captions') as span:
+                ydl_opts = {
+                    'quiet': True,
+                    'noplaylist': True,
+                    'skip_download': True,
+                }
+
+                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                    info = ydl.extract_info(video_url, download=False)
+                    track = select_caption_track(info, settings.TRANSCRIPTION_CAPTION_LANGUAGES, settings.TRANSCRIPTION_AUTO_CAPTIONS)
+                    if track is None:
+                        raise TranscriptUnavailable("No captions available")
+
+                    content = ydl.urlopen(track['url']).read().decode('utf-8', errors='replace')
+
+                span['bytes'] = len(content)
+                text = parse_json3(content) if track['ext'] == 'json3' else parse_vtt(content)
+
+                if not text:
+                    raise TranscriptUnavailable("Captions are empty")
+
+                return text
+
+        except TranscriptionError:
+            raise
+        except Exception as e:
+            raise YouTubeDownloadError(f"Failed to fetch YouTube captions: {str(e)}")
+
+
+BACKENDS = {backend.name: backend for backend in (WhisperBackend, FasterWhisperBackend, YouTubeCaptionsBackend)}
+
+
+def get_transcription_backends() -> list[TranscriptionBackend]:
+    """Return the available backends of TRANSCRIPTION_BACKENDS in fallback order."""
+
+    backends = []
+
+    for name in settings.TRANSCRIPTION_BACKENDS:
+        if name not in BACKENDS:
+            raise ImproperlyConfigured(f"Unknown transcription backend '{name}' in TRANSCRIPTION_BACKENDS (choose from {', '.join(BACKENDS)})")
+
+        backend = BACKENDS[name]()
+        if backend.is_available():
+            backends.append(backend)
+        else:
+            logger.warning(f"Transcription backend '{name}' is not available, skipping it")
+
+    if not backends:
+        raise ImproperlyConfigured("None of the TRANSCRIPTION_BACKENDS is available")
+
+    return backends
+
+
+def transcribe_video(video_url: str, backends: list[TranscriptionBackend]) -> tuple[str, TranscriptionBackend]:
+    """
+    Transcribe a video with the first backend that succeeds and return the transcript and that backend.
+    If every backend fails, the error of the last one is raised.
+    """
+
+    for i, backend in enumerate(backends):
+        try:
+            return backend.transcribe(video_url), backend
+
+        except Exception as e:
+            if i == len(backends) - 1:
+                raise
+            logger.warning(f"Transcription backend '{backend.name}' failed for {video_url}, trying '{backends[i + 1].name}': {str(e)}")
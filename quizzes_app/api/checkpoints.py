@@ -0,0 +1,54 @@
+from django.utils import timezone
+
+import hashlib
+
+from quizzes_app.models import QuizPipelineRun
+
+
+def digest(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()[:16]
+
+
+class Checkpoint:
+    """
+    Artifacts of completed pipeline stages, so that a retried or taken-over run resumes at the stage that failed.
+    Every artifact is stored with a digest of the input it was derived from and only reused for the same input.
+    Bound to a QuizPipelineRun, artifacts are saved on the run and survive its failure; unbound, they live in memory.
+    The transcript itself is checkpointed by the transcript cache and the audio by the audio cache.
+    """
+
+    def __init__(self, run: QuizPipelineRun | None = None):
+        self.run = run
+        self.data = dict(run.checkpoint) if run else {}
+
+    def start(self, stage: str) -> None:
+        """Record the stage the run is working on."""
+
+        if self.run:
+            self.persist(stage=stage)
+
+    def get(self, stage: str, source: str):
+        """Return the artifact of a stage if it was derived from source, else None."""
+
+        entry = self.data.get(stage)
+        if entry and entry['source'] == digest(source):
+            return entry['value']
+        return None
+
+    def save(self, stage: str, source: str, value) -> None:
+        self.data[stage] = {'source': digest(source), 'value': value}
+        if self.run:
+            self.persist(checkpoint=self.data)
+
+    def resume(self, stage: str, source: str, func):
+        """Return the stored artifact of a stage for source, or compute it with func() and store it."""
+
+        self.start(stage)
+        value = self.get(stage, source)
+        if value is None:
+            value = func()
+            self.save(stage, source, value)
+        return value
+
+    def persist(self, **fields) -> None:
+        QuizPipelineRun.objects.filter(pk=self.run.pk, owner=self.run.owner).update(updated_at=timezone.now(), **fields)
@@ -0,0 +1,142 @@
+from django.conf import settings
+
+import re
+import time
+import logging
+import tiktoken
+
+from concurrent.futures import ThreadPoolExecutor
+
+from .gemini import generate_content
+from .metrics import stage_span
+
+
+logger = logging.getLogger(__name__)
+
+FILLER_RE = re.compile(r"\b(?:u+m+|u+h+m*|e+r+m+|h+m+)\b[,.]?\s*", re.IGNORECASE)
+SENTENCE_RE = re.compile(r"[^.!?]+[.!?]*")
+CHARS_PER_TOKEN = 4
+ENCODING_RETRY_SECONDS = 300
+
+_encoding_failed_at = {}
+
+SUMMARY_PROMPT = """
+Summarize the following part of a video transcript.
+Keep every fact, name, number, definition and explanation a quiz about the video could ask about.
+Leave out greetings, sponsor messages and small talk. Answer with the summary only.
+
+Transcript part:
+{chunk}
+"""
+
+
+def get_encoding():
+    """
+    Return the tiktoken encoding, or None if it cannot be loaded (e.g. no network and TIKTOKEN_CACHE_DIR not seeded
+    with preload_tiktoken_encoding; QuizzesAppConfig.ready points tiktoken at that directory). tiktoken keeps a loaded encoding; after a failure, loading is retried after ENCODING_RETRY_SECONDS.
+    """
+
+    name = settings.TIKTOKEN_ENCODING
+    failed_at = _encoding_failed_at.get(name)
+    if failed_at is not None and time.monotonic() - failed_at < ENCODING_RETRY_SECONDS:
+        return None
+
+    try:
+        return tiktoken.get_encoding(name)
+    except Exception as e:
+        _encoding_failed_at[name] = time.monotonic()
+        logger.warning(f"tiktoken encoding unavailable, estimating token counts instead: {str(e)}")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Count the tokens of a text with tiktoken (an estimate of what the LLM will bill)."""
+
+    encoding = get_encoding()
+    if encoding is None:
+        return len(text) // CHARS_PER_TOKEN + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def split_sentences(text: str) -> list[str]:
+    return [sentence.strip() for sentence in SENTENCE_RE.findall(text) if sentence.strip()]
+
+
+def compact_transcript(text: str) -> str:
+    """
+    Strip what carries no content for a quiz: filler sounds (um, uh, erm, hmm), repeated sentences
+    (e.g. Whisper repetition loops) and redundant whitespace. Filler phrases and repeated words are kept,
+    since they are often part of the sentence ("Do you know ...", "that that").
+    """
+
+    text = FILLER_RE.sub('', text)
+
+    seen = set()
+    sentences = []
+    for sentence in split_sentences(text):
+        key = re.sub(r'\W+', ' ', sentence.lower()).strip()
+        if key and key in seen:
+            continue
+        seen.add(key)
+        sentences.append(sentence)
+
+    return ' '.join(' '.join(sentences).split())
+
+
+def split_into_token_chunks(text: str, max_tokens: int) -> list[str]:
+    """Split a text on sentence boundaries into chunks of at most max_tokens tokens."""
+
+    chunks = []
+    current = []
+    current_tokens = 0
+
+    for sentence in split_sentences(text):
+        sentence_tokens = count_tokens(sentence)
+        if current and current_tokens + sentence_tokens > max_tokens:
+            chunks.append(' '.join(current))
+            current = []
+            current_tokens = 0
+        current.append(sentence)
+        current_tokens += sentence_tokens
+
+    if current:
+        chunks.append(' '.join(current))
+
+    return chunks
+
+
+def summarize_chunk(chunk: str, api_key: str) -> str:
+    response = generate_content(api_key, SUMMARY_PROMPT.format(chunk=chunk))
+    return response.text.strip()
+
+
+def prepare_transcript(transcript: str, api_key: str) -> str:
+    """
+    Compact a transcript before it goes into the quiz prompt.
+    If it is still above QUIZ_TRANSCRIPT_TOKEN_BUDGET, chunks are summarized in parallel (map)
+    and the summaries are joined (reduce) until the text fits the budget.
+    """
+
+    with stage_span('compaction') as span:
+        text = compact_transcript(transcript)
+        budget = settings.QUIZ_TRANSCRIPT_TOKEN_BUDGET
+        tokens = count_tokens(text)
+        span['tokens_in'] = count_tokens(transcript)
+        span['summarized_chunks'] = 0
+
+        for _ in range(settings.QUIZ_SUMMARY_MAX_ROUNDS):
+            if tokens <= budget:
+                break
+
+            chunks = split_into_token_chunks(text, settings.QUIZ_SUMMARY_CHUNK_TOKENS)
+            logger.info(f"Transcript has {tokens} tokens (budget {budget}), summarizing {len(chunks)} chunks")
+
+            with ThreadPoolExecutor(max_workers=settings.GEMINI_MAX_CONCURRENCY) as executor:
+                summaries = list(executor.map(lambda chunk: summarize_chunk(chunk, api_key), chunks))
+
+            text = '\n\n'.join(summaries)
+            tokens = count_tokens(text)
+            span['summarized_chunks'] += len(chunks)
+
+        span['tokens_out'] = tokens
+        return text
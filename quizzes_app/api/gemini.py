@@ -0,0 +1,123 @@
+from django.conf import settings
+
+import time
+import httpx
+import logging
+import threading
+
+from typing import Iterator
+from google import genai
+from google.genai import errors, types
+from tenacity import Retrying, retry_if_exception, stop_after_attempt, wait_random_exponential
+
+from .metrics import stage_span
+
+
+logger = logging.getLogger(__name__)
+
+_clients = {}
+_clients_lock = threading.Lock()
+_semaphore = threading.BoundedSemaphore(settings.GEMINI_MAX_CONCURRENCY)
+
+
+def get_gemini_client(api_key: str) -> genai.Client:
+    """
+    Return the process-wide Gemini client for an API key.
+    Reusing the client keeps its HTTP connection pool, so calls skip client construction and TLS setup.
+    """
+
+    key = (api_key, settings.GEMINI_BASE_URL, settings.GEMINI_TIMEOUT)
+
+    with _clients_lock:
+        if key not in _clients:
+            _clients[key] = genai.Client(
+                api_key=api_key,
+                http_options=types.HttpOptions(
+                    base_url=settings.GEMINI_BASE_URL,
+                    timeout=int(settings.GEMINI_TIMEOUT * 1000),
+                ),
+            )
+        return _clients[key]
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """Return whether a failed Gemini call is worth retrying (rate limits, server errors, network errors)."""
+
+    if isinstance(error, errors.APIError):
+        return error.code == 429 or (error.code or 0) >= 500
+    return isinstance(error, httpx.TransportError)
+
+
+def log_retry(retry_state) -> None:
+    logger.warning(
+        f"Gemini call failed (attempt {retry_state.attempt_number}), retrying: {retry_state.outcome.exception()}"
+    )
+
+
+def record_usage(span: dict, response: types.GenerateContentResponse) -> None:
+    """Add the token counts reported by Gemini to a timing span."""
+
+    usage = response.usage_metadata
+    if usage:
+        span['tokens_in'] = usage.prompt_token_count or 0
+        span['tokens_out'] = usage.candidates_token_count or 0
+
+
+def build_retrying() -> Retrying:
+    return Retrying(
+        stop=stop_after_attempt(settings.GEMINI_MAX_ATTEMPTS),
+        wait=wait_random_exponential(multiplier=settings.GEMINI_BACKOFF_BASE, max=settings.GEMINI_BACKOFF_MAX),
+        retry=retry_if_exception(is_transient_error),
+        before_sleep=log_retry,
+        reraise=True,
+    )
+
+
+def generate_content(api_key: str, contents, config: types.GenerateContentConfig | None = None) -> types.GenerateContentResponse:
+    """
+    Call Gemini with the pooled client.
+    At most GEMINI_MAX_CONCURRENCY calls run at once per process; transient failures are retried
+    with exponential backoff and jitter up to GEMINI_MAX_ATTEMPTS times.
+    """
+
+    client = get_gemini_client(api_key)
+
+    with stage_span('gemini') as span:
+        for attempt in build_retrying():
+            with attempt:
+                span['retries'] = attempt.retry_state.attempt_number - 1
+                with _semaphore:
+                    response = client.models.generate_content(model=settings.GEMINI_MODEL, contents=contents, config=config)
+
+        record_usage(span, response)
+        return response
+
+
+def generate_content_stream(api_key: str, contents, config: types.GenerateContentConfig | None = None) -> Iterator[str]:
+    """
+    Call Gemini with the streaming API and yield the response text as it arrives.
+    Transient failures are retried until the first chunk has arrived; the call holds
+    one of the GEMINI_MAX_CONCURRENCY slots until the stream is consumed or closed.
+    """
+
+    client = get_gemini_client(api_key)
+    start = time.perf_counter()
+
+    with _semaphore, stage_span('gemini_stream') as span:
+        for attempt in build_retrying():
+            with attempt:
+                span['retries'] = attempt.retry_state.attempt_number - 1
+                stream = client.models.generate_content_stream(model=settings.GEMINI_MODEL, contents=contents, config=config)
+                first_chunk = next(stream, None)
+
+        span['first_chunk_seconds'] = round(time.perf_counter() - start, 3)
+        if first_chunk is None:
+            return
+
+        last_chunk = first_chunk
+        yield first_chunk.text or ''
+        for chunk in stream:
+            last_chunk = chunk
+            yield chunk.text or ''
+
+        record_usage(span, last_chunk)
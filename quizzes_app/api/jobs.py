@@ -0,0 +1,114 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Count
+from django.utils import timezone
+
+import time
+import logging
+
+from quizzes_app.models import QuizGenerationJob
+
+from .services import create_quiz_with_questions
+from .scheduler import fair_order
+from .pipeline import generate_quiz_data, describe_pipeline_error
+
+
+logger = logging.getLogger(__name__)
+
+
+def claim_next_job() -> QuizGenerationJob | None:
+    """
+    Claim the next pending job for the calling worker.
+    Among the oldest QUIZ_JOB_CLAIM_WINDOW pending jobs, users take turns (see scheduler.fair_order), so one
+    user queueing many quizzes does not hold up everyone else.
+    The status transition is a conditional UPDATE, so concurrent workers never claim the same job.
+    """
+
+    candidates = list(
+        QuizGenerationJob.objects
+        .filter(status=QuizGenerationJob.Status.PENDING)
+        .order_by('created_at', 'id')
+        .values_list('id', 'user_id')[:settings.QUIZ_JOB_CLAIM_WINDOW]
+    )
+    if not candidates:
+        return None
+
+    running = dict(
+        QuizGenerationJob.objects
+        .filter(status=QuizGenerationJob.Status.RUNNING, user_id__in={user_id for _, user_id in candidates})
+        .values('user_id')
+        .annotate(count=Count('id'))
+        .values_list('user_id', 'count')
+    )
+
+    for job_id in fair_order(candidates, running):
+        claimed = QuizGenerationJob.objects.filter(
+            pk=job_id,
+            status=QuizGenerationJob.Status.PENDING,
+        ).update(
+            status=QuizGenerationJob.Status.RUNNING,
+            started_at=timezone.now(),
+            updated_at=timezone.now(),
+        )
+        if claimed:
+            return QuizGenerationJob.objects.select_related('user').get(pk=job_id)
+
+    return None
+
+
+def process_job(job: QuizGenerationJob) -> QuizGenerationJob:
+    """
+    Run the pipeline for a claimed job and store the resulting quiz or error.
+    A retried job does not reuse a shared run that finished before the retry.
+    """
+
+    try:
+        quiz_data = generate_quiz_data(job.video_url, requested_at=job.retried_at or job.created_at)
+
+        job.quiz, _ = create_quiz_with_questions(job.user, job.video_url, quiz_data)
+        job.status = QuizGenerationJob.Status.COMPLETED
+        job.error = ''
+
+    except Exception as e:
+        logger.warning(f"Quiz generation job {job.pk} failed: {str(e)}")
+        job.status = QuizGenerationJob.Status.FAILED
+        job.error = describe_pipeline_error(e)
+
+    job.finished_at = timezone.now()
+    job.save(update_fields=['quiz', 'status', 'error', 'finished_at', 'updated_at'])
+    return job
+
+
+def requeue_stale_jobs() -> int:
+    """Put jobs back in the queue whose worker died while running them."""
+
+    stale_before = timezone.now() - timedelta(seconds=settings.QUIZ_JOB_STALE_AFTER)
+
+    return QuizGenerationJob.objects.filter(
+        status=QuizGenerationJob.Status.RUNNING,
+        started_at__lt=stale_before,
+    ).update(status=QuizGenerationJob.Status.PENDING, started_at=None, updated_at=timezone.now())
+
+
+def run_worker(poll_interval: float) -> None:
+    """Process queued jobs until interrupted, sleeping while the queue is empty."""
+
+    logger.info("Quiz generation worker started")
+
+    try:
+        while True:
+            close_old_connections()
+
+            job = claim_next_job()
+
+            if job is None:
+                time.sleep(poll_interval)
+                continue
+
+            logger.info(f"Processing quiz generation job {job.pk} for {job.video_url}")
+            process_job(job)
+
+    except KeyboardInterrupt:
+        logger.info("Quiz generation worker stopped")
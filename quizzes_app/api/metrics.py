@@ -0,0 +1,149 @@
+import time
+import logging
+import threading
+
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+DURATION_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+
+class MetricsRegistry:
+    """
+    In-process registry of counters and histograms, rendered in the Prometheus text format.
+    Every process (web worker, quiz worker) keeps its own registry.
+    """
+
+    def __init__(self, buckets=DURATION_BUCKETS):
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+        self.help = {}
+
+    def inc(self, name: str, labels: dict, value: float = 1, help_text: str = '') -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.help.setdefault(name, ('counter', help_text))
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name: str, labels: dict, value: float, help_text: str = '') -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.help.setdefault(name, ('histogram', help_text))
+            histogram = self.histograms.setdefault(key, {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0})
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    histogram['buckets'][i] += 1
+            histogram['sum'] += value
+            histogram['count'] += 1
+
+    def clear(self) -> None:
+        with self.lock:
+            self.counters.clear()
+            self.histograms.clear()
+            self.help.clear()
+
+    def render(self) -> str:
+        """Return all metrics in the Prometheus text exposition format."""
+
+        lines = []
+
+        with self.lock:
+            for name, (kind, help_text) in sorted(self.help.items()):
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+
+                if kind == 'counter':
+                    for (metric, labels), value in sorted(self.counters.items()):
+                        if metric == name:
+                            lines.append(f"{name}{format_labels(labels)} {value}")
+                    continue
+
+                for (metric, labels), histogram in sorted(self.histograms.items()):
+                    if metric != name:
+                        continue
+                    for bound, count in zip(self.buckets, histogram['buckets']):
+                        lines.append(f"{name}_bucket{format_labels(labels + (('le', str(bound)),))} {count}")
+                    lines.append(f"{name}_bucket{format_labels(labels + (('le', '+Inf'),))} {histogram['count']}")
+                    lines.append(f"{name}_sum{format_labels(labels)} {histogram['sum']}")
+                    lines.append(f"{name}_count{format_labels(labels)} {histogram['count']}")
+
+        return '\n'.join(lines) + '\n'
+
+
+def escape_label_value(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(labels: tuple) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{escape_label_value(value)}"' for key, value in labels) + '}'
+
+
+registry = MetricsRegistry()
+
+
+@contextmanager
+def stage_span(stage: str, **attributes):
+    """
+    Time a pipeline stage.
+    The yielded dict collects attributes of the stage (e.g. bytes, audio_seconds, tokens_in, tokens_out,
+    retries). On exit the span is logged, its duration is observed in the per-stage histogram and every
+    numeric attribute is added to a per-stage counter.
+    """
+
+    span = dict(attributes)
+    outcome = 'ok'
+    start = time.perf_counter()
+
+    try:
+        yield span
+    except BaseException:
+        outcome = 'error'
+        raise
+    finally:
+        duration = time.perf_counter() - start
+
+        registry.observe(
+            'quiz_pipeline_stage_duration_seconds',
+            {'stage': stage, 'outcome': outcome},
+            duration,
+            'Duration of quiz pipeline stages in seconds.',
+        )
+        for key, value in span.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                registry.inc(f'quiz_pipeline_{key}_total', {'stage': stage}, value, f'Sum of {key} over quiz pipeline stages.')
+
+        details = ''.join(f" {key}={value}" for key, value in span.items())
+        logger.info(
+            f"stage={stage} outcome={outcome} duration={duration:.3f}s{details}",
+            extra={'span': {'stage': stage, 'outcome': outcome, 'duration': duration, **span}},
+        )
+
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        payload = registry.render().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port: int, host: str = '127.0.0.1') -> ThreadingHTTPServer:
+    """Serve the registry of this process over HTTP in a background thread (for worker processes)."""
+
+    server = ThreadingHTTPServer((host, port), MetricsRequestHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    logger.info(f"Serving metrics on http://{host}:{port}/metrics")
+    return server
@@ -0,0 +1,18 @@
+from rest_framework.pagination import CursorPagination
+
+
+class QuizCursorPagination(CursorPagination):
+    """
+    Cursor pagination for quiz lists, newest first.
+    The cursor is based on created_at and id, so pages stay stable while quizzes are added.
+    """
+    
+    ordering = ('-created_at', '-id')
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    
+    def is_requested(self, request) -> bool:
+        """Pagination is opt-in so existing clients keep receiving a plain list."""
+        
+        return self.cursor_query_param in request.query_params or self.page_size_query_param in request.query_params
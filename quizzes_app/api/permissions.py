@@ -2,7 +2,10 @@ from rest_framework import permissions
 
 
 class IsOwner(permissions.BasePermission):
-    """Custom permission to only allow owners of an object to access it."""
+    """
+    Custom permission to only allow owners of an object to access it.
+    Compares IDs so that the owner is never fetched from the database.
+    """
     
     def has_object_permission(self, request, view, obj):
-        return obj.user == request.user
+        return obj.user_id == request.user.id
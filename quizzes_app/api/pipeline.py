@@ -0,0 +1,84 @@
+from datetime import datetime
+
+from django.conf import settings
+
+from .youtube import parse_youtube_url
+from .metrics import stage_span
+from .singleflight import SingleFlightError, run_single_flight
+from .checkpoints import Checkpoint
+from .transcripts import get_cached_transcript, store_transcript
+from .backends import get_transcription_backends, transcribe_video
+from .utils import (
+    generate_quiz_from_transcript,
+    YouTubeDownloadError,
+    TranscriptionError,
+    QuizGenerationError,
+)
+
+
+def get_transcript(video_url: str) -> str:
+    """
+    Return the transcript of a YouTube video.
+    A stored transcript from one of the TRANSCRIPTION_BACKENDS is reused; otherwise the backends are
+    tried in order (e.g. YouTube captions, then Whisper on the downloaded audio) and the transcript is
+    stored under the key of the backend that produced it.
+    """
+
+    video_ref = parse_youtube_url(video_url)
+    video_id = video_ref.video_id if video_ref else None
+    backends = get_transcription_backends()
+
+    if video_id:
+        transcript = get_cached_transcript(video_id, backends)
+        if transcript is not None:
+            return transcript
+
+    transcript, backend = transcribe_video(video_url, backends)
+
+    if video_id:
+        store_transcript(video_id, transcript, backend)
+
+    return transcript
+
+
+def generate_quiz_data(video_url: str, requested_at: datetime | None = None) -> dict:
+    """
+    Run the quiz generation pipeline for a YouTube URL:
+    1. Looking up a cached transcript, or transcribing the video with the configured backends
+    2. Generating quiz with Gemini
+    Concurrent requests for the same video (across processes) share one run and its quiz data.
+    A run after a failed one resumes from the checkpoint of the failed run.
+    """
+
+    video_ref = parse_youtube_url(video_url)
+    if video_ref is None:
+        return run_quiz_pipeline(video_url, Checkpoint())
+
+    return run_single_flight(
+        video_ref.video_id,
+        lambda run: run_quiz_pipeline(video_url, Checkpoint(run)),
+        requested_at=requested_at,
+        describe_error=describe_pipeline_error,
+    )
+
+
+def run_quiz_pipeline(video_url: str, checkpoint: Checkpoint) -> dict:
+    with stage_span('pipeline'):
+        checkpoint.start('transcribe')
+        transcript = get_transcript(video_url)
+
+        return generate_quiz_from_transcript(transcript, settings.GEMINI_API_KEY, checkpoint)
+
+
+def describe_pipeline_error(error: Exception) -> str:
+    """Return a user-facing message for an exception raised by the pipeline."""
+
+    if isinstance(error, SingleFlightError):
+        return str(error)
+    if isinstance(error, YouTubeDownloadError):
+        return f"YouTube download failed: {str(error)}"
+    if isinstance(error, TranscriptionError):
+        return f"Transcription failed: {str(error)}"
+    if isinstance(error, QuizGenerationError):
+        return f"Quiz generation failed: {str(error)}"
+    return f"An unexpected error occurred: {str(error)}"
@@ -0,0 +1,18 @@
+from rest_framework.renderers import BaseRenderer
+
+from .streaming import format_sse
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    Renderer for clients that accept text/event-stream.
+    Streaming views return their events directly; this only renders error responses
+    (e.g. validation errors) as a single 'error' event.
+    """
+    
+    media_type = 'text/event-stream'
+    format = 'sse'
+    charset = 'utf-8'
+    
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return format_sse('error', data).encode(self.charset)
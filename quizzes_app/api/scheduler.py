@@ -0,0 +1,158 @@
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, Q
+from django.contrib.auth.models import User
+
+from rest_framework.exceptions import Throttled
+
+import os
+import time
+import logging
+import threading
+
+from contextlib import contextmanager
+
+from quizzes_app.models import QuizGenerationJob
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+logger = logging.getLogger(__name__)
+
+SLOT_POLL_INTERVAL = 0.25
+
+# Key of the PostgreSQL advisory lock that serializes admission to the job queue
+JOB_QUEUE_LOCK_ID = 7_238_100
+
+_local_slots = None
+_local_slots_lock = threading.Lock()
+
+
+def torch_threads() -> int:
+    """Return the torch thread count of one transcription: TRANSCRIPTION_TORCH_THREADS, or the cores shared evenly between the slots."""
+
+    if settings.TRANSCRIPTION_TORCH_THREADS:
+        return settings.TRANSCRIPTION_TORCH_THREADS
+    return max(1, (os.cpu_count() or 1) // settings.TRANSCRIPTION_MAX_CONCURRENCY)
+
+
+def try_lock_slot(lock_dir: str, slots: int):
+    """Lock the first free slot file and return it, or None if all slots are taken."""
+
+    for index in range(slots):
+        handle = open(os.path.join(lock_dir, f'slot-{index}.lock'), 'a')
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return handle
+        except BlockingIOError:
+            handle.close()
+
+    return None
+
+
+def get_local_slots() -> threading.BoundedSemaphore:
+    global _local_slots
+
+    with _local_slots_lock:
+        if _local_slots is None:
+            _local_slots = threading.BoundedSemaphore(settings.TRANSCRIPTION_MAX_CONCURRENCY)
+        return _local_slots
+
+
+@contextmanager
+def transcription_slot():
+    """
+    Hold one of the TRANSCRIPTION_MAX_CONCURRENCY transcription slots of this node while transcribing.
+    Slots are lock files in TRANSCRIPTION_LOCK_DIR locked with flock, so the limit holds across all
+    worker and web processes of the node, and a slot is released by the OS when its process dies.
+    Torch is pinned to torch_threads() threads, so concurrent transcriptions share the cores instead of
+    oversubscribing them. torch.set_num_threads is process-global, so the thread count is kept for the process
+    rather than restored afterwards, which would change it under a transcription running in another thread.
+    Without fcntl (Windows) the limit is per process. Yields the seconds spent waiting for the slot.
+    """
+
+    import torch
+
+    start = time.monotonic()
+
+    if fcntl is None:
+        slots = get_local_slots()
+        slots.acquire()
+        release = slots.release
+    else:
+        os.makedirs(settings.TRANSCRIPTION_LOCK_DIR, exist_ok=True)
+        while (handle := try_lock_slot(settings.TRANSCRIPTION_LOCK_DIR, settings.TRANSCRIPTION_MAX_CONCURRENCY)) is None:
+            time.sleep(SLOT_POLL_INTERVAL)
+        release = handle.close
+
+    waited = time.monotonic() - start
+    if waited >= 1:
+        logger.info(f"Waited {waited:.1f}s for a transcription slot")
+
+    if torch.get_num_threads() != torch_threads():
+        torch.set_num_threads(torch_threads())
+
+    try:
+        yield waited
+    finally:
+        release()
+
+
+def lock_job_queue(user_id) -> None:
+    """
+    Serialize admission to the job queue until the end of the current transaction.
+    PostgreSQL takes a transaction-level advisory lock, held across all processes and hosts. Other backends with
+    row locks lock the user's row, which serializes the requests of one user. SQLite has no row locks; its
+    transactions take the database write lock when they begin (transaction_mode IMMEDIATE in DATABASES).
+    """
+
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_xact_lock(%s)', [JOB_QUEUE_LOCK_ID])
+    elif connection.features.has_select_for_update:
+        list(User.objects.select_for_update().filter(pk=user_id).values_list('pk', flat=True))
+
+
+def admit_quiz_job(user_id, create):
+    """
+    Admission control for quiz generation: raise Throttled (HTTP 429 with Retry-After) when the job queue
+    holds QUIZ_QUEUE_MAX_PENDING jobs, or the user already has QUIZ_QUEUE_MAX_PENDING_PER_USER jobs waiting.
+    Otherwise queue the job with create() and return it. The counts and the insert run in one transaction
+    under lock_job_queue(), so concurrent requests cannot all pass the check before any of them is queued.
+    """
+
+    with transaction.atomic():
+        lock_job_queue(user_id)
+
+        counts = QuizGenerationJob.objects.filter(status=QuizGenerationJob.Status.PENDING).aggregate(
+            total=Count('id'),
+            user=Count('id', filter=Q(user_id=user_id)),
+        )
+
+        if counts['user'] >= settings.QUIZ_QUEUE_MAX_PENDING_PER_USER:
+            raise Throttled(wait=settings.QUIZ_QUEUE_RETRY_AFTER, detail="You have too many quizzes waiting to be generated.")
+
+        if counts['total'] >= settings.QUIZ_QUEUE_MAX_PENDING:
+            raise Throttled(wait=settings.QUIZ_QUEUE_RETRY_AFTER, detail="Too many quizzes are being generated right now.")
+
+        return create()
+
+
+def fair_order(candidates: list[tuple[int, int]], running: dict) -> list[int]:
+    """
+    Order pending jobs (id, user ID), oldest first, so that users take turns: a user's n-th waiting job
+    is ranked after the first n - 1 jobs of every other user, and users with running jobs wait longer.
+    """
+
+    ranks = {}
+    ranked = []
+
+    for position, (job_id, user_id) in enumerate(candidates):
+        rank = running.get(user_id, 0) + ranks.get(user_id, 0)
+        ranks[user_id] = ranks.get(user_id, 0) + 1
+        ranked.append((rank, position, job_id))
+
+    return [job_id for _, _, job_id in sorted(ranked)]
@@ -1,19 +1,8 @@
-from django.conf import settings
-
 from rest_framework import serializers
 
-from .utils import (
-    validate_youtube_url,
-    download_youtube_audio,
-    transcribe_audio,
-    generate_quiz_from_transcript,
-    cleanup_temp_file,
-    YouTubeDownloadError,
-    TranscriptionError,
-    QuizGenerationError,
-)
+from .utils import validate_youtube_url
 
-from quizzes_app.models import Quiz, Question
+from quizzes_app.models import Quiz, Question, QuizGenerationJob
 
 
 class QuestionSerializer(serializers.ModelSerializer):
@@ -34,7 +23,35 @@ class QuestionDetailSerializer(serializers.ModelSerializer):
         read_only_fields = fields
 
 
-class QuizSerializer(serializers.ModelSerializer):
+def parse_fields_param(request) -> set[str] | None:
+    """
+    Return the quiz fields requested with ?fields= (plus ?include=questions),
+    or None if the client did not restrict the fields.
+    """
+    
+    fields = request.query_params.get('fields')
+    if fields is None:
+        return None
+    
+    requested = {field.strip() for field in fields.split(',') if field.strip()}
+    include = request.query_params.get('include', '')
+    requested.update(field.strip() for field in include.split(',') if field.strip())
+    return requested
+
+
+class DynamicFieldsMixin:
+    """Serializer mixin that takes a 'fields' argument and drops all other fields."""
+    
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        
+        if fields is not None:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
+
+
+class QuizSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer for Quiz model for GET requests (without timestamps in questions)"""
     
     questions = QuestionSerializer(many=True, read_only=True)
@@ -67,49 +84,20 @@ class QuizCreateSerializer(serializers.Serializer):
         return value
     
     def create(self, validated_data):
-        """
-        Create a quiz from YouTube URL by:
-        1. Downloading audio
-        2. Transcribing with Whisper
-        3. Generating quiz with Gemini
-        4. Saving to database
-        """
-        video_url = validated_data['url']
-        temp_audio_path = None
+        """Queue a quiz generation job for the YouTube URL; the quiz is built by a worker process."""
         
-        try:
-            temp_audio_path = download_youtube_audio(video_url)
-            
-            transcript = transcribe_audio(temp_audio_path)
-            
-            quiz_data = generate_quiz_from_transcript(transcript, settings.GEMINI_API_KEY)
-            
-            user = self.context['request'].user
-            quiz = Quiz.objects.create(
-                user=user,
-                title=quiz_data['title'],
-                description=quiz_data['description'],
-                video_url=video_url
-            )
-            
-            for question_data in quiz_data['questions']:
-                Question.objects.create(
-                    quiz=quiz,
-                    question_title=question_data['question_title'],
-                    question_options=question_data['question_options'],
-                    answer=question_data['answer']
-                )
-            
-            return quiz
-            
-        except YouTubeDownloadError as e:
-            raise serializers.ValidationError(f"YouTube download failed: {str(e)}")
-        except TranscriptionError as e:
-            raise serializers.ValidationError(f"Transcription failed: {str(e)}")
-        except QuizGenerationError as e:
-            raise serializers.ValidationError(f"Quiz generation failed: {str(e)}")
-        except Exception as e:
-            raise serializers.ValidationError(f"An unexpected error occurred: {str(e)}")
-        finally:
-            if temp_audio_path:
-                cleanup_temp_file(temp_audio_path)
+        return QuizGenerationJob.objects.create(
+            user=self.context['request'].user,
+            video_url=validated_data['url']
+        )
+
+
+class QuizGenerationJobSerializer(serializers.ModelSerializer):
+    """Serializer for QuizGenerationJob model for status polling (with the generated quiz once completed)"""
+    
+    quiz = QuizDetailSerializer(read_only=True)
+    
+    class Meta:
+        model = QuizGenerationJob
+        fields = ['id', 'status', 'video_url', 'error', 'quiz', 'created_at', 'updated_at', 'started_at', 'finished_at', 'retried_at']
+        read_only_fields = fields
@@ -0,0 +1,49 @@
+from django.db import transaction
+
+from quizzes_app.models import Quiz, Question
+
+from .metrics import stage_span
+from .youtube import get_video_id
+
+
+def create_quiz_with_questions(user, video_url: str, quiz_data: dict) -> tuple[Quiz, list[Question]]:
+    """
+    Create a quiz and all its questions in one transaction.
+    The questions are written with a single bulk insert and returned with the quiz,
+    so callers can serialize them without reading them back.
+    """
+
+    with stage_span('db_write', questions=len(quiz_data['questions'])), transaction.atomic():
+        quiz = Quiz.objects.create(
+            user=user,
+            title=quiz_data['title'],
+            description=quiz_data['description'],
+            video_url=video_url,
+            video_id=get_video_id(video_url)
+        )
+
+        questions = save_questions(quiz, [
+            Question(
+                question_title=question_data['question_title'],
+                question_options=question_data['question_options'],
+                answer=question_data['answer']
+            )
+            for question_data in quiz_data['questions']
+        ])
+
+    return quiz, questions
+
+
+def save_questions(quiz: Quiz, questions: list[Question]) -> list[Question]:
+    """Insert new questions of a quiz with a single bulk insert (used by quiz creation and the admin)."""
+
+    for question in questions:
+        question.quiz = quiz
+
+    return Question.objects.bulk_create(questions)
+
+
+def fill_quiz_video_id(sender, instance, **kwargs):
+    """pre_save receiver for Quiz that derives the indexed video ID from the video URL (e.g. after an admin edit)."""
+
+    instance.video_id = get_video_id(instance.video_url)
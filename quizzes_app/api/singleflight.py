@@ -0,0 +1,162 @@
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+import time
+import uuid
+import logging
+import threading
+
+from quizzes_app.models import QuizPipelineRun
+
+
+logger = logging.getLogger(__name__)
+
+LEADER = 'leader'
+FOLLOWER = 'follower'
+FINISHED = 'finished'
+
+
+class SingleFlightError(Exception):
+    """Raised for requests that attached to a shared run which failed; carries the run's error message."""
+    pass
+
+
+def lease_deadline() -> datetime:
+    return timezone.now() + timedelta(seconds=settings.QUIZ_SINGLE_FLIGHT_LEASE)
+
+
+def acquire_run(key: str, requested_at: datetime) -> tuple[str, QuizPipelineRun] | None:
+    """
+    Decide the role of a request for a key.
+    LEADER: no usable run exists, the caller now holds the lease and must run the pipeline.
+    FOLLOWER: another process holds a valid lease; wait and ask again.
+    FINISHED: a run finished after the request arrived; its result (or error) applies to the request.
+    Returns None if another process took over the run in the meantime.
+    """
+
+    now = timezone.now()
+    owner = uuid.uuid4().hex
+
+    run, created = QuizPipelineRun.objects.get_or_create(
+        video_id=key,
+        defaults={'owner': owner, 'lease_expires_at': lease_deadline(), 'started_at': now},
+    )
+    if created:
+        return LEADER, run
+
+    if run.status == QuizPipelineRun.Status.RUNNING and run.lease_expires_at > now:
+        return FOLLOWER, run
+
+    if run.status != QuizPipelineRun.Status.RUNNING and run.finished_at and run.finished_at >= requested_at:
+        return FINISHED, run
+
+    # A failed or abandoned run is resumed from its checkpoint; a completed one starts over
+    restart = {'checkpoint': {}} if run.status == QuizPipelineRun.Status.COMPLETED else {}
+
+    taken = QuizPipelineRun.objects.filter(pk=run.pk, owner=run.owner, status=run.status).update(
+        status=QuizPipelineRun.Status.RUNNING,
+        owner=owner,
+        lease_expires_at=lease_deadline(),
+        result=None,
+        error='',
+        started_at=now,
+        finished_at=None,
+        updated_at=now,
+        **restart,
+    )
+    if not taken:
+        return None
+
+    run.refresh_from_db()
+    return LEADER, run
+
+
+class LeaseHeartbeat:
+    """Renew the lease of a run in a background thread while its leader works on it."""
+
+    def __init__(self, run: QuizPipelineRun):
+        self.run = run
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.renew, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stopped.set()
+        self.thread.join()
+
+    def renew(self):
+        interval = settings.QUIZ_SINGLE_FLIGHT_LEASE / 3
+        renewed = False
+
+        while not self.stopped.wait(interval):
+            QuizPipelineRun.objects.filter(pk=self.run.pk, owner=self.run.owner).update(
+                lease_expires_at=lease_deadline(),
+                updated_at=timezone.now(),
+            )
+            renewed = True
+
+        if renewed:
+            connection.close()
+
+
+def finish_run(run: QuizPipelineRun, status: str, result=None, error: str = '') -> None:
+    """Record the outcome of a run. The checkpoint is only kept for failed runs, which later runs resume."""
+
+    cleared = {'checkpoint': {}} if status == QuizPipelineRun.Status.COMPLETED else {}
+
+    updated = QuizPipelineRun.objects.filter(pk=run.pk, owner=run.owner).update(
+        status=status,
+        result=result,
+        error=error,
+        finished_at=timezone.now(),
+        updated_at=timezone.now(),
+        **cleared,
+    )
+    if not updated:
+        logger.warning(f"Pipeline run for {run.video_id} was taken over before it finished")
+
+
+def run_single_flight(key: str, func, requested_at: datetime | None = None, describe_error=str):
+    """
+    Run func(run) at most once at a time per key across all processes and return its result.
+    The first request becomes the leader and runs func with the QuizPipelineRun it holds (for checkpoints
+    of a previous failed run, see checkpoints.Checkpoint); concurrent requests for the same key
+    poll the shared run and receive the leader's result. A failure of the leader is raised to
+    its followers as SingleFlightError with describe_error(exception) as message.
+    A run that finished before requested_at is not reused, and a run whose leader died
+    (expired lease) is taken over.
+    """
+
+    requested_at = requested_at or timezone.now()
+
+    while True:
+        acquired = acquire_run(key, requested_at)
+        if acquired is None:
+            continue
+
+        role, run = acquired
+
+        if role == LEADER:
+            with LeaseHeartbeat(run):
+                try:
+                    result = func(run)
+                except Exception as e:
+                    finish_run(run, QuizPipelineRun.Status.FAILED, error=describe_error(e))
+                    raise
+
+            finish_run(run, QuizPipelineRun.Status.COMPLETED, result=result)
+            return result
+
+        if role == FINISHED:
+            if run.status == QuizPipelineRun.Status.FAILED:
+                raise SingleFlightError(run.error)
+            logger.info(f"Reusing the result of the shared pipeline run for {key}")
+            return run.result
+
+        time.sleep(settings.QUIZ_SINGLE_FLIGHT_POLL_INTERVAL)
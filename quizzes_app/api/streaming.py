@@ -0,0 +1,138 @@
+import json
+
+
+class IncompleteData(Exception):
+    """Raised internally when the buffer ends before the next JSON value is complete."""
+
+
+class QuizStreamParser:
+    """
+    Incremental parser for the quiz JSON while it is streamed from the LLM.
+    Text is passed in with feed() as it arrives; every top-level field and every element of
+    the "questions" array is returned as an event as soon as it is complete, e.g.
+    ('field', ('title', '...')) or ('question', {...}). A leading markdown fence is ignored.
+    """
+
+    decoder = json.JSONDecoder()
+
+    def __init__(self):
+        self.buffer = ''
+        self.pos = 0
+        self.state = 'start'
+        self.key = None
+        self.data = {}
+
+    def feed(self, text: str) -> list[tuple[str, object]]:
+        """Add streamed text and return the events it completes."""
+
+        self.buffer += text
+        events = []
+
+        while self.state != 'done':
+            try:
+                event = self._step()
+            except IncompleteData:
+                break
+            if event:
+                events.append(event)
+
+        return events
+
+    def finish(self) -> dict:
+        """Return the parsed quiz; raises ValueError if the stream ended before the JSON object did."""
+
+        if self.state != 'done':
+            raise ValueError("Incomplete quiz JSON in streamed response")
+        return self.data
+
+    def _step(self) -> tuple[str, object] | None:
+        if self.state == 'start':
+            start = self.buffer.find('{', self.pos)
+            if start == -1:
+                raise IncompleteData()
+            self.pos = start + 1
+            self.state = 'key'
+            return None
+
+        char = self._next_char()
+
+        if self.state == 'key':
+            if char == '}':
+                self.pos += 1
+                self.state = 'done'
+                return None
+            if char == ',':
+                self.pos += 1
+                return None
+            self.key = self._decode_value(require_delimiter=False)
+            if not isinstance(self.key, str):
+                raise ValueError("Invalid quiz JSON in streamed response")
+            self.state = 'colon'
+            return None
+
+        if self.state == 'colon':
+            if char != ':':
+                raise ValueError("Invalid quiz JSON in streamed response")
+            self.pos += 1
+            self.state = 'value'
+            return None
+
+        if self.state == 'value':
+            if self.key == 'questions' and char == '[':
+                self.pos += 1
+                self.data['questions'] = []
+                self.state = 'questions'
+                return None
+            value = self._decode_value()
+            self.data[self.key] = value
+            self.state = 'key'
+            return ('field', (self.key, value))
+
+        if self.state == 'questions':
+            if char == ']':
+                self.pos += 1
+                self.state = 'key'
+                return None
+            if char == ',':
+                self.pos += 1
+                return None
+            question = self._decode_value()
+            self.data['questions'].append(question)
+            return ('question', question)
+
+        return None
+
+    def _next_char(self) -> str:
+        while self.pos < len(self.buffer) and self.buffer[self.pos].isspace():
+            self.pos += 1
+        if self.pos >= len(self.buffer):
+            raise IncompleteData()
+        return self.buffer[self.pos]
+
+    def _decode_value(self, require_delimiter: bool = True):
+        """
+        Decode the JSON value at the current position.
+        Unless a delimiter follows, a number like 12 may still continue as 123,
+        so values are only accepted once the next separator has arrived.
+        """
+
+        try:
+            value, end = self.decoder.raw_decode(self.buffer, self.pos)
+        except json.JSONDecodeError:
+            raise IncompleteData()
+
+        if require_delimiter:
+            rest = self.buffer[end:].lstrip()
+            if not rest:
+                raise IncompleteData()
+            if rest[0] not in ',}]':
+                raise ValueError("Invalid quiz JSON in streamed response")
+
+        self.pos = end
+        return value
+
+
+def format_sse(event: str, data) -> str:
+    """Format one Server-Sent Event with a JSON payload."""
+
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
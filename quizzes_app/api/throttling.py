@@ -0,0 +1,213 @@
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from asgiref.sync import sync_to_async
+
+from rest_framework.throttling import BaseThrottle
+
+import os
+import json
+import math
+import time
+import zlib
+import threading
+
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+SHARDS = 64
+
+_local_lock = threading.Lock()
+_local_shards = {}
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """Outcome of a rate limit check for one request, with the budget left afterwards."""
+
+    allowed: bool
+    limit: int
+    remaining: int
+    reset: int
+    quota: int
+    quota_remaining: int
+    wait: float | None = None
+
+
+def shard_index(user_id) -> int:
+    return zlib.crc32(str(user_id).encode()) % SHARDS
+
+
+def refilled_tokens(record: dict, clock: float) -> float:
+    """Return the tokens in a user's bucket at clock, refilled since its last update."""
+
+    burst = settings.QUIZ_RATE_LIMIT_BURST
+    tokens = record.get('tokens', burst) + max(0, clock - record.get('updated', clock)) / settings.QUIZ_RATE_LIMIT_REFILL_SECONDS
+    return min(burst, tokens)
+
+
+def is_idle(record: dict, clock: float, today: str) -> bool:
+    """Return whether a record holds nothing to remember: its bucket has refilled and it used no quota today."""
+
+    return refilled_tokens(record, clock) >= settings.QUIZ_RATE_LIMIT_BURST and (record.get('day') != today or not record.get('used'))
+
+
+@contextmanager
+def user_state(user_id):
+    """
+    Yield the rate limit record of a user (token bucket and today's quota) to read and update in one step.
+    Records live in one of SHARDS JSON files in QUIZ_RATE_LIMIT_LOCK_DIR, read and rewritten under an exclusive
+    flock on the file, so the limits hold across all processes of the node. Idle records are dropped on write,
+    so a shard file only holds the users who created quizzes recently and an update never scans other files.
+    Without fcntl (Windows) the records are kept in memory per process.
+    """
+
+    clock = time.time()
+    today = timezone.now().date().isoformat()
+    key = str(user_id)
+
+    if fcntl is None:
+        with _local_lock:
+            shard = _local_shards.setdefault(shard_index(user_id), {})
+            record = shard.setdefault(key, {})
+            yield record
+            if is_idle(record, clock, today):
+                del shard[key]
+        return
+
+    os.makedirs(settings.QUIZ_RATE_LIMIT_LOCK_DIR, exist_ok=True)
+    path = os.path.join(settings.QUIZ_RATE_LIMIT_LOCK_DIR, f'shard-{shard_index(user_id)}.json')
+
+    with os.fdopen(os.open(path, os.O_RDWR | os.O_CREAT, 0o600), 'r+') as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX)
+
+        try:
+            shard = json.loads(handle.read() or '{}')
+        except ValueError:
+            shard = {}
+
+        record = shard.setdefault(key, {})
+        yield record
+
+        shard = {user: state for user, state in shard.items() if not is_idle(state, clock, today)}
+        handle.seek(0)
+        handle.truncate()
+        handle.write(json.dumps(shard))
+
+
+def seconds_until_tomorrow(now: datetime) -> int:
+    tomorrow = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return math.ceil((tomorrow - now).total_seconds())
+
+
+def consume(user_id) -> RateLimit:
+    """
+    Take one token from the user's quiz creation bucket and one unit of their daily quota.
+    The bucket holds QUIZ_RATE_LIMIT_BURST tokens and refills one token every QUIZ_RATE_LIMIT_REFILL_SECONDS;
+    the quota allows QUIZ_DAILY_QUOTA quizzes per UTC day (0 = unlimited). Nothing is taken if either is exhausted.
+    """
+
+    burst = settings.QUIZ_RATE_LIMIT_BURST
+    refill = settings.QUIZ_RATE_LIMIT_REFILL_SECONDS
+    quota = settings.QUIZ_DAILY_QUOTA
+    now = timezone.now()
+    clock = time.time()
+    today = now.date().isoformat()
+
+    with user_state(user_id) as record:
+        tokens = refilled_tokens(record, clock)
+        used = record.get('used', 0) if record.get('day') == today else 0
+        wait = None
+
+        if tokens < 1:
+            wait = (1 - tokens) * refill
+        elif quota and used >= quota:
+            wait = seconds_until_tomorrow(now)
+        else:
+            tokens -= 1
+            used += 1
+            record.update(tokens=tokens, updated=clock, day=today, used=used)
+
+    return RateLimit(
+        allowed=wait is None,
+        limit=burst,
+        remaining=int(tokens),
+        reset=math.ceil((burst - tokens) * refill),
+        quota=quota,
+        quota_remaining=max(0, quota - used) if quota else 0,
+        wait=wait,
+    )
+
+
+def refund(user_id) -> None:
+    """
+    Give back the bucket token and the daily quota unit of a request that did not create a quiz,
+    so that invalid URLs or a full job queue do not use up the user's burst either.
+    """
+
+    clock = time.time()
+    today = timezone.now().date().isoformat()
+
+    with user_state(user_id) as record:
+        if 'tokens' in record:
+            record.update(tokens=min(settings.QUIZ_RATE_LIMIT_BURST, refilled_tokens(record, clock) + 1), updated=clock)
+        if record.get('day') == today and record.get('used'):
+            record['used'] -= 1
+
+
+class QuizCreationThrottle(BaseThrottle):
+    """
+    Token bucket and daily quota per user for quiz creation (POST requests only), enabled with QUIZ_RATE_LIMIT.
+    The outcome is kept on the request as quiz_rate_limit for the rate limit headers (see RateLimitHeadersMixin).
+    """
+
+    def allow_request(self, request, view):
+        if not settings.QUIZ_RATE_LIMIT or request.method != 'POST' or not request.user.is_authenticated:
+            return True
+
+        self.rate_limit = consume(request.user.id)
+        request.quiz_rate_limit = self.rate_limit
+        return self.rate_limit.allowed
+
+    def wait(self):
+        return self.rate_limit.wait
+
+
+class RateLimitHeadersMixin:
+    """
+    Async view mixin that adds the remaining quiz creation budget to responses:
+    X-RateLimit-Limit/-Remaining/-Reset (token bucket, reset in seconds until full) and X-Quota-Limit/-Remaining.
+    The token and quota taken by a request that failed (4xx/5xx, e.g. an invalid URL or a full job queue)
+    are given back. The refund waits for the user's file lock, so it runs in a thread rather than on the event loop.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        response = await super().dispatch(request, *args, **kwargs)
+        rate_limit = getattr(self.request, 'quiz_rate_limit', None)
+
+        if rate_limit is None:
+            return response
+
+        remaining = rate_limit.remaining
+        quota_remaining = rate_limit.quota_remaining
+        if rate_limit.allowed and response.status_code >= 400:
+            await sync_to_async(refund)(self.request.user.id)
+            remaining += 1
+            quota_remaining += 1
+
+        response['X-RateLimit-Limit'] = str(rate_limit.limit)
+        response['X-RateLimit-Remaining'] = str(min(remaining, rate_limit.limit))
+        response['X-RateLimit-Reset'] = str(rate_limit.reset)
+        if rate_limit.quota:
+            response['X-Quota-Limit'] = str(rate_limit.quota)
+            response['X-Quota-Remaining'] = str(min(quota_remaining, rate_limit.quota))
+
+        return response
@@ -0,0 +1,160 @@
+from django.conf import settings
+
+import re
+import logging
+import threading
+import multiprocessing
+import numpy as np
+
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from .whisper_models import get_whisper_model
+from .scheduler import torch_threads
+
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+FRAME_SECONDS = 0.03
+WORD_RE = re.compile(r"[\w']+")
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def find_split_points(samples: np.ndarray, chunk_seconds: float, search_seconds: float) -> list[int]:
+    """
+    Return sample offsets that cut the audio into chunks of about chunk_seconds.
+    Each cut is moved to the quietest frame within search_seconds of the target position,
+    so chunks end in pauses rather than in the middle of a word.
+    """
+
+    frame = int(FRAME_SECONDS * SAMPLE_RATE)
+    frame_count = len(samples) // frame
+    if frame_count == 0:
+        return []
+
+    energy = np.sqrt(np.mean(samples[:frame_count * frame].reshape(frame_count, frame) ** 2, axis=1))
+
+    chunk_frames = int(chunk_seconds / FRAME_SECONDS)
+    search_frames = int(search_seconds / FRAME_SECONDS)
+    split_points = []
+    target = chunk_frames
+
+    while target < frame_count - search_frames:
+        window_start = max(target - search_frames, 1)
+        window_end = min(target + search_frames, frame_count - 1)
+        quietest = window_start + int(np.argmin(energy[window_start:window_end]))
+        split_points.append(quietest * frame)
+        target = quietest + chunk_frames
+
+    return split_points
+
+
+def split_audio(samples: np.ndarray, chunk_seconds: float, overlap_seconds: float) -> list[np.ndarray]:
+    """Split audio on silence into chunks that overlap the following chunk by overlap_seconds."""
+
+    overlap = int(overlap_seconds * SAMPLE_RATE)
+    bounds = [0] + find_split_points(samples, chunk_seconds, search_seconds=chunk_seconds * 0.1) + [len(samples)]
+
+    return [
+        samples[start:min(end + overlap, len(samples))]
+        for start, end in zip(bounds, bounds[1:])
+    ]
+
+
+def merge_transcripts(texts: list[str], max_overlap_words: int = 40) -> str:
+    """
+    Join chunk transcripts, dropping words repeated because of the chunk overlap.
+    The longest run of words that ends one chunk and starts the next is kept only once.
+    """
+
+    merged = []
+
+    for text in texts:
+        words = text.split()
+        normalized = [' '.join(WORD_RE.findall(word.lower())) for word in words]
+        tail = [' '.join(WORD_RE.findall(word.lower())) for word in merged[-max_overlap_words:]]
+
+        overlap = 0
+        for size in range(min(len(tail), len(normalized)), 0, -1):
+            if tail[-size:] == normalized[:size]:
+                overlap = size
+                break
+
+        merged.extend(words[overlap:])
+
+    return ' '.join(merged)
+
+
+def _init_chunk_worker(model_name: str, threads: int) -> None:
+    import torch
+
+    torch.set_num_threads(threads)
+
+    try:
+        get_whisper_model(model_name)
+    except Exception as e:
+        logger.warning(f"Failed to preload Whisper model in chunk worker: {str(e)}")
+
+
+def _transcribe_chunk(samples: np.ndarray, model_name: str) -> str:
+    return get_whisper_model(model_name).transcribe(samples)['text'].strip()
+
+
+def get_chunk_pool() -> ProcessPoolExecutor:
+    """
+    Return the process pool for chunk transcription, started on first use and kept for later jobs.
+    A chunked transcription holds one transcription slot, so the pool shares that slot's torch_threads()
+    cores: at most WHISPER_CHUNK_WORKERS processes, and no more processes than cores.
+    """
+
+    global _pool
+
+    with _pool_lock:
+        if _pool is None:
+            workers = max(1, min(settings.WHISPER_CHUNK_WORKERS, torch_threads()))
+            threads = max(1, torch_threads() // workers)
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_chunk_worker,
+                initargs=(settings.WHISPER_MODEL, threads),
+            )
+        return _pool
+
+
+def reset_chunk_pool() -> None:
+    """Discard the chunk pool, e.g. after a worker process was killed, so the next call starts a new one."""
+
+    global _pool
+
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def transcribe_chunked(samples: np.ndarray, model_name: str | None = None, executor: Executor | None = None) -> str:
+    """Transcribe long audio as overlapping chunks in parallel and stitch the text back together."""
+
+    model_name = model_name or settings.WHISPER_MODEL
+    chunks = split_audio(samples, settings.WHISPER_CHUNK_SECONDS, settings.WHISPER_CHUNK_OVERLAP_SECONDS)
+    executor = executor or get_chunk_pool()
+
+    logger.info(f"Transcribing {len(samples) / SAMPLE_RATE:.0f}s of audio in {len(chunks)} chunks")
+
+    try:
+        texts = list(executor.map(_transcribe_chunk, chunks, [model_name] * len(chunks)))
+    except BrokenProcessPool:
+        reset_chunk_pool()
+        raise
+
+    return merge_transcripts(texts)
+
+
+def should_transcribe_chunked(samples: np.ndarray) -> bool:
+    """Return whether audio is long enough for chunked transcription to pay off."""
+
+    return settings.WHISPER_CHUNKED and len(samples) / SAMPLE_RATE >= settings.WHISPER_CHUNK_MIN_DURATION
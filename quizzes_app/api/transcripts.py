@@ -0,0 +1,36 @@
+from quizzes_app.models import Transcript
+
+
+def get_cached_transcript(video_id: str, backends: list) -> str | None:
+    """
+    Return the stored transcript for a video from the first of the backends that has one,
+    or None if the video has not been transcribed by any of them yet.
+    """
+
+    keys = [backend.cache_key() for backend in backends]
+
+    stored = {
+        (model_name, model_version): text
+        for model_name, model_version, text in Transcript.objects
+        .filter(video_id=video_id, model_name__in=[model_name for model_name, _ in keys])
+        .values_list('model_name', 'model_version', 'text')
+    }
+
+    for key in keys:
+        if key in stored:
+            return stored[key]
+
+    return None
+
+
+def store_transcript(video_id: str, text: str, backend) -> None:
+    """Store a transcript under the backend's key; a concurrent worker storing the same video first is not an error."""
+
+    model_name, model_version = backend.cache_key()
+
+    Transcript.objects.get_or_create(
+        video_id=video_id,
+        model_name=model_name,
+        model_version=model_version,
+        defaults={'text': text},
+    )
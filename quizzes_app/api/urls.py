@@ -1,8 +1,12 @@
 from django.urls import path
-from .views import QuizView, QuizDetailView
+from .views import QuizView, QuizStreamView, QuizDetailView, QuizGenerationJobDetailView, QuizGenerationJobRetryView, metrics_view
 
 
 urlpatterns = [
     path('quizzes/', QuizView.as_view(), name='quizzes'),
+    path('quizzes/stream/', QuizStreamView.as_view(), name='quiz-stream'),
     path('quizzes/<int:pk>/', QuizDetailView.as_view(), name='quiz-detail'),
+    path('quizzes/jobs/<int:pk>/', QuizGenerationJobDetailView.as_view(), name='quiz-job-detail'),
+    path('quizzes/jobs/<int:pk>/retry/', QuizGenerationJobRetryView.as_view(), name='quiz-job-retry'),
+    path('internal/metrics/', metrics_view, name='metrics'),
 ]
@@ -2,17 +2,63 @@ from django.conf import settings
 
 import os
 import re
+import sys
 import uuid
 import json
 import logging
+import tempfile
+import subprocess
 import yt_dlp
 import whisper
+import numpy as np
 
-from google import genai
+from google.genai import types
+
+from .youtube import parse_youtube_url
+from .gemini import generate_content, generate_content_stream
+from .metrics import stage_span
+from .compaction import prepare_transcript
+from .checkpoints import Checkpoint
+from .streaming import QuizStreamParser
+from .scheduler import transcription_slot
+from .whisper_models import get_whisper_model
+from .transcription import SAMPLE_RATE, should_transcribe_chunked, transcribe_chunked
 
 
 logger = logging.getLogger(__name__)
 
+QUESTION_COUNT = 10
+
+QUESTION_SCHEMA = types.Schema(
+    type=types.Type.OBJECT,
+    properties={
+        'question_title': types.Schema(type=types.Type.STRING),
+        'question_options': types.Schema(type=types.Type.ARRAY, items=types.Schema(type=types.Type.STRING), min_items=4, max_items=4),
+        'answer': types.Schema(type=types.Type.STRING),
+    },
+    required=['question_title', 'question_options', 'answer'],
+    property_ordering=['question_title', 'question_options', 'answer'],
+)
+
+QUIZ_SCHEMA = types.Schema(
+    type=types.Type.OBJECT,
+    properties={
+        'title': types.Schema(type=types.Type.STRING),
+        'description': types.Schema(type=types.Type.STRING),
+        'questions': types.Schema(type=types.Type.ARRAY, items=QUESTION_SCHEMA, min_items=QUESTION_COUNT, max_items=QUESTION_COUNT),
+    },
+    required=['title', 'description', 'questions'],
+    property_ordering=['title', 'description', 'questions'],
+)
+
+REPAIR_PROMPT = """
+Your quiz has problems:
+{problems}
+
+Write {count} new question(s) about the transcript to replace them, in the same question format.
+Do not repeat a question of the quiz. Reply with a JSON array of exactly {count} question(s) only.
+"""
+
 if hasattr(settings, 'FFMPEG_PATH') and settings.FFMPEG_PATH:
     if os.path.exists(settings.FFMPEG_PATH):
         os.environ['PATH'] = settings.FFMPEG_PATH + os.pathsep + os.environ.get('PATH', '')
@@ -33,70 +79,180 @@ class TranscriptionError(Exception):
     pass
 
 
+class TranscriptUnavailable(TranscriptionError):
+    """Raised by a transcription backend that cannot transcribe a video (e.g. it has no captions)"""
+    pass
+
+
 class QuizGenerationError(Exception):
     """Raised when quiz generation from transcript fails"""
     pass
 
 
 def validate_youtube_url(url: str) -> bool:
-    """Validate if the URL is a valid YouTube URL."""
+    """Validate if the URL is a valid YouTube video URL."""
     
-    youtube_patterns = [
-        r'(https?://)?(www\.)?youtube\.com/watch\?v=[\w-]+',
-        r'(https?://)?(www\.)?youtu\.be/[\w-]+',
-        r'(https?://)?(www\.)?youtube\.com/embed/[\w-]+',
-    ]
-    
-    for pattern in youtube_patterns:
-        if re.match(pattern, url):
-            return True
-    return False
+    return parse_youtube_url(url) is not None
 
 
-def download_youtube_audio(video_url: str) -> str:
-    """Download audio from YouTube video."""
+def download_youtube_audio(video_url: str, filename_base: str | None = None) -> str:
+    """
+    Download audio from YouTube video.
+    The file is written to filename_base plus the audio extension (default: a temporary file in MEDIA_ROOT).
+    """
     
     try:
-        temp_filename = os.path.join(settings.MEDIA_ROOT, f'temp_audio_{uuid.uuid4().hex}')
-        
-        ydl_opts = {
-            'format': 'bestaudio/best',
-            'outtmpl': temp_filename + '.%(ext)s',
-            'quiet': True,
-            'noplaylist': True,
-        }
-        
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(video_url, download=True)
+        with stage_span('download', streaming=False) as span:
+            temp_filename = filename_base or os.path.join(settings.MEDIA_ROOT, f'temp_audio_{uuid.uuid4().hex}')
+            
+            ydl_opts = {
+                'format': 'bestaudio/best',
+                'outtmpl': temp_filename + '.%(ext)s',
+                'quiet': True,
+                'noplaylist': True,
+            }
+            
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                info = ydl.extract_info(video_url, download=True)
 
-            filename = ydl.prepare_filename(info)
-        
-        if not os.path.exists(filename):
-            raise FileNotFoundError(f"Downloaded file not found at {filename}")
-        
-        return filename
+                filename = ydl.prepare_filename(info)
+            
+            if not os.path.exists(filename):
+                raise FileNotFoundError(f"Downloaded file not found at {filename}")
+            
+            span['bytes'] = os.path.getsize(filename)
+            
+            return filename
         
     except Exception as e:
         raise YouTubeDownloadError(f"Failed to download YouTube audio: {str(e)}")
 
 
-def transcribe_audio(audio_path: str) -> str:
-    """Transcribe audio file to text using Whisper."""
+def stream_youtube_audio(video_url: str) -> np.ndarray:
+    """
+    Stream audio from a YouTube video into memory as 16 kHz mono samples.
+    yt-dlp writes the download to a pipe that ffmpeg decodes directly, so no file is written to disk.
+    """
+    
+    download_cmd = [
+        sys.executable, '-m', 'yt_dlp',
+        '--quiet', '--no-warnings', '--no-playlist',
+        '--format', 'bestaudio/best',
+        '--output', '-',
+        video_url,
+    ]
+    decode_cmd = [
+        'ffmpeg', '-nostdin', '-loglevel', 'error',
+        '-i', 'pipe:0',
+        '-f', 's16le', '-ac', '1', '-ar', str(SAMPLE_RATE),
+        'pipe:1',
+    ]
+    
+    try:
+        with stage_span('download', streaming=True) as span:
+            with tempfile.TemporaryFile() as download_log:
+                downloader = subprocess.Popen(download_cmd, stdout=subprocess.PIPE, stderr=download_log)
+                try:
+                    decoder = subprocess.Popen(decode_cmd, stdin=downloader.stdout, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+                finally:
+                    downloader.stdout.close()
+            
+                pcm, decode_errors = decoder.communicate()
+                downloader.wait()
+                download_log.seek(0)
+                download_errors = download_log.read()
+            
+            if downloader.returncode != 0:
+                raise RuntimeError(download_errors.decode(errors='replace').strip() or f"yt-dlp exited with {downloader.returncode}")
+            if decoder.returncode != 0:
+                raise RuntimeError(decode_errors.decode(errors='replace').strip() or f"ffmpeg exited with {decoder.returncode}")
+            if not pcm:
+                raise RuntimeError("No audio data received")
+            
+            span['bytes'] = len(pcm)
+            
+            return np.frombuffer(pcm, np.int16).astype(np.float32) / 32768.0
+        
+    except Exception as e:
+        raise YouTubeDownloadError(f"Failed to stream YouTube audio: {str(e)}")
+
+
+def transcribe_audio(audio: str | np.ndarray, model_name: str | None = None) -> str:
+    """
+    Transcribe an audio file or 16 kHz mono samples to text using a resident Whisper model.
+    Long audio is transcribed in parallel chunks when WHISPER_CHUNKED is enabled.
+    The transcription runs in one of the node's transcription slots (see scheduler.transcription_slot).
+    """
     
     try:
-        model = whisper.load_model("base")
-        result = model.transcribe(audio_path)
-        return result["text"]
+        with stage_span('transcribe') as span:
+            if isinstance(audio, str):
+                audio = whisper.load_audio(audio)
+            
+            span['audio_seconds'] = round(len(audio) / SAMPLE_RATE, 2)
+            span['chunked'] = should_transcribe_chunked(audio)
+            
+            with transcription_slot() as waited:
+                span['slot_wait'] = round(waited, 3)
+                
+                if span['chunked']:
+                    return transcribe_chunked(audio, model_name)
+                
+                model = get_whisper_model(model_name)
+                result = model.transcribe(audio)
+                return result["text"]
         
     except Exception as e:
         raise TranscriptionError(f"Failed to transcribe audio: {str(e)}")
 
 
-def generate_quiz_from_transcript(transcript: str, api_key: str) -> dict:
-    """Generate a quiz from transcript using Google Gemini API."""
+def validate_quiz_data(quiz_data: dict, question_count: int | None = QUESTION_COUNT) -> None:
+    """Validate the structure of quiz data; raises ValueError describing the first problem."""
     
-    try:
-        prompt = f"""
+    if not isinstance(quiz_data, dict) or 'title' not in quiz_data or 'description' not in quiz_data or 'questions' not in quiz_data:
+        raise ValueError("Invalid quiz structure: missing required fields")
+    
+    if not isinstance(quiz_data['title'], str) or not isinstance(quiz_data['description'], str):
+        raise ValueError("Invalid quiz structure: title and description must be strings")
+    
+    if not isinstance(quiz_data['questions'], list):
+        raise ValueError("Invalid quiz structure: questions must be a list")
+    
+    if question_count is not None and len(quiz_data['questions']) != question_count:
+        raise ValueError(f"Expected {question_count} questions, got {len(quiz_data['questions'])}")
+    
+    for i, question in enumerate(quiz_data['questions']):
+        validate_question(question, i + 1)
+
+
+def validate_question(question: dict, number: int) -> None:
+    """
+    Validate a single quiz question; raises ValueError.
+    The title and answer must be non-empty strings, the options a list of 4 distinct strings, and the answer one of the options.
+    """
+    
+    if not isinstance(question, dict) or 'question_title' not in question or 'question_options' not in question or 'answer' not in question:
+        raise ValueError(f"Question {number} has invalid structure")
+    
+    title, options, answer = question['question_title'], question['question_options'], question['answer']
+    
+    if not isinstance(title, str) or not title.strip():
+        raise ValueError(f"Question {number} must have a title")
+    
+    if not isinstance(options, list) or len(options) != 4:
+        raise ValueError(f"Question {number} must have exactly 4 options")
+    
+    if not all(isinstance(option, str) and option.strip() for option in options) or len(set(options)) != 4:
+        raise ValueError(f"Question {number} must have 4 distinct text options")
+    
+    if not isinstance(answer, str) or answer not in options:
+        raise ValueError(f"Question {number} must have an answer that is one of its options")
+
+
+def build_quiz_prompt(transcript: str) -> str:
+    """Return the Gemini prompt for generating a quiz from a transcript."""
+    
+    return f"""
 Based on the following transcript, generate a quiz in valid JSON format.
 
 The quiz must follow this exact structure:
@@ -124,33 +280,215 @@ Requirements:
 Transcript:
 {transcript}
 """
+
+
+def response_config(schema: types.Schema) -> types.GenerateContentConfig | None:
+    """Return the Gemini config for structured JSON output following schema (None with GEMINI_STRUCTURED_OUTPUT off)."""
+    
+    if not settings.GEMINI_STRUCTURED_OUTPUT:
+        return None
+    
+    return types.GenerateContentConfig(response_mime_type='application/json', response_schema=schema)
+
+
+def load_response_json(response_text: str):
+    """Parse the JSON of a Gemini response, without Markdown code fences; raises json.JSONDecodeError."""
+    
+    response_text = response_text.strip()
+    
+    if response_text.startswith('```'):
+        response_text = re.sub(r'^```(?:json)?\s*\n', '', response_text)
+        response_text = re.sub(r'\n```\s*$', '', response_text)
+    
+    return json.loads(response_text)
+
+
+def parse_quiz_response(response_text: str) -> dict:
+    """Parse and validate the quiz JSON of a Gemini response; raises ValueError (json.JSONDecodeError for invalid JSON)."""
+    
+    quiz_data = load_response_json(response_text)
+    
+    validate_quiz_data(quiz_data)
+    
+    return quiz_data
+
+
+def split_questions(questions: list) -> tuple[list[dict], list[str]]:
+    """
+    Return the valid questions (at most QUESTION_COUNT, without repeated titles) and a description of each problem,
+    including missing questions.
+    """
+    
+    valid = []
+    problems = []
+    titles = set()
+    
+    for i, question in enumerate(questions):
+        try:
+            validate_question(question, i + 1)
+        except ValueError as e:
+            problems.append(str(e))
+            continue
         
-        client = genai.Client(api_key=api_key)
-        
-        response = client.models.generate_content(model="gemini-2.5-flash", contents=prompt)
+        title = question['question_title'].strip().lower()
+        if title in titles:
+            problems.append(f"Question {i + 1} repeats an earlier question")
+        elif len(valid) < QUESTION_COUNT:
+            titles.add(title)
+            valid.append(question)
+    
+    if len(valid) < QUESTION_COUNT:
+        problems.append(f"Expected {QUESTION_COUNT} questions, got {len(valid)} valid ones")
+    
+    return valid, problems
+
+
+def load_partial_quiz(response_text: str) -> dict | None:
+    """Return the quiz of an invalid response if it can be repaired (valid JSON with title and description), else None."""
+    
+    try:
+        quiz_data = load_response_json(response_text)
+    except json.JSONDecodeError:
+        return None
+    
+    if not isinstance(quiz_data, dict) or not quiz_data.get('title') or 'description' not in quiz_data:
+        return None
+    if not isinstance(quiz_data.get('questions'), list):
+        quiz_data['questions'] = []
+    
+    return quiz_data
+
+
+def repair_quiz(api_key: str, prompt: str, quiz_data: dict) -> dict:
+    """
+    Keep the valid questions of a quiz and ask Gemini only for replacements of the missing or invalid ones.
+    The follow-up continues the conversation of the quiz prompt, so the transcript is not described again
+    and only the replacement questions are generated. Unusable replacements are dropped.
+    """
+    
+    valid, problems = split_questions(quiz_data['questions'])
+    count = QUESTION_COUNT - len(valid)
+    kept = {'title': quiz_data['title'], 'description': quiz_data['description'], 'questions': valid}
+    
+    logger.warning(f"Gemini returned an invalid quiz, asking for {count} replacement question(s): {'; '.join(problems)}")
+    
+    contents = [
+        types.Content(role='user', parts=[types.Part(text=prompt)]),
+        types.Content(role='model', parts=[types.Part(text=json.dumps(kept))]),
+        types.Content(role='user', parts=[types.Part(text=REPAIR_PROMPT.format(
+            problems='\n'.join(f'- {problem}' for problem in problems),
+            count=count,
+        ))]),
+    ]
+    schema = types.Schema(type=types.Type.ARRAY, items=QUESTION_SCHEMA, min_items=count, max_items=count)
+    
+    try:
+        replacements = load_response_json(generate_content(api_key, contents, response_config(schema)).text)
+    except json.JSONDecodeError as e:
+        logger.warning(f"Failed to parse replacement questions: {str(e)}")
+        replacements = []
+    
+    if isinstance(replacements, dict):
+        replacements = replacements.get('questions', [])
+    if not isinstance(replacements, list):
+        replacements = []
+    
+    kept['questions'] = split_questions(valid + replacements)[0]
+    return kept
+
+
+def stream_quiz_response(api_key: str, prompt: str, config, checkpoint: Checkpoint) -> str:
+    """
+    Generate a quiz with the Gemini streaming API and return the raw response text.
+    The title, the description and every valid question are saved on the checkpoint ('stream') as soon as
+    they are complete, so a stream relaying the run can send them before the whole quiz has been generated.
+    """
+    
+    parser = QuizStreamParser()
+    chunks = []
+    progress = {'questions': []}
+    titles = set()
+    
+    for chunk in generate_content_stream(api_key, prompt, config):
+        chunks.append(chunk)
+        if parser is None:
+            continue
         
-        response_text = response.text.strip()
+        try:
+            events = parser.feed(chunk)
+        except ValueError:
+            parser = None
+            continue
         
-        if response_text.startswith('```'):
-            response_text = re.sub(r'^```(?:json)?\s*\n', '', response_text)
-            response_text = re.sub(r'\n```\s*$', '', response_text)
+        changed = False
+        for event, value in events:
+            if event == 'field':
+                name, value = value
+                if name in ('title', 'description') and isinstance(value, str):
+                    progress[name] = value
+                    changed = True
+                continue
+            
+            try:
+                validate_question(value, len(parser.data['questions']))
+            except ValueError:
+                continue
+            
+            title = value['question_title'].strip().lower()
+            if title not in titles and len(progress['questions']) < QUESTION_COUNT:
+                titles.add(title)
+                progress['questions'].append({field: value[field] for field in ('question_title', 'question_options', 'answer')})
+                changed = True
         
-        quiz_data = json.loads(response_text)
+        if changed:
+            checkpoint.save('stream', prompt, {**progress, 'questions': list(progress['questions'])})
+    
+    return ''.join(chunks)
+
+
+def generate_quiz_from_transcript(transcript: str, api_key: str, checkpoint: Checkpoint | None = None) -> dict:
+    """
+    Generate a quiz from transcript using Google Gemini API.
+    The compacted transcript and the raw Gemini output are checkpointed: a resumed run reuses them.
+    The quiz is streamed from Gemini and its questions are checkpointed as they arrive (see stream_quiz_response).
+    An invalid response is repaired (up to QUIZ_GENERATION_ATTEMPTS Gemini calls in total): the valid
+    questions are kept and only the missing or invalid ones are asked for again. Responses that are not
+    a repairable quiz at all are asked for again in full.
+    """
+    
+    checkpoint = checkpoint or Checkpoint()
+    
+    try:
+        transcript = checkpoint.resume('compact', transcript, lambda: prepare_transcript(transcript, api_key))
         
-        if 'title' not in quiz_data or 'description' not in quiz_data or 'questions' not in quiz_data:
-            raise ValueError("Invalid quiz structure: missing required fields")
+        prompt = build_quiz_prompt(transcript)
+        config = response_config(QUIZ_SCHEMA)
         
-        if len(quiz_data['questions']) != 10:
-            raise ValueError(f"Expected 10 questions, got {len(quiz_data['questions'])}")
+        checkpoint.start('generate')
+        response_text = checkpoint.get('generate', prompt)
+        calls = 0
         
-        for i, question in enumerate(quiz_data['questions']):
-            if 'question_title' not in question or 'question_options' not in question or 'answer' not in question:
-                raise ValueError(f"Question {i+1} has invalid structure")
-            
-            if len(question['question_options']) != 4:
-                raise ValueError(f"Question {i+1} must have exactly 4 options")
+        if response_text is None:
+            response_text = stream_quiz_response(api_key, prompt, config, checkpoint)
+            calls += 1
+            checkpoint.save('generate', prompt, response_text)
         
-        return quiz_data
+        while True:
+            try:
+                return parse_quiz_response(response_text)
+            except ValueError as e:
+                if calls >= settings.QUIZ_GENERATION_ATTEMPTS:
+                    raise
+                
+                quiz_data = load_partial_quiz(response_text)
+                if quiz_data is None:
+                    logger.warning(f"Gemini returned an invalid quiz, asking again: {str(e)}")
+                    response_text = stream_quiz_response(api_key, prompt, config, checkpoint)
+                else:
+                    response_text = json.dumps(repair_quiz(api_key, prompt, quiz_data))
+                
+                calls += 1
+                checkpoint.save('generate', prompt, response_text)
         
     except json.JSONDecodeError as e:
         raise QuizGenerationError(f"Failed to parse JSON from Gemini response: {str(e)}")
@@ -1,69 +1,297 @@
-from rest_framework.views import APIView
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden, StreamingHttpResponse
+from django.utils import timezone
+
+from asgiref.sync import sync_to_async
+
 from rest_framework.response import Response
-from rest_framework import status, serializers
+from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import JSONRenderer
 
-from quizzes_app.models import Quiz
+import hmac
+import math
+import asyncio
+import logging
+
+from core.views import AsyncAPIView
+from quizzes_app.models import Quiz, QuizGenerationJob, QuizPipelineRun
 
 from .permissions import IsOwner
-from .serializers import QuizCreateSerializer, QuizSerializer, QuizDetailSerializer
+from .pagination import QuizCursorPagination
+from .renderers import EventStreamRenderer
+from .metrics import CONTENT_TYPE, registry
+from .scheduler import admit_quiz_job
+from .throttling import QuizCreationThrottle, RateLimitHeadersMixin
+from .streaming import format_sse
+from .youtube import get_video_id
+from .serializers import (
+    QuizCreateSerializer,
+    QuizSerializer,
+    QuizDetailSerializer,
+    QuizGenerationJobSerializer,
+    parse_fields_param,
+)
+
 
+logger = logging.getLogger(__name__)
 
-class QuizView(APIView):
+
+STREAM_STAGES = {'transcribe': 'transcribing', 'compact': 'generating', 'generate': 'generating'}
+QUESTION_FIELDS = ('question_title', 'question_options', 'answer')
+
+
+class QuizView(RateLimitHeadersMixin, AsyncAPIView):
     permission_classes = [IsAuthenticated]
+    throttle_classes = [QuizCreationThrottle]
+    
+    async def get(self, request):
+        return await sync_to_async(self.list_quizzes)(request)
     
-    def get(self, request):
-        quizzes = Quiz.objects.filter(user=request.user.id)
-        serializer = QuizSerializer(quizzes, many=True)
+    def list_quizzes(self, request):
+        """
+        List the user's quizzes.
+        Questions are loaded in one prefetch query and skipped entirely when ?fields= leaves them out;
+        ?cursor= or ?page_size= switch to cursor pagination.
+        """
+        
+        fields = parse_fields_param(request)
+        quizzes = Quiz.objects.filter(user_id=request.user.id)
+        
+        if fields is None or 'questions' in fields:
+            quizzes = quizzes.prefetch_related('questions')
+        
+        paginator = QuizCursorPagination()
+        if paginator.is_requested(request):
+            page = paginator.paginate_queryset(quizzes, request, view=self)
+            serializer = QuizSerializer(page, many=True, fields=fields)
+            return paginator.get_paginated_response(serializer.data)
+        
+        serializer = QuizSerializer(quizzes, many=True, fields=fields)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
-    def post(self, request):
-        """Create a new quiz from YouTube URL."""
+    async def post(self, request):
+        """
+        Queue a quiz generation job for a YouTube URL and return it for status polling.
+        Responds with 429 and Retry-After while the job queue (or the user's share of it) is full.
+        """
         
         serializer = QuizCreateSerializer(data=request.data, context={'request': request})
         
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         
+        job = await sync_to_async(admit_quiz_job)(request.user.id, serializer.save)
+        job_serializer = QuizGenerationJobSerializer(job)
+        
+        return Response(job_serializer.data, status=status.HTTP_202_ACCEPTED)
+
+
+class QuizGenerationJobDetailView(AsyncAPIView):
+    permission_classes = [IsAuthenticated]
+    
+    async def get(self, request, pk):
+        """
+        Return the status of a quiz generation job, including the quiz once completed.
+        With ?wait=<seconds> the request is held open (long polling) until the job has finished
+        or the time is up; waiting needs no thread, so idle pollers are cheap under ASGI.
+        """
+        
+        jobs = QuizGenerationJob.objects.filter(pk=pk, user=request.user.id)
+        
         try:
-            quiz = serializer.save()
-            quiz = Quiz.objects.prefetch_related('questions').get(pk=quiz.pk)
+            wait = float(request.query_params.get('wait', 0))
+        except ValueError:
+            wait = math.nan
+        if not math.isfinite(wait):
+            return Response({"detail": "Invalid wait parameter."}, status=status.HTTP_400_BAD_REQUEST)
+        wait = min(max(wait, 0), settings.QUIZ_JOB_MAX_WAIT)
+        
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + wait
+        finished = {QuizGenerationJob.Status.COMPLETED, QuizGenerationJob.Status.FAILED}
+        
+        while True:
+            job_status = await jobs.values_list('status', flat=True).afirst()
+            if job_status is None:
+                return Response({"detail": "Job not found."}, status=status.HTTP_404_NOT_FOUND)
+            remaining = deadline - loop.time()
+            if job_status in finished or remaining <= 0:
+                break
+            await asyncio.sleep(min(settings.QUIZ_JOB_POLL_INTERVAL, remaining))
+        
+        job = await jobs.select_related('quiz').prefetch_related('quiz__questions').afirst()
+        
+        serializer = QuizGenerationJobSerializer(job)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class QuizGenerationJobRetryView(AsyncAPIView):
+    permission_classes = [IsAuthenticated]
+    
+    async def post(self, request, pk):
+        """
+        Queue a failed quiz generation job again.
+        The pipeline resumes at the stage that failed: the transcript and compacted transcript are reused.
+        """
+        
+        jobs = QuizGenerationJob.objects.filter(pk=pk, user=request.user.id)
+        now = timezone.now()
+        
+        retried = await jobs.filter(status=QuizGenerationJob.Status.FAILED).aupdate(
+            status=QuizGenerationJob.Status.PENDING,
+            error='',
+            started_at=None,
+            finished_at=None,
+            retried_at=now,
+            updated_at=now,
+        )
+        
+        job = await jobs.select_related('quiz').afirst()
+        if job is None:
+            return Response({"detail": "Job not found."}, status=status.HTTP_404_NOT_FOUND)
+        if not retried:
+            return Response({"detail": "Only failed jobs can be retried."}, status=status.HTTP_409_CONFLICT)
+        
+        serializer = QuizGenerationJobSerializer(job)
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+
+
+class QuizStreamView(RateLimitHeadersMixin, AsyncAPIView):
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [QuizCreationThrottle]
+    renderer_classes = [JSONRenderer, EventStreamRenderer]
+    
+    async def post(self, request):
+        """
+        Queue a quiz generation job for a YouTube URL and stream its progress as Server-Sent Events.
+        The quiz is generated by the quiz workers like any other job; the stream relays the job's state and its questions.
+        """
+        
+        serializer = QuizCreateSerializer(data=request.data, context={'request': request})
+        
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        job = await sync_to_async(admit_quiz_job)(request.user.id, serializer.save)
+        
+        response = StreamingHttpResponse(self.stream_events(job), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+    
+    async def stream_events(self, job):
+        """
+        Relay the progress of a quiz generation job: 'job' with its ID, 'status' whenever its stage changes,
+        and the title, description and each question as soon as the quiz worker has saved them on the pipeline
+        run while Gemini streams the quiz. Once the job has completed, the parts not sent yet follow, then the
+        saved quiz in 'done', which is authoritative (a repaired quiz may replace streamed questions). A failed
+        job ends the stream with 'error'. The job is polled every QUIZ_JOB_POLL_INTERVAL seconds; waiting needs
+        no thread. After QUIZ_STREAM_MAX_DURATION seconds the stream ends with 'timeout', and the client
+        polls the job instead, as does a client that disconnects.
+        """
+        
+        yield format_sse('job', {'id': job.pk})
+        
+        jobs = QuizGenerationJob.objects.filter(pk=job.pk)
+        runs = QuizPipelineRun.objects.filter(video_id=get_video_id(job.video_url))
+        stage = None
+        sent = set()
+        
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.QUIZ_STREAM_MAX_DURATION
+        
+        while True:
+            job_status, error, quiz_id = await jobs.values_list('status', 'error', 'quiz_id').aget()
             
-            quiz_serializer = QuizDetailSerializer(quiz)
+            if job_status == QuizGenerationJob.Status.COMPLETED:
+                quiz = await Quiz.objects.prefetch_related('questions').aget(pk=quiz_id)
+                data = QuizDetailSerializer(quiz).data
+                questions = [{field: question[field] for field in QUESTION_FIELDS} for question in data['questions']]
+                for event in self.progress_events({**data, 'questions': questions}, sent):
+                    yield event
+                yield format_sse('done', data)
+                return
             
-            return Response(quiz_serializer.data, status=status.HTTP_201_CREATED)
+            if job_status == QuizGenerationJob.Status.FAILED:
+                yield format_sse('error', {'detail': error})
+                return
             
-        except serializers.ValidationError as e:
-            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
-        except Exception as e:
-            return Response({"detail": f"Internal server error: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            current = 'queued'
+            progress = None
+            if job_status == QuizGenerationJob.Status.RUNNING:
+                run_stage, progress = await runs.values_list('stage', 'checkpoint__stream__value').afirst() or (None, None)
+                current = STREAM_STAGES.get(run_stage, 'transcribing')
+            
+            if current != stage:
+                stage = current
+                yield format_sse('status', {'stage': stage})
+            
+            for event in self.progress_events(progress, sent):
+                yield event
+            
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                yield format_sse('timeout', {'id': job.pk, 'detail': "Stream time limit reached; poll the job for the quiz."})
+                return
+            await asyncio.sleep(min(settings.QUIZ_JOB_POLL_INTERVAL, remaining))
+    
+    def progress_events(self, quiz_data, sent):
+        """Return the events for the title, description and questions of quiz_data that were not sent yet (tracked in sent)."""
+        
+        events = []
+        if not quiz_data:
+            return events
+        
+        for name in ('title', 'description'):
+            if name in quiz_data and name not in sent:
+                sent.add(name)
+                events.append(format_sse('field', {'name': name, 'value': quiz_data[name]}))
+        
+        for question in quiz_data.get('questions', []):
+            key = ('question', question['question_title'].strip().lower())
+            if key not in sent:
+                sent.add(key)
+                events.append(format_sse('question', question))
+        
+        return events
 
 
-class QuizDetailView(APIView):
+class QuizDetailView(AsyncAPIView):
     permission_classes = [IsAuthenticated, IsOwner]
     
-    def get_object(self, pk):
-        """Helper method to get quiz object."""
+    async def get_object(self, pk, questions=True):
+        """
+        Helper method to get a quiz of the requesting user.
+        The lookup is scoped to the user, so questions are only loaded for quizzes the user owns;
+        a quiz of another user is reported as forbidden without loading it.
+        """
         
-        try:
-            quiz = Quiz.objects.prefetch_related('questions').get(pk=pk)
-            self.check_object_permissions(self.request, quiz)
-            return quiz
-        except Quiz.DoesNotExist:
+        quizzes = Quiz.objects.filter(pk=pk, user_id=self.request.user.id)
+        if questions:
+            quizzes = quizzes.prefetch_related('questions')
+        
+        quiz = await quizzes.afirst()
+        if quiz is None:
+            if await Quiz.objects.filter(pk=pk).aexists():
+                self.permission_denied(self.request)
             return None
+        
+        self.check_object_permissions(self.request, quiz)
+        return quiz
     
-    def get(self, request, pk):
-        quiz = self.get_object(pk)
+    async def get(self, request, pk):
+        quiz = await self.get_object(pk)
         if not quiz:
             return Response({"detail": "Quiz not found."}, status=status.HTTP_404_NOT_FOUND)
         
         serializer = QuizSerializer(quiz)
         return Response(serializer.data, status=status.HTTP_200_OK)
     
-    def patch(self, request, pk):
+    async def patch(self, request, pk):
         """Update quiz title and/or description."""
         
-        quiz = self.get_object(pk)
+        quiz = await self.get_object(pk)
         if not quiz:
             return Response({"detail": "Quiz not found."}, status=status.HTTP_404_NOT_FOUND)
         
@@ -76,18 +304,32 @@ class QuizDetailView(APIView):
         for field, value in update_data.items():
             setattr(quiz, field, value)
         
-        quiz.save()
+        await quiz.asave()
         
         serializer = QuizSerializer(quiz)
         return Response(serializer.data, status=status.HTTP_200_OK)
     
-    def delete(self, request, pk):
+    async def delete(self, request, pk):
         """Delete a quiz and all its questions."""
         
-        quiz = self.get_object(pk)
+        quiz = await self.get_object(pk, questions=False)
         if not quiz:
             return Response({"detail": "Quiz not found."}, status=status.HTTP_404_NOT_FOUND)
         
-        quiz.delete()
+        await quiz.adelete()
         return Response(status=status.HTTP_204_NO_CONTENT)
-    
\ No newline at end of file
+
+
+async def metrics_view(request):
+    """
+    Expose the pipeline metrics of this process in the Prometheus text format.
+    Requires the METRICS_TOKEN bearer token; without a configured token the endpoint is closed.
+    The client address is not trusted, since behind a reverse proxy every request comes from localhost.
+    Metrics are per process, so a scrape only sees the counters of the web process that served it.
+    """
+    
+    token = settings.METRICS_TOKEN
+    if not token or not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponseForbidden()
+    
+    return HttpResponse(registry.render(), content_type=CONTENT_TYPE)
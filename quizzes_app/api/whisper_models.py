@@ -0,0 +1,101 @@
+from django.conf import settings
+
+import logging
+import threading
+import whisper
+
+from collections import OrderedDict
+
+
+logger = logging.getLogger(__name__)
+
+
+def model_memory_bytes(model) -> int:
+    """Return the memory held by a model's parameters and buffers in bytes."""
+
+    tensors = list(model.parameters()) + list(model.buffers())
+    return sum(tensor.numel() * tensor.element_size() for tensor in tensors)
+
+
+class WhisperModelRegistry:
+    """
+    Process-wide cache of loaded Whisper models.
+    Each model size is loaded once and kept resident; when the memory cap is exceeded
+    the least recently used models are evicted.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._models = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.Lock()
+        self._load_locks = {}
+
+    def get(self, name: str):
+        """Return the model for the given size, loading it on first use."""
+
+        with self._lock:
+            if name in self._models:
+                self._models.move_to_end(name)
+                return self._models[name]
+            load_lock = self._load_locks.setdefault(name, threading.Lock())
+
+        with load_lock:
+            with self._lock:
+                if name in self._models:
+                    self._models.move_to_end(name)
+                    return self._models[name]
+
+            model = whisper.load_model(name)
+            size = model_memory_bytes(model)
+            logger.info(f"Loaded Whisper model '{name}' ({size / 1024 ** 2:.0f} MB)")
+
+            with self._lock:
+                self._models[name] = model
+                self._sizes[name] = size
+                self._evict(keep=name)
+
+            return model
+
+    def preload(self, names: list[str]) -> None:
+        """Load the given model sizes ahead of the first transcription."""
+
+        for name in names:
+            self.get(name)
+
+    def loaded(self) -> list[str]:
+        """Return the resident model sizes, least recently used first."""
+
+        with self._lock:
+            return list(self._models)
+
+    def clear(self) -> None:
+        """Drop all resident models."""
+
+        with self._lock:
+            self._models.clear()
+            self._sizes.clear()
+
+    def _evict(self, keep: str) -> None:
+        while sum(self._sizes.values()) > self.max_bytes and len(self._models) > 1:
+            name = next(iter(self._models))
+            if name == keep:
+                break
+            self._models.pop(name)
+            self._sizes.pop(name)
+            logger.info(f"Evicted Whisper model '{name}' from the model cache")
+
+
+model_registry = WhisperModelRegistry(settings.WHISPER_MODEL_CACHE_MAX_BYTES)
+
+
+def get_whisper_model(name: str | None = None):
+    """Return a resident Whisper model, defaulting to the configured WHISPER_MODEL."""
+
+    return model_registry.get(name or settings.WHISPER_MODEL)
+
+
+def preload_whisper_models() -> None:
+    """Warm up the model cache with all configured WHISPER_MODELS."""
+
+    model_registry.preload(settings.WHISPER_MODELS)
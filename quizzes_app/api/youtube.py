@@ -0,0 +1,90 @@
+import re
+
+from dataclasses import dataclass
+from urllib.parse import urlsplit, parse_qs
+
+
+YOUTUBE_HOSTS = {
+    'youtube.com',
+    'www.youtube.com',
+    'm.youtube.com',
+    'music.youtube.com',
+    'youtube-nocookie.com',
+    'www.youtube-nocookie.com',
+}
+SHORT_LINK_HOSTS = {'youtu.be', 'www.youtu.be'}
+VIDEO_PATH_PREFIXES = {'embed', 'shorts', 'live', 'v'}
+
+VIDEO_ID_RE = re.compile(r'^[A-Za-z0-9_-]{11}$')
+TIMESTAMP_RE = re.compile(r'^(?:(\d+)h)?(?:(\d+)m)?(?:(\d+)s?)?$')
+
+
+@dataclass(frozen=True)
+class VideoRef:
+    """Normalised reference to a YouTube video."""
+
+    video_id: str
+    start_seconds: int = 0
+
+    @property
+    def canonical_url(self) -> str:
+        return f'https://www.youtube.com/watch?v={self.video_id}'
+
+
+def parse_timestamp(value: str) -> int:
+    """Convert a YouTube start offset ('90', '90s', '1m30s', '1h2m3s') to seconds."""
+
+    match = TIMESTAMP_RE.match(value.strip().lower()) if value else None
+    if not match:
+        return 0
+
+    hours, minutes, seconds = (int(part) if part else 0 for part in match.groups())
+    return hours * 3600 + minutes * 60 + seconds
+
+
+def parse_youtube_url(url: str) -> VideoRef | None:
+    """
+    Parse watch, youtu.be, embed, shorts and live URLs into a VideoRef.
+    Returns None if the URL does not point to a YouTube video.
+    """
+
+    if not url:
+        return None
+
+    url = url.strip()
+    if '://' not in url:
+        url = f'https://{url}'
+
+    try:
+        parts = urlsplit(url)
+        host = (parts.hostname or '').lower()
+    except ValueError:
+        return None
+
+    if parts.scheme not in ('http', 'https'):
+        return None
+
+    query = parse_qs(parts.query)
+    segments = [segment for segment in parts.path.split('/') if segment]
+    video_id = None
+
+    if host in SHORT_LINK_HOSTS and segments:
+        video_id = segments[0]
+    elif host in YOUTUBE_HOSTS:
+        if segments == ['watch']:
+            video_id = query.get('v', [None])[0]
+        elif len(segments) >= 2 and segments[0] in VIDEO_PATH_PREFIXES:
+            video_id = segments[1]
+
+    if not video_id or not VIDEO_ID_RE.match(video_id):
+        return None
+
+    start = query.get('t') or query.get('start') or [parts.fragment.removeprefix('t=')]
+    return VideoRef(video_id=video_id, start_seconds=parse_timestamp(start[0]))
+
+
+def get_video_id(url: str) -> str:
+    """Return the video ID of a YouTube URL, or '' if the URL does not point to a YouTube video."""
+
+    video_ref = parse_youtube_url(url)
+    return video_ref.video_id if video_ref else ''
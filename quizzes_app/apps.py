@@ -1,5 +1,23 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.db.models.signals import pre_save
+
+import os
 
 
 class QuizzesAppConfig(AppConfig):
     name = 'quizzes_app'
+
+    def ready(self):
+        from .models import Quiz
+        from .api.services import fill_quiz_video_id
+
+        pre_save.connect(fill_quiz_video_id, sender=Quiz)
+
+        # tiktoken reads its cache directory from the environment when it loads an encoding
+        os.environ['TIKTOKEN_CACHE_DIR'] = settings.TIKTOKEN_CACHE_DIR
+
+        if settings.WHISPER_PRELOAD:
+            from .api.whisper_models import preload_whisper_models
+
+            preload_whisper_models()
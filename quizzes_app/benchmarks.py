@@ -0,0 +1,276 @@
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.contrib.auth.hashers import make_password
+
+from rest_framework.test import APIClient
+
+import os
+import json
+import time
+import statistics
+import numpy as np
+
+from types import SimpleNamespace
+from contextlib import ExitStack
+from unittest.mock import patch
+
+from quizzes_app.models import Quiz, Question
+from quizzes_app.api.pipeline import generate_quiz_data
+from quizzes_app.api.services import create_quiz_with_questions
+
+
+BENCHMARK_PASSWORD = 'benchmark-password'
+STUB_AUDIO_SECONDS = 60
+STUB_AUDIO_BYTES = 64 * 1024
+STUB_TRANSCRIPT = ' '.join(f"Sentence {i} explains a fact about photosynthesis in plants." for i in range(150))
+
+
+def stub_quiz_data() -> dict:
+    return {
+        'title': 'Benchmark Quiz',
+        'description': 'A quiz generated by the stubbed pipeline',
+        'questions': [
+            {
+                'question_title': f'Question {i + 1}?',
+                'question_options': ['Option A', 'Option B', 'Option C', 'Option D'],
+                'answer': 'Option A',
+            }
+            for i in range(10)
+        ],
+    }
+
+
+class StubYoutubeDL:
+    """Stand-in for yt_dlp.YoutubeDL that "downloads" without network access."""
+
+    def __init__(self, options):
+        self.options = options
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def extract_info(self, url, download=True):
+        info = {'id': 'stub', 'ext': 'm4a'}
+        path = self.prepare_filename(info)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as file:
+            file.write(b'\0' * STUB_AUDIO_BYTES)
+        return info
+
+    def prepare_filename(self, info):
+        return self.options['outtmpl'] % info
+
+
+class StubWhisperModel:
+    def transcribe(self, audio):
+        return {'text': STUB_TRANSCRIPT}
+
+
+class StubGeminiModels:
+    def generate_content(self, model, contents, config=None):
+        return SimpleNamespace(text=json.dumps(stub_quiz_data()), usage_metadata=None)
+
+    def generate_content_stream(self, model, contents, config=None):
+        return iter([self.generate_content(model, contents, config)])
+
+
+def stub_pipeline(stack: ExitStack) -> None:
+    """Replace the network and model boundaries of the pipeline (yt-dlp, Whisper, Gemini) with local stubs."""
+
+    stack.enter_context(patch('quizzes_app.api.utils.yt_dlp.YoutubeDL', StubYoutubeDL))
+    stack.enter_context(patch('quizzes_app.api.utils.whisper.load_audio', return_value=np.zeros(STUB_AUDIO_SECONDS * 16000, dtype=np.float32)))
+    stack.enter_context(patch('quizzes_app.api.utils.get_whisper_model', return_value=StubWhisperModel()))
+    stack.enter_context(patch('quizzes_app.api.gemini.get_gemini_client', return_value=SimpleNamespace(models=StubGeminiModels())))
+
+
+def seed(users: int, quizzes_per_user: int, questions_per_quiz: int = 10) -> list[User]:
+    """Create users, quizzes and questions with bulk inserts."""
+
+    password = make_password(BENCHMARK_PASSWORD)
+    created_users = User.objects.bulk_create([
+        User(username=f'bench_user_{i}', email=f'bench_user_{i}@example.com', password=password)
+        for i in range(users)
+    ])
+
+    quizzes = Quiz.objects.bulk_create([
+        Quiz(
+            user=user,
+            title=f'Quiz {j}',
+            description='Seeded benchmark quiz',
+            video_url=f'https://www.youtube.com/watch?v=seed{j:07d}',
+            video_id=f'seed{j:07d}',
+        )
+        for user in created_users
+        for j in range(quizzes_per_user)
+    ])
+
+    Question.objects.bulk_create([
+        Question(
+            quiz=quiz,
+            question_title=f'Question {k + 1}?',
+            question_options=['Option A', 'Option B', 'Option C', 'Option D'],
+            answer='Option A',
+        )
+        for quiz in quizzes
+        for k in range(questions_per_quiz)
+    ])
+
+    return created_users
+
+
+def summarize(durations: list[float], errors: int) -> dict:
+    """Return throughput and latency percentiles (in milliseconds) of a scenario."""
+
+    ordered = sorted(durations)
+
+    def percentile(p):
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))] * 1000
+
+    total = sum(durations)
+    return {
+        'requests': len(durations),
+        'errors': errors,
+        'throughput': round(len(durations) / total, 2) if total else None,
+        'mean_ms': round(statistics.fmean(durations) * 1000, 3),
+        'p50_ms': round(percentile(50), 3),
+        'p90_ms': round(percentile(90), 3),
+        'p99_ms': round(percentile(99), 3),
+        'min_ms': round(ordered[0] * 1000, 3),
+        'max_ms': round(ordered[-1] * 1000, 3),
+    }
+
+
+def measure(iterations: int, prepare, run, expected_status: int | None = None) -> dict:
+    """Time run(prepare(i)) for each iteration; preparation is not timed."""
+
+    durations = []
+    errors = 0
+
+    for i in range(iterations):
+        argument = prepare(i)
+        start = time.perf_counter()
+        result = run(argument)
+        durations.append(time.perf_counter() - start)
+        if expected_status is not None and result.status_code != expected_status:
+            errors += 1
+
+    return summarize(durations, errors)
+
+
+def login(client: APIClient, username: str):
+    return client.post(reverse('login'), {'username': username, 'password': BENCHMARK_PASSWORD}, format='json')
+
+
+def run_benchmarks(users: int, quizzes_per_user: int, iterations: int, pipeline_runs: int) -> dict:
+    """
+    Seed the database and measure the API scenarios and the stubbed creation pipeline.
+    Requests go through the full middleware and cookie authentication, like a browser client.
+    """
+
+    seeded_users = seed(users, quizzes_per_user)
+    clients = []
+    for user in seeded_users:
+        client = APIClient()
+        login(client, user.username)
+        clients.append((user, client))
+
+    def client_for(i):
+        return clients[i % len(clients)]
+
+    def owned_quiz_id(i):
+        user, _ = client_for(i)
+        return Quiz.objects.filter(user=user).order_by('id').values_list('id', flat=True)[i // len(clients) % quizzes_per_user]
+
+    def extra_quiz(i):
+        user, client = client_for(i)
+        quiz, _ = create_quiz_with_questions(user, 'https://www.youtube.com/watch?v=deleteme000', stub_quiz_data())
+        return client, quiz.id
+
+    def fresh_login(i):
+        user, _ = client_for(i)
+        client = APIClient()
+        login(client, user.username)
+        return client
+
+    results = {
+        'quiz_list': measure(
+            iterations,
+            lambda i: client_for(i)[1],
+            lambda client: client.get(reverse('quizzes')),
+            expected_status=200,
+        ),
+        'quiz_detail': measure(
+            iterations,
+            lambda i: (client_for(i)[1], owned_quiz_id(i)),
+            lambda args: args[0].get(reverse('quiz-detail', kwargs={'pk': args[1]})),
+            expected_status=200,
+        ),
+        'quiz_patch': measure(
+            iterations,
+            lambda i: (client_for(i)[1], owned_quiz_id(i)),
+            lambda args: args[0].patch(reverse('quiz-detail', kwargs={'pk': args[1]}), {'title': 'Renamed'}, format='json'),
+            expected_status=200,
+        ),
+        'quiz_delete': measure(
+            iterations,
+            extra_quiz,
+            lambda args: args[0].delete(reverse('quiz-detail', kwargs={'pk': args[1]})),
+            expected_status=204,
+        ),
+        'login': measure(
+            iterations,
+            lambda i: (APIClient(), client_for(i)[0].username),
+            lambda args: login(*args),
+            expected_status=200,
+        ),
+        'token_refresh': measure(
+            iterations,
+            fresh_login,
+            lambda client: client.post(reverse('token_refresh')),
+            expected_status=200,
+        ),
+    }
+
+    with ExitStack() as stack:
+        stub_pipeline(stack)
+        user = seeded_users[0]
+        results['pipeline'] = measure(
+            pipeline_runs,
+            lambda i: f'https://www.youtube.com/watch?v=bench{i:06d}',
+            lambda url: create_quiz_with_questions(user, url, generate_quiz_data(url)),
+        )
+
+    return results
+
+
+def compare_results(baseline: dict, current: dict, max_regression: float) -> tuple[list[str], list[str]]:
+    """
+    Compare two benchmark runs scenario by scenario.
+    Returns report lines and the regressions: scenarios whose p50 or p90 latency grew by more
+    than max_regression (e.g. 0.2 for 20%).
+    """
+
+    lines = []
+    regressions = []
+
+    for scenario, stats in current['results'].items():
+        before = baseline.get('results', {}).get(scenario)
+        if not before:
+            lines.append(f"{scenario}: no baseline")
+            continue
+
+        changes = []
+        for metric in ('p50_ms', 'p90_ms'):
+            if not before[metric]:
+                continue
+            change = (stats[metric] - before[metric]) / before[metric]
+            changes.append(f"{metric} {before[metric]:.2f} -> {stats[metric]:.2f} ({change:+.1%})")
+            if change > max_regression:
+                regressions.append(f"{scenario} {metric} {change:+.1%}")
+
+        lines.append(f"{scenario}: " + ', '.join(changes))
+
+    return lines, regressions
@@ -0,0 +1,97 @@
+from django.conf import settings
+from django.db import connection
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+import json
+import django
+import platform
+import subprocess
+
+from datetime import datetime, timezone
+
+from quizzes_app.benchmarks import run_benchmarks, compare_results
+
+
+class Command(BaseCommand):
+    """
+    Management command that benchmarks the quiz API and the quiz creation pipeline.
+    Runs against a freshly created test database seeded with users x quizzes x 10 questions; yt-dlp,
+    Whisper and Gemini are replaced with local stubs. Results are written as JSON and can be compared
+    with a previous run to catch performance regressions.
+    """
+
+    help = 'Benchmark the quiz API and pipeline on a seeded test database and report latency as JSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=5, help='Number of seeded users')
+        parser.add_argument('--quizzes', type=int, default=20, help='Quizzes per seeded user')
+        parser.add_argument('--iterations', type=int, default=50, help='Requests per API scenario')
+        parser.add_argument('--pipeline-runs', type=int, default=20, help='Stubbed quiz creation pipeline runs')
+        parser.add_argument('--output', help='Write the JSON results to this file instead of stdout')
+        parser.add_argument('--compare', help='JSON results of a previous run to compare with')
+        parser.add_argument('--max-regression', type=float, default=0.2, help='Allowed p50/p90 latency increase (0.2 = 20%%) before --compare fails')
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 or options['quizzes'] < 1 or options['iterations'] < 1 or options['pipeline_runs'] < 1:
+            raise CommandError("--users, --quizzes, --iterations and --pipeline-runs must be at least 1.")
+
+        baseline = None
+        if options['compare']:
+            try:
+                with open(options['compare'], encoding='utf-8') as file:
+                    baseline = json.load(file)
+            except (OSError, json.JSONDecodeError) as e:
+                raise CommandError(f"Failed to read {options['compare']}: {str(e)}")
+
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+
+        try:
+            results = run_benchmarks(options['users'], options['quizzes'], options['iterations'], options['pipeline_runs'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        report = {
+            'meta': {
+                'commit': self.git_commit(),
+                'created_at': datetime.now(timezone.utc).isoformat(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': settings.DATABASES['default']['ENGINE'],
+                'users': options['users'],
+                'quizzes_per_user': options['quizzes'],
+                'iterations': options['iterations'],
+                'pipeline_runs': options['pipeline_runs'],
+            },
+            'results': results,
+        }
+        output = json.dumps(report, indent=2)
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(output + '\n')
+            self.stdout.write(self.style.SUCCESS(f"Wrote benchmark results to {options['output']}."))
+        else:
+            self.stdout.write(output)
+
+        if baseline is not None:
+            lines, regressions = compare_results(baseline, report, options['max_regression'])
+            for line in lines:
+                self.stdout.write(line)
+            if regressions:
+                raise CommandError(f"Performance regression: {', '.join(regressions)}")
+            self.stdout.write(self.style.SUCCESS("No performance regressions."))
+
+    def git_commit(self) -> str | None:
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'],
+                cwd=settings.BASE_DIR,
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
@@ -0,0 +1,65 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+import json
+
+from quizzes_app.models import Quiz
+from quizzes_app.api.utils import validate_quiz_data
+from quizzes_app.api.youtube import get_video_id
+from quizzes_app.api.services import create_quiz_with_questions
+
+
+class Command(BaseCommand):
+    """
+    Management command that imports quizzes from a JSON file for a user.
+    The file contains a list of quizzes in the format produced by quiz generation, each with a 'video_url'.
+    Quizzes for videos the user already has a quiz for are skipped unless --allow-duplicates is given.
+    """
+
+    help = 'Import quizzes with their questions from a JSON file.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username', help='Owner of the imported quizzes')
+        parser.add_argument('path', help='JSON file with a list of quizzes')
+        parser.add_argument('--allow-duplicates', action='store_true', help='Also import quizzes for videos the user already has a quiz for')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f"User '{options['username']}' does not exist.")
+
+        try:
+            with open(options['path'], encoding='utf-8') as file:
+                quizzes = json.load(file)
+        except (OSError, json.JSONDecodeError) as e:
+            raise CommandError(f"Failed to read {options['path']}: {str(e)}")
+
+        for i, quiz_data in enumerate(quizzes):
+            try:
+                validate_quiz_data(quiz_data, question_count=None)
+            except ValueError as e:
+                raise CommandError(f"Quiz {i+1}: {str(e)}")
+            if 'video_url' not in quiz_data:
+                raise CommandError(f"Quiz {i+1}: missing video_url")
+
+        seen = set()
+        if not options['allow_duplicates']:
+            video_ids = {get_video_id(quiz_data['video_url']) for quiz_data in quizzes} - {''}
+            seen.update(Quiz.objects.filter(user=user, video_id__in=video_ids).values_list('video_id', flat=True))
+
+        imported = 0
+        for quiz_data in quizzes:
+            video_id = get_video_id(quiz_data['video_url'])
+            if video_id in seen:
+                continue
+            if video_id and not options['allow_duplicates']:
+                seen.add(video_id)
+
+            create_quiz_with_questions(user, quiz_data['video_url'], quiz_data)
+            imported += 1
+
+        skipped = len(quizzes) - imported
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {imported} quiz(zes) for {user.username}" + (f", skipped {skipped} already imported." if skipped else ".")
+        ))
@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from quizzes_app.api.compaction import get_encoding
+
+
+class Command(BaseCommand):
+    """
+    Management command that downloads the tiktoken encoding into TIKTOKEN_CACHE_DIR.
+    Run it during deployment (or when building the image) so token counting works without network access.
+    """
+
+    help = 'Download the tiktoken encoding configured in TIKTOKEN_ENCODING into TIKTOKEN_CACHE_DIR.'
+
+    def handle(self, *args, **options):
+        if get_encoding() is None:
+            raise CommandError(f"Failed to load tiktoken encoding '{settings.TIKTOKEN_ENCODING}'.")
+
+        self.stdout.write(self.style.SUCCESS(f"Loaded tiktoken encoding '{settings.TIKTOKEN_ENCODING}' into {settings.TIKTOKEN_CACHE_DIR}."))
@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from quizzes_app.api.whisper_models import model_registry, model_memory_bytes
+
+
+class Command(BaseCommand):
+    """
+    Management command that loads the configured Whisper models once.
+    Run it during deployment so the weights are downloaded before the first quiz is created.
+    """
+
+    help = 'Download and load the Whisper models configured in WHISPER_MODELS.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('models', nargs='*', help='Model sizes to load (default: WHISPER_MODELS)')
+
+    def handle(self, *args, **options):
+        for name in options['models'] or settings.WHISPER_MODELS:
+            model = model_registry.get(name)
+            size = model_memory_bytes(model) / 1024 ** 2
+            self.stdout.write(self.style.SUCCESS(f"Loaded Whisper model '{name}' ({size:.0f} MB)."))
@@ -0,0 +1,64 @@
+from django.conf import settings
+from django.db import connections
+from django.core.management.base import BaseCommand
+
+import signal
+import multiprocessing
+
+from quizzes_app.api.jobs import requeue_stale_jobs
+from quizzes_app.workers import quiz_worker_main
+
+
+class Command(BaseCommand):
+    """
+    Management command that starts a pool of local worker processes.
+    Each worker claims queued quiz generation jobs and runs the download, transcription and Gemini pipeline.
+    """
+
+    help = 'Run a pool of worker processes that generate quizzes from queued jobs.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=settings.QUIZ_JOB_WORKERS, help='Number of worker processes')
+        parser.add_argument('--poll-interval', type=float, default=settings.QUIZ_JOB_POLL_INTERVAL, help='Seconds to wait when the queue is empty')
+        parser.add_argument('--metrics-port', type=int, default=settings.QUIZ_JOB_METRICS_PORT, help='Serve Prometheus metrics of worker i on this port + i')
+
+    def handle(self, *args, **options):
+        requeued = requeue_stale_jobs()
+        if requeued:
+            self.stdout.write(f"Requeued {requeued} stale job(s).")
+
+        connections.close_all()
+
+        context = multiprocessing.get_context('spawn')
+        processes = [
+            context.Process(
+                target=quiz_worker_main,
+                args=(options['poll_interval'], options['metrics_port'] + i if options['metrics_port'] else None),
+                name=f'quiz-worker-{i}',
+            )
+            for i in range(options['workers'])
+        ]
+
+        for process in processes:
+            process.start()
+
+        self.stdout.write(self.style.SUCCESS(f"Started {len(processes)} quiz generation worker(s)."))
+
+        signal.signal(signal.SIGTERM, self.handle_sigterm)
+
+        try:
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt:
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            signal.signal(signal.SIGTERM, signal.SIG_IGN)
+            for process in processes:
+                process.terminate()
+            for process in processes:
+                process.join()
+            self.stdout.write("Quiz generation workers stopped.")
+
+    def handle_sigterm(self, signum, frame):
+        """Shut the pool down the same way as on Ctrl+C when a process supervisor stops the command."""
+
+        raise KeyboardInterrupt
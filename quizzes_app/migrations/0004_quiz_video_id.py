@@ -0,0 +1,69 @@
+# Generated by Django 6.0.2 on 2026-10-16 10:41
+
+from django.db import migrations, models
+
+import re
+
+from urllib.parse import urlsplit, parse_qs
+
+
+YOUTUBE_HOSTS = {'youtube.com', 'www.youtube.com', 'm.youtube.com', 'music.youtube.com', 'youtube-nocookie.com', 'www.youtube-nocookie.com'}
+VIDEO_ID_RE = re.compile(r'^[A-Za-z0-9_-]{11}$')
+
+
+def parse_video_id(url):
+    """Frozen copy of the video ID parsing of quizzes_app.api.youtube at the time of this migration."""
+
+    url = (url or '').strip()
+    if '://' not in url:
+        url = f'https://{url}'
+
+    try:
+        parts = urlsplit(url)
+        host = (parts.hostname or '').lower()
+    except ValueError:
+        return None
+
+    segments = [segment for segment in parts.path.split('/') if segment]
+    video_id = None
+
+    if host in ('youtu.be', 'www.youtu.be') and segments:
+        video_id = segments[0]
+    elif host in YOUTUBE_HOSTS:
+        if segments == ['watch']:
+            video_id = parse_qs(parts.query).get('v', [None])[0]
+        elif len(segments) >= 2 and segments[0] in ('embed', 'shorts', 'live', 'v'):
+            video_id = segments[1]
+
+    if parts.scheme not in ('http', 'https') or not video_id or not VIDEO_ID_RE.match(video_id):
+        return None
+    return video_id
+
+
+def backfill_video_ids(apps, schema_editor):
+    Quiz = apps.get_model('quizzes_app', 'Quiz')
+
+    quizzes = []
+    for quiz in Quiz.objects.only('id', 'video_url').iterator():
+        video_id = parse_video_id(quiz.video_url)
+        if video_id:
+            quiz.video_id = video_id
+            quizzes.append(quiz)
+
+    Quiz.objects.bulk_update(quizzes, ['video_id'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes_app', '0003_transcript'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quiz',
+            name='video_id',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=11),
+        ),
+        migrations.RunPython(backfill_video_ids, migrations.RunPython.noop),
+    ]
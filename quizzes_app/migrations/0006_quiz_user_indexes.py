@@ -0,0 +1,23 @@
+# Generated by Django 6.0.2 on 2026-10-16 13:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes_app', '0005_quizpipelinerun'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='quiz',
+            index=models.Index(fields=['user', 'id'], name='quizzes_app_user_id_ba6837_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quiz',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='quizzes_app_user_id_e5d4a6_idx'),
+        ),
+    ]
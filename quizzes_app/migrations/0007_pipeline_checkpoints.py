@@ -0,0 +1,28 @@
+# Generated by Django 6.0.2 on 2026-10-16 14:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes_app', '0006_quiz_user_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizgenerationjob',
+            name='retried_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='quizpipelinerun',
+            name='checkpoint',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='quizpipelinerun',
+            name='stage',
+            field=models.CharField(blank=True, default='', max_length=20),
+        ),
+    ]
@@ -6,6 +6,7 @@ class Quiz(models.Model):
     """
     Quiz model representing a quiz created by a user.
     Contains title, description, video URL, and related questions.
+    The YouTube video ID is derived from the video URL and indexed for lookups and deduplication.
     """
     
     user = models.ForeignKey(User, related_name='quizzes', on_delete=models.CASCADE)
@@ -14,7 +15,13 @@ class Quiz(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     video_url = models.URLField()
+    video_id = models.CharField(max_length=11, blank=True, db_index=True, editable=False)
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'id']),
+            models.Index(fields=['user', '-created_at', '-id']),
+        ]
 
     def __str__(self):
         return self.title
@@ -35,4 +42,87 @@ class Question(models.Model):
 
     def __str__(self):
         return self.question_title
-    
\ No newline at end of file
+    
+
+class QuizGenerationJob(models.Model):
+    """
+    Background job that generates a quiz from a YouTube URL.
+    Tracks the pipeline state and links the generated quiz once the job has completed.
+    A failed job can be retried; the retry resumes the pipeline at the stage that failed.
+    """
+    
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        RUNNING = 'running', 'Running'
+        COMPLETED = 'completed', 'Completed'
+        FAILED = 'failed', 'Failed'
+    
+    user = models.ForeignKey(User, related_name='quiz_jobs', on_delete=models.CASCADE)
+    video_url = models.URLField()
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    quiz = models.ForeignKey(Quiz, related_name='generation_jobs', on_delete=models.SET_NULL, blank=True, null=True)
+    error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+    retried_at = models.DateTimeField(blank=True, null=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.video_url} ({self.status})"
+
+
+class Transcript(models.Model):
+    """
+    Cached transcript of a YouTube video.
+    Keyed by video ID and the transcription model, so every quiz for the same video reuses one transcription.
+    """
+    
+    video_id = models.CharField(max_length=32)
+    model_name = models.CharField(max_length=50)
+    model_version = models.CharField(max_length=50)
+    text = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['video_id', 'model_name', 'model_version'], name='unique_transcript_per_model'),
+        ]
+
+    def __str__(self):
+        return f"{self.video_id} ({self.model_name} {self.model_version})"
+
+
+class QuizPipelineRun(models.Model):
+    """
+    Shared pipeline run for a YouTube video (single-flight).
+    Concurrent requests for the same video wait for the run that holds the lease instead of
+    starting their own download, transcription and Gemini call, and reuse its quiz data.
+    The checkpoint keeps the artifacts of completed stages, so a new run after a failure resumes at the failed stage;
+    it is cleared when the run completes.
+    """
+    
+    class Status(models.TextChoices):
+        RUNNING = 'running', 'Running'
+        COMPLETED = 'completed', 'Completed'
+        FAILED = 'failed', 'Failed'
+    
+    video_id = models.CharField(max_length=32, unique=True)
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.RUNNING)
+    owner = models.CharField(max_length=32)
+    lease_expires_at = models.DateTimeField()
+    stage = models.CharField(max_length=20, blank=True, default='')
+    checkpoint = models.JSONField(blank=True, default=dict)
+    result = models.JSONField(blank=True, null=True)
+    error = models.TextField(blank=True, default='')
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.video_id} ({self.status})"
@@ -1,11 +1,21 @@
 from django.urls import reverse
+from django.test import override_settings
 from django.contrib.auth.models import User
 
 from rest_framework import status
 from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
 
+import json
+import time
+
+from asgiref.sync import async_to_sync, sync_to_async
+from datetime import timedelta
 from unittest.mock import patch
-from quizzes_app.models import Quiz, Question
+from django.utils import timezone
+from quizzes_app.models import Quiz, Question, QuizGenerationJob, QuizPipelineRun
+from quizzes_app.api.jobs import claim_next_job, process_job, requeue_stale_jobs
+from quizzes_app.api.services import create_quiz_with_questions
 
 
 class QuizListTests(APITestCase):
@@ -91,8 +101,68 @@ class QuizListTests(APITestCase):
         self.assertEqual(len(response.data), 0)
 
 
+    def test_get_quizzes_prefetches_questions(self):
+        """Test that the list costs one query for quizzes and one for all their questions"""
+        
+        for i in range(3):
+            quiz = Quiz.objects.create(user=self.user1, title=f'Quiz {i}', video_url='https://www.youtube.com/watch?v=dQw4w9WgXcQ')
+            Question.objects.create(quiz=quiz, question_title='Q', question_options=['A', 'B'], answer='A')
+        
+        self.client.force_authenticate(user=self.user1)
+        url = reverse('quizzes')
+        
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 4)
+    
+    def test_get_quizzes_fields_skip_questions(self):
+        """Test that ?fields= returns only the requested fields without loading questions"""
+        
+        self.client.force_authenticate(user=self.user1)
+        url = reverse('quizzes')
+        
+        with self.assertNumQueries(1):
+            response = self.client.get(url, {'fields': 'id,title'})
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, [{'id': self.quiz1.pk, 'title': 'Python Basics'}])
+    
+    def test_get_quizzes_fields_include_questions(self):
+        """Test that ?include=questions adds questions to the requested fields"""
+        
+        self.client.force_authenticate(user=self.user1)
+        url = reverse('quizzes')
+        
+        response = self.client.get(url, {'fields': 'id', 'include': 'questions'})
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data[0]), {'id', 'questions'})
+        self.assertEqual(len(response.data[0]['questions']), 1)
+    
+    def test_get_quizzes_cursor_pagination(self):
+        """Test that ?page_size= returns cursor-paginated pages, newest first"""
+        
+        newer_quiz = Quiz.objects.create(user=self.user1, title='Django Basics', video_url='https://www.youtube.com/watch?v=test3')
+        
+        self.client.force_authenticate(user=self.user1)
+        url = reverse('quizzes')
+        
+        response = self.client.get(url, {'page_size': 1})
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([quiz['id'] for quiz in response.data['results']], [newer_quiz.pk])
+        self.assertIsNotNone(response.data['next'])
+        
+        response = self.client.get(response.data['next'])
+        
+        self.assertEqual([quiz['id'] for quiz in response.data['results']], [self.quiz1.pk])
+        self.assertIsNone(response.data['next'])
+
+
 class QuizCreateTests(APITestCase):
-    """Tests for POST /api/quizzes/ endpoint"""
+    """Tests for POST /api/quizzes/ endpoint and the quiz generation job it queues"""
     
     def setUp(self):
         """Set up test user"""
@@ -118,14 +188,43 @@ class QuizCreateTests(APITestCase):
             ]
         }
     
-    @patch('quizzes_app.api.serializers.cleanup_temp_file')
-    @patch('quizzes_app.api.serializers.generate_quiz_from_transcript')
-    @patch('quizzes_app.api.serializers.transcribe_audio')
-    @patch('quizzes_app.api.serializers.download_youtube_audio')
+    def run_queued_job(self):
+        """Claim and process the next queued job like a worker process would"""
+        
+        job = claim_next_job()
+        self.assertIsNotNone(job)
+        return process_job(job)
+    
+    @patch('quizzes_app.api.backends.download_youtube_audio')
+    @patch('quizzes_app.api.serializers.validate_youtube_url')
+    
+    def test_create_quiz_returns_job(self, mock_validate, mock_download):
+        """Test that POST queues a job and returns immediately without running the pipeline"""
+        
+        mock_validate.return_value = True
+        
+        self.client.force_authenticate(user=self.user)
+        data = {'url': self.valid_youtube_url}
+        
+        response = self.client.post(self.url, data, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['status'], QuizGenerationJob.Status.PENDING)
+        self.assertEqual(response.data['video_url'], self.valid_youtube_url)
+        self.assertIsNone(response.data['quiz'])
+        
+        self.assertEqual(QuizGenerationJob.objects.filter(user=self.user).count(), 1)
+        self.assertEqual(Quiz.objects.count(), 0)
+        mock_download.assert_not_called()
+    
+    @patch('quizzes_app.api.backends.cleanup_temp_file')
+    @patch('quizzes_app.api.pipeline.generate_quiz_from_transcript')
+    @patch('quizzes_app.api.backends.transcribe_audio')
+    @patch('quizzes_app.api.backends.download_youtube_audio')
     @patch('quizzes_app.api.serializers.validate_youtube_url')
     
     def test_create_quiz_success(self, mock_validate, mock_download, mock_transcribe, mock_generate, mock_cleanup):
-        """Test successful quiz creation from YouTube URL"""
+        """Test successful quiz creation from YouTube URL once the job has been processed"""
 
         mock_validate.return_value = True
         mock_download.return_value = '/tmp/test_audio.mp3'
@@ -136,13 +235,15 @@ class QuizCreateTests(APITestCase):
         data = {'url': self.valid_youtube_url}
         
         response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
         
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-        self.assertEqual(response.data['title'], 'Test Quiz')
-        self.assertEqual(response.data['description'], 'A quiz about testing')
-        self.assertEqual(response.data['video_url'], self.valid_youtube_url)
-        self.assertEqual(len(response.data['questions']), 2)
-        self.assertEqual(response.data['questions'][0]['question_title'], 'What is testing?')
+        job = self.run_queued_job()
+        
+        self.assertEqual(job.status, QuizGenerationJob.Status.COMPLETED)
+        self.assertEqual(job.pk, response.data['id'])
+        self.assertEqual(job.quiz.title, 'Test Quiz')
+        self.assertEqual(job.quiz.user, self.user)
+        self.assertEqual(job.quiz.video_url, self.valid_youtube_url)
         
         self.assertEqual(Quiz.objects.count(), 1)
         self.assertEqual(Question.objects.count(), 2)
@@ -153,14 +254,14 @@ class QuizCreateTests(APITestCase):
         mock_generate.assert_called_once()
         mock_cleanup.assert_called_once_with('/tmp/test_audio.mp3')
     
-    @patch('quizzes_app.api.serializers.cleanup_temp_file')
-    @patch('quizzes_app.api.serializers.generate_quiz_from_transcript')
-    @patch('quizzes_app.api.serializers.transcribe_audio')
-    @patch('quizzes_app.api.serializers.download_youtube_audio')
+    @patch('quizzes_app.api.backends.cleanup_temp_file')
+    @patch('quizzes_app.api.pipeline.generate_quiz_from_transcript')
+    @patch('quizzes_app.api.backends.transcribe_audio')
+    @patch('quizzes_app.api.backends.download_youtube_audio')
     @patch('quizzes_app.api.serializers.validate_youtube_url')
     
-    def test_create_quiz_includes_timestamps_in_questions(self, mock_validate, mock_download, mock_transcribe, mock_generate, mock_cleanup):
-        """Test that POST response includes created_at/updated_at in questions"""
+    def test_job_status_includes_quiz_with_timestamps_in_questions(self, mock_validate, mock_download, mock_transcribe, mock_generate, mock_cleanup):
+        """Test that the completed job returns the quiz with created_at/updated_at in questions"""
         
         mock_validate.return_value = True
         mock_download.return_value = '/tmp/test_audio.mp3'
@@ -171,18 +272,25 @@ class QuizCreateTests(APITestCase):
         data = {'url': self.valid_youtube_url}
         
         response = self.client.post(self.url, data, format='json')
+        job_url = reverse('quiz-job-detail', kwargs={'pk': response.data['id']})
+        self.run_queued_job()
         
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        response = self.client.get(job_url)
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], QuizGenerationJob.Status.COMPLETED)
+        self.assertEqual(response.data['quiz']['title'], 'Test Quiz')
+        self.assertEqual(response.data['quiz']['description'], 'A quiz about testing')
+        self.assertEqual(len(response.data['quiz']['questions']), 2)
         
-        question = response.data['questions'][0]
+        question = response.data['quiz']['questions'][0]
+        self.assertEqual(question['question_title'], 'What is testing?')
         self.assertIn('id', question)
         self.assertIn('question_title', question)
         self.assertIn('question_options', question)
         self.assertIn('answer', question)
         self.assertIn('created_at', question)
         self.assertIn('updated_at', question)
-        
-        mock_cleanup.assert_called_once_with('/tmp/test_audio.mp3')
     
     def test_create_quiz_unauthenticated(self):
         """Test that unauthenticated user cannot create quiz"""
@@ -207,6 +315,7 @@ class QuizCreateTests(APITestCase):
         
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn('url', response.data)
+        self.assertEqual(QuizGenerationJob.objects.count(), 0)
     
     def test_create_quiz_missing_url(self):
         """Test quiz creation without URL"""
@@ -219,11 +328,11 @@ class QuizCreateTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn('url', response.data)
     
-    @patch('quizzes_app.api.serializers.download_youtube_audio')
+    @patch('quizzes_app.api.backends.download_youtube_audio')
     @patch('quizzes_app.api.serializers.validate_youtube_url')
     
     def test_create_quiz_youtube_download_error(self, mock_validate, mock_download):
-        """Test quiz creation when YouTube download fails"""
+        """Test that the job fails when YouTube download fails"""
         
         from quizzes_app.api.utils import YouTubeDownloadError
         
@@ -234,17 +343,23 @@ class QuizCreateTests(APITestCase):
         data = {'url': self.valid_youtube_url}
         
         response = self.client.post(self.url, data, format='json')
+        job = self.run_queued_job()
         
-        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertIn('YouTube download failed', str(response.data))
+        self.assertEqual(job.status, QuizGenerationJob.Status.FAILED)
+        self.assertIn('YouTube download failed', job.error)
+        self.assertIsNone(job.quiz)
+        
+        response = self.client.get(reverse('quiz-job-detail', kwargs={'pk': job.pk}))
+        self.assertEqual(response.data['status'], QuizGenerationJob.Status.FAILED)
+        self.assertIn('YouTube download failed', response.data['error'])
     
-    @patch('quizzes_app.api.serializers.cleanup_temp_file')
-    @patch('quizzes_app.api.serializers.transcribe_audio')
-    @patch('quizzes_app.api.serializers.download_youtube_audio')
+    @patch('quizzes_app.api.backends.cleanup_temp_file')
+    @patch('quizzes_app.api.backends.transcribe_audio')
+    @patch('quizzes_app.api.backends.download_youtube_audio')
     @patch('quizzes_app.api.serializers.validate_youtube_url')
     
     def test_create_quiz_transcription_error(self, mock_validate, mock_download, mock_transcribe, mock_cleanup):
-        """Test quiz creation when transcription fails"""
+        """Test that the job fails when transcription fails"""
     
         from quizzes_app.api.utils import TranscriptionError
         
@@ -255,20 +370,21 @@ class QuizCreateTests(APITestCase):
         self.client.force_authenticate(user=self.user)
         data = {'url': self.valid_youtube_url}
         
-        response = self.client.post(self.url, data, format='json')
+        self.client.post(self.url, data, format='json')
+        job = self.run_queued_job()
         
-        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertIn('Transcription failed', str(response.data))
+        self.assertEqual(job.status, QuizGenerationJob.Status.FAILED)
+        self.assertIn('Transcription failed', job.error)
         mock_cleanup.assert_called_once_with('/tmp/test_audio.mp3')
     
-    @patch('quizzes_app.api.serializers.cleanup_temp_file')
-    @patch('quizzes_app.api.serializers.generate_quiz_from_transcript')
-    @patch('quizzes_app.api.serializers.transcribe_audio')
-    @patch('quizzes_app.api.serializers.download_youtube_audio')
+    @patch('quizzes_app.api.backends.cleanup_temp_file')
+    @patch('quizzes_app.api.pipeline.generate_quiz_from_transcript')
+    @patch('quizzes_app.api.backends.transcribe_audio')
+    @patch('quizzes_app.api.backends.download_youtube_audio')
     @patch('quizzes_app.api.serializers.validate_youtube_url')
     
     def test_create_quiz_generation_error(self, mock_validate, mock_download, mock_transcribe, mock_generate, mock_cleanup):
-        """Test quiz creation when quiz generation fails"""
+        """Test that the job fails when quiz generation fails"""
         
         from quizzes_app.api.utils import QuizGenerationError
         
@@ -280,8 +396,327 @@ class QuizCreateTests(APITestCase):
         self.client.force_authenticate(user=self.user)
         data = {'url': self.valid_youtube_url}
         
-        response = self.client.post(self.url, data, format='json')
+        self.client.post(self.url, data, format='json')
+        job = self.run_queued_job()
         
-        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertIn('Quiz generation failed', str(response.data))
+        self.assertEqual(job.status, QuizGenerationJob.Status.FAILED)
+        self.assertIn('Quiz generation failed', job.error)
+        self.assertEqual(Quiz.objects.count(), 0)
         mock_cleanup.assert_called_once_with('/tmp/test_audio.mp3')
+
+
+class QuizStreamTests(APITestCase):
+    """Tests for POST /api/quizzes/stream/ (Server-Sent Events relaying the job's progress and questions)"""
+    
+    def setUp(self):
+        """Set up test user and generated quiz data"""
+        
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.url = reverse('quiz-stream')
+        self.valid_youtube_url = 'https://www.youtube.com/watch?v=dQw4w9WgXcQ'
+        
+        self.quiz_data = {
+            'title': 'Test Quiz',
+            'description': 'A quiz about testing',
+            'questions': [
+                {
+                    'question_title': f'Question {i}?',
+                    'question_options': ['A', 'B', 'C', 'D'],
+                    'answer': 'A'
+                }
+                for i in range(10)
+            ]
+        }
+    
+    def read_events(self, response):
+        """Consume the (async) streamed body and parse it into (event, data) tuples"""
+        
+        async def read_body():
+            return b''.join([chunk async for chunk in response.streaming_content])
+        
+        body = async_to_sync(read_body)().decode()
+        events = []
+        for block in body.strip().split('\n\n'):
+            event_line, data_line = block.split('\n')
+            events.append((event_line[len('event: '):], json.loads(data_line[len('data: '):])))
+        return events
+    
+    @patch('quizzes_app.api.jobs.generate_quiz_data')
+    
+    def test_stream_quiz_success(self, mock_generate):
+        """Test that the stream queues a job for the workers and relays the quiz once the job has completed"""
+        
+        mock_generate.return_value = self.quiz_data
+        
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(self.url, {'url': self.valid_youtube_url}, format='json', HTTP_ACCEPT='text/event-stream')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        
+        job = claim_next_job()
+        process_job(job)
+        
+        events = self.read_events(response)
+        names = [event for event, _ in events]
+        
+        self.assertEqual(events[0], ('job', {'id': job.pk}))
+        self.assertEqual(events[1], ('field', {'name': 'title', 'value': 'Test Quiz'}))
+        self.assertEqual(names.count('question'), 10)
+        self.assertEqual(events[3], ('question', self.quiz_data['questions'][0]))
+        self.assertEqual(names[-1], 'done')
+        
+        quiz = Quiz.objects.get(user=self.user)
+        self.assertEqual(events[-1][1]['id'], quiz.id)
+        self.assertEqual(quiz.questions.count(), 10)
+    
+    def test_stream_relays_stages_and_error(self):
+        """Test that the stage of the job's pipeline run is relayed until the job fails"""
+        
+        def start_job():
+            QuizGenerationJob.objects.update(status=QuizGenerationJob.Status.RUNNING)
+            QuizPipelineRun.objects.create(
+                video_id='dQw4w9WgXcQ',
+                owner='worker',
+                stage='transcribe',
+                lease_expires_at=timezone.now() + timedelta(seconds=60),
+                started_at=timezone.now(),
+            )
+        
+        steps = [
+            start_job,
+            lambda: QuizPipelineRun.objects.update(stage='generate'),
+            lambda: QuizGenerationJob.objects.update(status=QuizGenerationJob.Status.FAILED, error='Quiz generation failed: invalid JSON'),
+        ]
+        
+        async def advance(seconds):
+            await sync_to_async(steps.pop(0))()
+        
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(self.url, {'url': self.valid_youtube_url}, format='json')
+        
+        with patch('quizzes_app.api.views.asyncio.sleep', side_effect=advance):
+            events = self.read_events(response)
+        
+        self.assertEqual(events[1:], [
+            ('status', {'stage': 'queued'}),
+            ('status', {'stage': 'transcribing'}),
+            ('status', {'stage': 'generating'}),
+            ('error', {'detail': 'Quiz generation failed: invalid JSON'}),
+        ])
+        self.assertEqual(Quiz.objects.count(), 0)
+    
+    def test_stream_relays_questions_while_generating(self):
+        """Test that questions saved on the pipeline run are relayed before the job completes, and not sent again after"""
+        
+        def progress(count):
+            return {'stream': {'source': 'x', 'value': {**self.quiz_data, 'questions': self.quiz_data['questions'][:count]}}}
+        
+        def start_job():
+            QuizGenerationJob.objects.update(status=QuizGenerationJob.Status.RUNNING)
+            QuizPipelineRun.objects.create(
+                video_id='dQw4w9WgXcQ',
+                owner='worker',
+                stage='generate',
+                checkpoint=progress(2),
+                lease_expires_at=timezone.now() + timedelta(seconds=60),
+                started_at=timezone.now(),
+            )
+        
+        def complete_job():
+            quiz, _ = create_quiz_with_questions(self.user, self.valid_youtube_url, self.quiz_data)
+            QuizGenerationJob.objects.update(status=QuizGenerationJob.Status.COMPLETED, quiz=quiz)
+        
+        steps = [
+            start_job,
+            lambda: QuizPipelineRun.objects.update(checkpoint=progress(3)),
+            complete_job,
+        ]
+        
+        async def advance(seconds):
+            await sync_to_async(steps.pop(0))()
+        
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(self.url, {'url': self.valid_youtube_url}, format='json')
+        
+        with patch('quizzes_app.api.views.asyncio.sleep', side_effect=advance):
+            events = self.read_events(response)
+        
+        questions = [('question', question) for question in self.quiz_data['questions']]
+        self.assertEqual(events[1:8], [
+            ('status', {'stage': 'queued'}),
+            ('status', {'stage': 'generating'}),
+            ('field', {'name': 'title', 'value': 'Test Quiz'}),
+            ('field', {'name': 'description', 'value': 'A quiz about testing'}),
+            *questions[:3],
+        ])
+        self.assertEqual(events[8:-1], questions[3:])
+        self.assertEqual(events[-1][0], 'done')
+    
+    @override_settings(QUIZ_STREAM_MAX_DURATION=0)
+    def test_stream_time_limit(self):
+        """Test that the stream ends with a timeout event pointing to the job once its time is up"""
+        
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(self.url, {'url': self.valid_youtube_url}, format='json')
+        
+        events = self.read_events(response)
+        job = QuizGenerationJob.objects.get()
+        
+        self.assertEqual([event for event, _ in events], ['job', 'status', 'timeout'])
+        self.assertEqual(events[-1][1]['id'], job.pk)
+        self.assertEqual(job.status, QuizGenerationJob.Status.PENDING)
+    
+    @override_settings(QUIZ_QUEUE_MAX_PENDING_PER_USER=1)
+    def test_stream_counts_against_queue(self):
+        """Test that a stream is a queued job and counts against the user's share of the queue"""
+        
+        self.client.force_authenticate(user=self.user)
+        self.client.post(self.url, {'url': self.valid_youtube_url}, format='json')
+        
+        response = self.client.post(self.url, {'url': self.valid_youtube_url}, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(QuizGenerationJob.objects.filter(user=self.user).count(), 1)
+    
+    def test_stream_invalid_url(self):
+        """Test that an invalid URL is rejected before streaming starts"""
+        
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(self.url, {'url': 'https://example.com/video'}, format='json', HTTP_ACCEPT='text/event-stream')
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertTrue(response.content.startswith(b'event: error\n'))
+    
+    def test_stream_unauthenticated(self):
+        """Test that streaming requires authentication"""
+        
+        response = self.client.post(self.url, {'url': self.valid_youtube_url}, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class QuizGenerationJobTests(APITestCase):
+    """Tests for the job queue and GET /api/quizzes/jobs/<pk>/ endpoint"""
+    
+    def setUp(self):
+        """Set up test users and queued jobs"""
+        
+        self.user1 = User.objects.create_user(username='user1', password='testpass123')
+        self.user2 = User.objects.create_user(username='user2', password='testpass123')
+        
+        self.job1 = QuizGenerationJob.objects.create(user=self.user1, video_url='https://www.youtube.com/watch?v=test1')
+        self.job2 = QuizGenerationJob.objects.create(user=self.user2, video_url='https://www.youtube.com/watch?v=test2')
+    
+    def test_get_job_status(self):
+        """Test that the owner can poll the status of a queued job"""
+        
+        self.client.force_authenticate(user=self.user1)
+        url = reverse('quiz-job-detail', kwargs={'pk': self.job1.pk})
+        
+        response = self.client.get(url)
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], QuizGenerationJob.Status.PENDING)
+        self.assertIsNone(response.data['quiz'])
+    
+    def test_get_job_status_other_user(self):
+        """Test that a user cannot see another user's job"""
+        
+        self.client.force_authenticate(user=self.user2)
+        url = reverse('quiz-job-detail', kwargs={'pk': self.job1.pk})
+        
+        response = self.client.get(url)
+        
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+    
+    def test_get_job_status_unauthenticated(self):
+        """Test that unauthenticated user cannot poll a job"""
+        
+        url = reverse('quiz-job-detail', kwargs={'pk': self.job1.pk})
+        
+        response = self.client.get(url)
+        
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+    
+    @override_settings(QUIZ_JOB_POLL_INTERVAL=0.01)
+    
+    def test_long_poll_returns_when_job_finishes(self):
+        """Test that ?wait= returns a finished job immediately and an unfinished one once the time is up"""
+        
+        self.client.force_authenticate(user=self.user1)
+        url = reverse('quiz-job-detail', kwargs={'pk': self.job1.pk})
+        
+        response = self.client.get(url, {'wait': 0.05})
+        self.assertEqual(response.data['status'], QuizGenerationJob.Status.PENDING)
+        
+        QuizGenerationJob.objects.filter(pk=self.job1.pk).update(status=QuizGenerationJob.Status.FAILED, error='Failed')
+        
+        start = time.monotonic()
+        response = self.client.get(url, {'wait': 30})
+        
+        self.assertEqual(response.data['status'], QuizGenerationJob.Status.FAILED)
+        self.assertLess(time.monotonic() - start, 5)
+    
+    def test_long_poll_invalid_wait(self):
+        """Test that a non-numeric or non-finite ?wait= is rejected"""
+        
+        self.client.force_authenticate(user=self.user1)
+        url = reverse('quiz-job-detail', kwargs={'pk': self.job1.pk})
+        
+        for wait in ('soon', 'nan', 'inf', '-inf'):
+            response = self.client.get(url, {'wait': wait})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, wait)
+    
+    @override_settings(QUIZ_JOB_POLL_INTERVAL=1)
+    
+    def test_long_poll_sleeps_until_deadline_only(self):
+        """Test that a short ?wait= is not rounded up to a full poll interval and a negative one does not wait"""
+        
+        self.client.force_authenticate(user=self.user1)
+        url = reverse('quiz-job-detail', kwargs={'pk': self.job1.pk})
+        
+        start = time.monotonic()
+        response = self.client.get(url, {'wait': 0.05})
+        self.assertEqual(response.data['status'], QuizGenerationJob.Status.PENDING)
+        self.assertLess(time.monotonic() - start, 0.5)
+        
+        with patch('quizzes_app.api.views.asyncio.sleep') as mock_sleep:
+            response = self.client.get(url, {'wait': -5})
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        mock_sleep.assert_not_called()
+    
+    async def test_get_job_status_async_client(self):
+        """Test polling through the ASGI request handler with the access token cookie"""
+        
+        self.async_client.cookies['access'] = str(AccessToken.for_user(self.user1))
+        url = reverse('quiz-job-detail', kwargs={'pk': self.job1.pk})
+        
+        response = await self.async_client.get(url)
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['id'], self.job1.pk)
+    
+    def test_claim_next_job_claims_each_job_once(self):
+        """Test that jobs are claimed oldest first and never handed out twice"""
+        
+        first = claim_next_job()
+        second = claim_next_job()
+        
+        self.assertEqual(first.pk, self.job1.pk)
+        self.assertEqual(second.pk, self.job2.pk)
+        self.assertEqual(first.status, QuizGenerationJob.Status.RUNNING)
+        self.assertIsNotNone(first.started_at)
+        self.assertIsNone(claim_next_job())
+    
+    def test_requeue_stale_jobs(self):
+        """Test that running jobs abandoned by a crashed worker are put back in the queue"""
+        
+        job = claim_next_job()
+        QuizGenerationJob.objects.filter(pk=job.pk).update(started_at=timezone.now() - timedelta(days=1))
+        
+        self.assertEqual(requeue_stale_jobs(), 1)
+        
+        job.refresh_from_db()
+        self.assertEqual(job.status, QuizGenerationJob.Status.PENDING)
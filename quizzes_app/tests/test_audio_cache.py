@@ -0,0 +1,149 @@
+from django.test import SimpleTestCase, override_settings
+
+import os
+import time
+import shutil
+import tempfile
+
+from unittest.mock import patch
+from quizzes_app.api.audio_cache import AudioCache
+from quizzes_app.api.backends import WhisperBackend
+
+
+def write_file(path, size, age=0):
+    with open(path, 'wb') as f:
+        f.write(b'\0' * size)
+    mtime = time.time() - age
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+class AudioCacheTests(SimpleTestCase):
+    """Tests for the content-addressed audio download cache"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        self.cache = AudioCache(os.path.join(self.root, 'audio_cache'), max_bytes=1000)
+        self.downloads = []
+
+    def download(self, filename_base, size=100):
+        self.downloads.append(filename_base)
+        return write_file(filename_base + '.webm', size)
+
+    def test_miss_downloads_into_tmp_and_renames(self):
+        """Test that a miss downloads into the tmp directory and moves the file to its content address"""
+
+        path = self.cache.fetch('dQw4w9WgXcQ', 'bestaudio/best', self.download)
+
+        self.assertEqual(len(self.downloads), 1)
+        self.assertTrue(self.downloads[0].startswith(self.cache.tmp_dir))
+        self.assertEqual(path, os.path.join(self.cache.root, self.cache.key('dQw4w9WgXcQ', 'bestaudio/best') + '.webm'))
+        self.assertTrue(os.path.exists(path))
+        self.assertEqual(os.listdir(self.cache.tmp_dir), [])
+
+    def test_hit_reuses_file_and_marks_it_used(self):
+        """Test that a hit returns the cached file without downloading and refreshes its modification time"""
+
+        path = self.cache.fetch('dQw4w9WgXcQ', 'bestaudio/best', self.download)
+        os.utime(path, (time.time() - 1000, time.time() - 1000))
+
+        self.assertEqual(self.cache.fetch('dQw4w9WgXcQ', 'bestaudio/best', self.download), path)
+        self.assertEqual(len(self.downloads), 1)
+        self.assertGreater(os.path.getmtime(path), time.time() - 10)
+
+    def test_key_includes_format(self):
+        """Test that the same video in another format is cached separately"""
+
+        first = self.cache.fetch('dQw4w9WgXcQ', 'bestaudio/best', self.download)
+        second = self.cache.fetch('dQw4w9WgXcQ', 'worstaudio', self.download)
+
+        self.assertNotEqual(first, second)
+        self.assertEqual(len(self.downloads), 2)
+
+    def test_evicts_least_recently_used(self):
+        """Test that the oldest files are evicted until the cache fits its budget"""
+
+        os.makedirs(self.cache.root)
+        oldest = write_file(os.path.join(self.cache.root, 'a.webm'), 400, age=3000)
+        older = write_file(os.path.join(self.cache.root, 'b.webm'), 400, age=2000)
+
+        path = self.cache.fetch('dQw4w9WgXcQ', 'bestaudio/best', lambda base: self.download(base, size=400))
+
+        self.assertFalse(os.path.exists(oldest))
+        self.assertTrue(os.path.exists(older))
+        self.assertTrue(os.path.exists(path))
+
+    def test_recently_used_files_are_not_evicted(self):
+        """Test that files used within the grace period are kept even over budget"""
+
+        os.makedirs(self.cache.root)
+        in_use = write_file(os.path.join(self.cache.root, 'a.webm'), 800, age=10)
+
+        self.cache.fetch('dQw4w9WgXcQ', 'bestaudio/best', lambda base: self.download(base, size=400))
+
+        self.assertTrue(os.path.exists(in_use))
+
+    def test_sweep_deletes_old_partial_files(self):
+        """Test that partial downloads older than the maximum age are deleted and recent ones kept"""
+
+        os.makedirs(self.cache.tmp_dir)
+        stale = write_file(os.path.join(self.cache.tmp_dir, 'x-1.webm.part'), 10, age=7200)
+        recent = write_file(os.path.join(self.cache.tmp_dir, 'x-2.webm.part'), 10, age=60)
+        stale_temp = write_file(os.path.join(self.root, 'temp_audio_abc.webm'), 10, age=7200)
+
+        with self.settings(MEDIA_ROOT=self.root):
+            self.assertEqual(self.cache.sweep(max_age=3600), 2)
+
+        self.assertFalse(os.path.exists(stale))
+        self.assertFalse(os.path.exists(stale_temp))
+        self.assertTrue(os.path.exists(recent))
+
+    def test_failed_download_leaves_no_cache_entry(self):
+        """Test that a failing download does not create a cache entry"""
+
+        def fail(filename_base):
+            raise OSError("network down")
+
+        with self.assertRaises(OSError):
+            self.cache.fetch('dQw4w9WgXcQ', 'bestaudio/best', fail)
+
+        self.assertIsNone(self.cache.get('dQw4w9WgXcQ', 'bestaudio/best'))
+
+
+class WhisperBackendCacheTests(SimpleTestCase):
+    """Tests for the audio cache in the Whisper backend"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+
+    @patch('quizzes_app.api.backends.transcribe_audio', return_value='transcript')
+    @patch('quizzes_app.api.backends.download_youtube_audio')
+
+    def test_cached_audio_is_reused_and_kept(self, mock_download, mock_transcribe):
+        """Test that a second transcription of a video reuses the cached audio and the file is not deleted"""
+
+        mock_download.side_effect = lambda url, filename_base: write_file(filename_base + '.webm', 100)
+
+        with override_settings(AUDIO_CACHE_MAX_BYTES=10 ** 6, AUDIO_CACHE_DIR=self.root, AUDIO_STREAMING=False):
+            backend = WhisperBackend()
+            backend.transcribe('https://www.youtube.com/watch?v=dQw4w9WgXcQ')
+            backend.transcribe('https://youtu.be/dQw4w9WgXcQ')
+
+        self.assertEqual(mock_download.call_count, 1)
+        self.assertEqual(mock_transcribe.call_count, 2)
+        self.assertTrue(os.path.exists(mock_transcribe.call_args[0][0]))
+
+    @patch('quizzes_app.api.backends.transcribe_audio', return_value='transcript')
+    @patch('quizzes_app.api.backends.cleanup_temp_file')
+    @patch('quizzes_app.api.backends.download_youtube_audio', return_value='/tmp/temp_audio_x.webm')
+
+    def test_disabled_cache_deletes_download(self, mock_download, mock_cleanup, mock_transcribe):
+        """Test that without a cache budget the download is a temporary file"""
+
+        with override_settings(AUDIO_CACHE_MAX_BYTES=0, AUDIO_STREAMING=False):
+            WhisperBackend().transcribe('https://www.youtube.com/watch?v=dQw4w9WgXcQ')
+
+        mock_download.assert_called_once_with('https://www.youtube.com/watch?v=dQw4w9WgXcQ')
+        mock_cleanup.assert_called_once_with('/tmp/temp_audio_x.webm')
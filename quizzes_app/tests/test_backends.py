@@ -0,0 +1,228 @@
+from django.test import TestCase, SimpleTestCase, override_settings
+from django.core.exceptions import ImproperlyConfigured
+
+import io
+import json
+import whisper
+import numpy as np
+
+from contextlib import contextmanager
+from unittest.mock import patch
+from quizzes_app.models import Transcript
+from quizzes_app.api.pipeline import get_transcript
+from quizzes_app.api.utils import TranscriptUnavailable, YouTubeDownloadError
+from quizzes_app.api.backends import (
+    TranscriptionBackend,
+    FasterWhisperBackend,
+    YouTubeCaptionsBackend,
+    get_transcription_backends,
+    select_caption_track,
+    parse_vtt,
+    parse_json3,
+)
+
+
+VTT = """WEBVTT
+Kind: captions
+Language: en
+
+00:00:00.000 --> 00:00:02.000 align:start position:0%
+Hello <c>and</c> welcome
+
+00:00:02.000 --> 00:00:04.000
+Hello and welcome
+to the &amp; show
+"""
+
+
+class FakeYoutubeDL:
+    """Stand-in for yt_dlp.YoutubeDL that returns fixed video info and caption content"""
+    
+    info = {}
+    content = b''
+    
+    def __init__(self, options):
+        self.options = options
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        return False
+    
+    def extract_info(self, url, download=True):
+        return self.info
+    
+    def urlopen(self, url):
+        return io.BytesIO(self.content)
+
+
+class CaptionParsingTests(SimpleTestCase):
+    """Tests for selecting and parsing YouTube caption tracks"""
+    
+    def test_parse_vtt(self):
+        """Test that cue timings, markup and rolling duplicates are removed"""
+        
+        self.assertEqual(parse_vtt(VTT), 'Hello and welcome to the & show')
+    
+    def test_parse_json3(self):
+        """Test that json3 segments are joined into text"""
+        
+        content = json.dumps({'events': [{'segs': [{'utf8': 'Hello '}, {'utf8': 'world'}]}, {'tStartMs': 5}, {'segs': [{'utf8': '\n'}, {'utf8': 'again'}]}]})
+        
+        self.assertEqual(parse_json3(content), 'Hello world again')
+    
+    def test_select_caption_track(self):
+        """Test that uploaded subtitles win over automatic captions and WebVTT over json3"""
+        
+        info = {
+            'subtitles': {'de': [{'ext': 'vtt', 'url': 'de.vtt'}], 'en-GB': [{'ext': 'json3', 'url': 'en.json3'}, {'ext': 'vtt', 'url': 'en.vtt'}]},
+            'automatic_captions': {'en': [{'ext': 'vtt', 'url': 'auto.vtt'}]},
+        }
+        
+        self.assertEqual(select_caption_track(info, ['en'], automatic=True)['url'], 'en.vtt')
+        self.assertEqual(select_caption_track(info, ['fr', 'de'], automatic=True)['url'], 'de.vtt')
+        self.assertIsNone(select_caption_track({'automatic_captions': info['automatic_captions']}, ['en'], automatic=False))
+
+
+@override_settings(TRANSCRIPTION_CAPTION_LANGUAGES=['en'], TRANSCRIPTION_AUTO_CAPTIONS=True)
+class TranscriptionBackendTests(TestCase):
+    """Tests for transcription backend selection, fallback and per-backend caching"""
+    
+    def setUp(self):
+        """Reset the fake yt-dlp responses"""
+        
+        FakeYoutubeDL.info = {}
+        FakeYoutubeDL.content = b''
+    
+    @override_settings(TRANSCRIPTION_BACKENDS=['youtube-captions', 'whisper'])
+    @patch('quizzes_app.api.backends.yt_dlp.YoutubeDL', FakeYoutubeDL)
+    @patch('quizzes_app.api.backends.download_youtube_audio')
+    
+    def test_captions_skip_audio(self, mock_download):
+        """Test that captions are used without downloading audio and cached under the captions key"""
+        
+        FakeYoutubeDL.info = {'subtitles': {'en': [{'ext': 'vtt', 'url': 'https://example.com/en.vtt'}]}}
+        FakeYoutubeDL.content = VTT.encode()
+        
+        transcript = get_transcript('https://www.youtube.com/watch?v=dQw4w9WgXcQ')
+        
+        self.assertEqual(transcript, 'Hello and welcome to the & show')
+        mock_download.assert_not_called()
+        self.assertEqual(Transcript.objects.get().model_name, 'youtube-captions')
+    
+    @override_settings(TRANSCRIPTION_BACKENDS=['youtube-captions', 'whisper'])
+    @patch('quizzes_app.api.backends.yt_dlp.YoutubeDL', FakeYoutubeDL)
+    @patch('quizzes_app.api.backends.cleanup_temp_file')
+    @patch('quizzes_app.api.backends.transcribe_audio')
+    @patch('quizzes_app.api.backends.download_youtube_audio')
+    
+    def test_fallback_to_whisper(self, mock_download, mock_transcribe, mock_cleanup):
+        """Test that videos without captions fall back to Whisper"""
+        
+        mock_download.return_value = '/tmp/test_audio.mp3'
+        mock_transcribe.return_value = 'Whisper transcript'
+        
+        transcript = get_transcript('https://www.youtube.com/watch?v=dQw4w9WgXcQ')
+        
+        self.assertEqual(transcript, 'Whisper transcript')
+        stored = Transcript.objects.get()
+        self.assertEqual((stored.model_name, stored.model_version), ('base', whisper.__version__))
+    
+    @override_settings(TRANSCRIPTION_BACKENDS=['youtube-captions', 'whisper'])
+    @patch('quizzes_app.api.backends.download_youtube_audio')
+    
+    def test_cached_transcript_in_backend_order(self, mock_download):
+        """Test that the cached transcript of the first backend is preferred"""
+        
+        Transcript.objects.create(video_id='dQw4w9WgXcQ', model_name='base', model_version=whisper.__version__, text='Whisper')
+        Transcript.objects.create(video_id='dQw4w9WgXcQ', model_name='youtube-captions', model_version='en+auto', text='Captions')
+        
+        self.assertEqual(get_transcript('https://www.youtube.com/watch?v=dQw4w9WgXcQ'), 'Captions')
+        mock_download.assert_not_called()
+    
+    @override_settings(TRANSCRIPTION_BACKENDS=['whisper'])
+    @patch('quizzes_app.api.backends.cleanup_temp_file')
+    @patch('quizzes_app.api.backends.transcribe_audio')
+    @patch('quizzes_app.api.backends.download_youtube_audio')
+    
+    def test_captions_transcript_not_used_by_other_backends(self, mock_download, mock_transcribe, mock_cleanup):
+        """Test that a transcript cached by another backend is not reused"""
+        
+        Transcript.objects.create(video_id='dQw4w9WgXcQ', model_name='youtube-captions', model_version='en+auto', text='Captions')
+        mock_download.return_value = '/tmp/test_audio.mp3'
+        mock_transcribe.return_value = 'Whisper transcript'
+        
+        self.assertEqual(get_transcript('https://www.youtube.com/watch?v=dQw4w9WgXcQ'), 'Whisper transcript')
+    
+    @override_settings(TRANSCRIPTION_BACKENDS=['youtube-captions'])
+    @patch('quizzes_app.api.backends.yt_dlp.YoutubeDL', FakeYoutubeDL)
+    
+    def test_last_backend_error_raised(self):
+        """Test that the error of the last backend is raised when no backend succeeds"""
+        
+        with self.assertRaises(TranscriptUnavailable):
+            get_transcript('https://www.youtube.com/watch?v=dQw4w9WgXcQ')
+    
+    @patch('quizzes_app.api.backends.yt_dlp.YoutubeDL')
+    
+    def test_captions_download_error(self, mock_ydl):
+        """Test that yt-dlp errors are reported as download errors"""
+        
+        mock_ydl.return_value.__enter__.return_value.extract_info.side_effect = Exception('Video unavailable')
+        
+        with self.assertRaisesMessage(YouTubeDownloadError, 'Video unavailable'):
+            YouTubeCaptionsBackend().transcribe('https://www.youtube.com/watch?v=dQw4w9WgXcQ')
+    
+    @override_settings(TRANSCRIPTION_BACKENDS=['faster-whisper', 'whisper'])
+    @patch('quizzes_app.api.backends.importlib.util.find_spec', return_value=None)
+    
+    def test_unavailable_backend_skipped(self, mock_find_spec):
+        """Test that backends with missing optional packages are skipped"""
+        
+        with self.assertLogs('quizzes_app.api.backends', level='WARNING'):
+            backends = get_transcription_backends()
+        
+        self.assertEqual([backend.name for backend in backends], ['whisper'])
+    
+    @override_settings(TRANSCRIPTION_BACKENDS=['whisper', 'vosk'])
+    def test_unknown_backend(self):
+        """Test that unknown backend names are a configuration error"""
+        
+        with self.assertRaises(ImproperlyConfigured):
+            get_transcription_backends()
+    
+    def test_backend_must_implement_interface(self):
+        """Test that a backend without cache_key and transcribe cannot be instantiated"""
+        
+        class IncompleteBackend(TranscriptionBackend):
+            name = 'incomplete'
+        
+        with self.assertRaises(TypeError):
+            IncompleteBackend()
+    
+    @patch('quizzes_app.api.backends.get_faster_whisper_model')
+    
+    def test_faster_whisper_model_loaded_in_slot(self, mock_get_model):
+        """Test that the faster-whisper model is loaded while the transcription slot is held"""
+        
+        held = []
+        
+        @contextmanager
+        def fake_slot():
+            held.append(True)
+            yield 0.0
+            held.append(False)
+        
+        def get_model(*args):
+            self.assertEqual(held, [True])
+            return mock_get_model.return_value
+        
+        mock_get_model.side_effect = get_model
+        mock_get_model.return_value.transcribe.return_value = ([type('Segment', (), {'text': ' Hello'})()], None)
+        
+        with patch('quizzes_app.api.backends.transcription_slot', fake_slot):
+            text = FasterWhisperBackend().transcribe_audio(np.zeros(16000, dtype=np.float32))
+        
+        self.assertEqual(text, 'Hello')
+        mock_get_model.assert_called_once()
@@ -0,0 +1,64 @@
+from django.test import SimpleTestCase, TestCase, override_settings
+
+import tempfile
+
+from unittest.mock import patch
+from quizzes_app.models import Quiz, Question
+from quizzes_app.benchmarks import seed, run_benchmarks, compare_results
+
+
+class BenchmarkRunTests(TestCase):
+    """Tests for seeding and running the benchmark scenarios"""
+    
+    def test_seed(self):
+        """Test that seeding creates users x quizzes x questions"""
+        
+        users = seed(2, 3)
+        
+        self.assertEqual(len(users), 2)
+        self.assertEqual(Quiz.objects.count(), 6)
+        self.assertEqual(Question.objects.count(), 60)
+    
+    @patch('quizzes_app.api.compaction.get_encoding', return_value=None)
+    
+    def test_run_benchmarks(self, mock_encoding):
+        """Test that every scenario runs without errors on a small dataset"""
+        
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            results = run_benchmarks(users=2, quizzes_per_user=2, iterations=3, pipeline_runs=2)
+        
+        self.assertEqual(
+            set(results),
+            {'quiz_list', 'quiz_detail', 'quiz_patch', 'quiz_delete', 'login', 'token_refresh', 'pipeline'},
+        )
+        for scenario, stats in results.items():
+            self.assertEqual(stats['errors'], 0, scenario)
+            self.assertLessEqual(stats['p50_ms'], stats['p99_ms'])
+        self.assertEqual(results['quiz_list']['requests'], 3)
+        self.assertEqual(results['pipeline']['requests'], 2)
+        self.assertEqual(Quiz.objects.filter(title='Benchmark Quiz').count(), 2)
+
+
+class CompareResultsTests(SimpleTestCase):
+    """Tests for comparing two benchmark runs"""
+    
+    def test_regression_detected(self):
+        """Test that a p50/p90 increase above the threshold is reported as regression"""
+        
+        baseline = {'results': {'quiz_list': {'p50_ms': 10.0, 'p90_ms': 20.0}}}
+        current = {'results': {'quiz_list': {'p50_ms': 13.0, 'p90_ms': 21.0}}}
+        
+        lines, regressions = compare_results(baseline, current, max_regression=0.2)
+        
+        self.assertEqual(regressions, ['quiz_list p50_ms +30.0%'])
+        self.assertIn('p90_ms 20.00 -> 21.00 (+5.0%)', lines[0])
+    
+    def test_new_scenario_without_baseline(self):
+        """Test that scenarios missing from the baseline are not reported as regression"""
+        
+        current = {'results': {'pipeline': {'p50_ms': 5.0, 'p90_ms': 6.0}}}
+        
+        lines, regressions = compare_results({'results': {}}, current, max_regression=0.2)
+        
+        self.assertEqual(regressions, [])
+        self.assertEqual(lines, ['pipeline: no baseline'])
@@ -0,0 +1,232 @@
+from django.urls import reverse
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from django.contrib.auth.models import User
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+import json
+
+from unittest.mock import patch
+from quizzes_app.models import QuizGenerationJob, QuizPipelineRun
+from quizzes_app.api.jobs import process_job
+from quizzes_app.api.checkpoints import Checkpoint
+from quizzes_app.api.singleflight import LEADER, acquire_run, run_single_flight
+from quizzes_app.api.utils import generate_quiz_from_transcript, QuizGenerationError
+
+
+def quiz_json(question_count=10):
+    return json.dumps({
+        'title': 'Test Quiz',
+        'description': 'A quiz about testing',
+        'questions': [
+            {'question_title': f'Question {i}?', 'question_options': ['A', 'B', 'C', 'D'], 'answer': 'A'}
+            for i in range(question_count)
+        ],
+    })
+
+
+def streams(*texts):
+    return [iter([text[:20], text[20:]]) for text in texts]
+
+
+@patch('quizzes_app.api.utils.prepare_transcript', side_effect=lambda transcript, api_key: transcript.upper())
+class GenerationCheckpointTests(TestCase):
+    """Tests for checkpointing the compacted transcript and the raw Gemini output"""
+
+    def create_run(self, **fields):
+        fields = {'lease_expires_at': '2030-01-01T00:00Z', **fields}
+        return QuizPipelineRun.objects.create(video_id='dQw4w9WgXcQ', owner='worker', started_at='2026-01-01T00:00Z', **fields)
+
+    @patch('quizzes_app.api.utils.generate_content_stream')
+
+    def test_invalid_response_reasked(self, mock_stream, mock_prepare):
+        """Test that an invalid response is re-asked without compacting the transcript again"""
+
+        mock_stream.side_effect = streams('not json', quiz_json())
+
+        quiz_data = generate_quiz_from_transcript('transcript', 'test-key')
+
+        self.assertEqual(len(quiz_data['questions']), 10)
+        self.assertEqual(mock_stream.call_count, 2)
+        mock_prepare.assert_called_once()
+
+    @override_settings(QUIZ_GENERATION_ATTEMPTS=2)
+    @patch('quizzes_app.api.utils.generate_content_stream')
+
+    def test_attempts_exhausted(self, mock_stream, mock_prepare):
+        """Test that the last validation error is raised once all attempts returned invalid quizzes"""
+
+        mock_stream.side_effect = streams('not json', quiz_json(9))
+
+        with self.assertRaises(QuizGenerationError) as context:
+            generate_quiz_from_transcript('transcript', 'test-key')
+
+        self.assertEqual(str(context.exception), 'Invalid quiz data: Expected 10 questions, got 9')
+
+    @override_settings(QUIZ_GENERATION_ATTEMPTS=1)
+    @patch('quizzes_app.api.utils.generate_content_stream')
+
+    def test_failed_run_keeps_checkpoint(self, mock_stream, mock_prepare):
+        """Test that the artifacts of a failed run are stored on the run"""
+
+        run = self.create_run()
+        mock_stream.side_effect = streams(quiz_json(9))
+
+        with self.assertRaises(QuizGenerationError):
+            generate_quiz_from_transcript('transcript', 'test-key', Checkpoint(run))
+
+        run.refresh_from_db()
+        self.assertEqual(run.stage, 'generate')
+        self.assertEqual(run.checkpoint['compact']['value'], 'TRANSCRIPT')
+        self.assertEqual(run.checkpoint['generate']['value'], quiz_json(9))
+        self.assertEqual(len(run.checkpoint['stream']['value']['questions']), 9)
+
+    @patch('quizzes_app.api.utils.generate_content_stream')
+
+    def test_resume_skips_completed_stages(self, mock_stream, mock_prepare):
+        """Test that a run taken over from a leader that died reuses the compacted transcript and a valid stored response"""
+
+        first = self.create_run(lease_expires_at='2020-01-01T00:00Z')
+        mock_stream.side_effect = streams(quiz_json())
+        generate_quiz_from_transcript('transcript', 'test-key', Checkpoint(first))
+
+        quiz_data = run_single_flight('dQw4w9WgXcQ', lambda run: generate_quiz_from_transcript('transcript', 'test-key', Checkpoint(run)))
+
+        self.assertEqual(len(quiz_data['questions']), 10)
+        mock_prepare.assert_called_once()
+        mock_stream.assert_called_once()
+
+    @patch('quizzes_app.api.utils.generate_content_stream')
+
+    def test_fresh_request_after_success_calls_gemini(self, mock_stream, mock_prepare):
+        """Test that a completed run clears its checkpoint, so a later request generates a new quiz"""
+
+        mock_stream.side_effect = streams(quiz_json(), quiz_json())
+        generate = lambda run: generate_quiz_from_transcript('transcript', 'test-key', Checkpoint(run))
+
+        run_single_flight('dQw4w9WgXcQ', generate)
+        self.assertEqual(QuizPipelineRun.objects.get().checkpoint, {})
+
+        run_single_flight('dQw4w9WgXcQ', generate, requested_at=timezone.now())
+
+        self.assertEqual(mock_prepare.call_count, 2)
+        self.assertEqual(mock_stream.call_count, 2)
+
+    @override_settings(QUIZ_GENERATION_ATTEMPTS=1)
+    @patch('quizzes_app.api.utils.generate_content_stream')
+
+    def test_streamed_questions_saved_as_they_arrive(self, mock_stream, mock_prepare):
+        """Test that the title, description and each valid question are saved on the run while the quiz is streamed"""
+
+        run = self.create_run()
+        data = json.loads(quiz_json())
+        data['questions'][1]['answer'] = 'E'
+        text = json.dumps(data)
+        cut = text.index('Question 3?')
+        saved = []
+
+        def stream(api_key, contents, config):
+            yield text[:cut]
+            saved.append(QuizPipelineRun.objects.get().checkpoint['stream']['value'])
+            yield text[cut:]
+
+        mock_stream.side_effect = stream
+
+        with self.assertRaises(QuizGenerationError):
+            generate_quiz_from_transcript('transcript', 'test-key', Checkpoint(run))
+
+        self.assertEqual(saved[0]['title'], 'Test Quiz')
+        self.assertEqual(saved[0]['description'], 'A quiz about testing')
+        self.assertEqual([q['question_title'] for q in saved[0]['questions']], ['Question 0?', 'Question 2?'])
+
+        run.refresh_from_db()
+        self.assertEqual(len(run.checkpoint['stream']['value']['questions']), 9)
+
+    def test_takeover_of_completed_run_clears_checkpoint(self, mock_prepare):
+        """Test that taking over a completed run does not resume from artifacts left on it"""
+
+        self.create_run(status=QuizPipelineRun.Status.COMPLETED, finished_at='2026-01-01T00:01Z', checkpoint={'generate': {'source': 'x', 'value': 'y'}})
+
+        role, run = acquire_run('dQw4w9WgXcQ', timezone.now())
+
+        self.assertEqual(role, LEADER)
+        self.assertEqual(run.checkpoint, {})
+
+    @patch('quizzes_app.api.utils.generate_content_stream')
+
+    def test_checkpoint_of_other_transcript_ignored(self, mock_stream, mock_prepare):
+        """Test that artifacts derived from a different transcript are not reused"""
+
+        run = self.create_run()
+        mock_stream.side_effect = streams(quiz_json(), quiz_json())
+        generate_quiz_from_transcript('transcript', 'test-key', Checkpoint(run))
+
+        run.refresh_from_db()
+        generate_quiz_from_transcript('another transcript', 'test-key', Checkpoint(run))
+
+        self.assertEqual(mock_prepare.call_count, 2)
+        self.assertEqual(mock_stream.call_count, 2)
+
+
+class JobRetryTests(APITestCase):
+    """Tests for retrying failed quiz generation jobs"""
+
+    def setUp(self):
+        """Create a user with a failed job"""
+
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.job = QuizGenerationJob.objects.create(
+            user=self.user,
+            video_url='https://www.youtube.com/watch?v=dQw4w9WgXcQ',
+            status=QuizGenerationJob.Status.FAILED,
+            error='Quiz generation failed: Invalid quiz data',
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def test_retry_failed_job(self):
+        """Test that a failed job is queued again"""
+
+        response = self.client.post(reverse('quiz-job-retry', kwargs={'pk': self.job.pk}))
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['status'], QuizGenerationJob.Status.PENDING)
+        self.assertEqual(response.data['error'], '')
+        self.assertIsNotNone(response.data['retried_at'])
+
+    def test_retry_unfinished_job(self):
+        """Test that only failed jobs can be retried"""
+
+        QuizGenerationJob.objects.filter(pk=self.job.pk).update(status=QuizGenerationJob.Status.RUNNING)
+
+        response = self.client.post(reverse('quiz-job-retry', kwargs={'pk': self.job.pk}))
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+    def test_retry_other_users_job(self):
+        """Test that jobs of other users are not found"""
+
+        other = User.objects.create_user(username='otheruser', password='testpass123')
+        self.client.force_authenticate(user=other)
+
+        response = self.client.post(reverse('quiz-job-retry', kwargs={'pk': self.job.pk}))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    @patch('quizzes_app.api.pipeline.generate_quiz_from_transcript')
+    @patch('quizzes_app.api.pipeline.get_transcript', return_value='This is a test transcript')
+
+    def test_retried_job_runs_pipeline_again(self, mock_transcript, mock_stream):
+        """Test that a retried job does not receive the error of the shared run that failed before the retry"""
+
+        mock_stream.side_effect = [QuizGenerationError("Invalid quiz data"), json.loads(quiz_json())]
+        self.job.status = QuizGenerationJob.Status.PENDING
+        job = process_job(self.job)
+        self.assertEqual(job.status, QuizGenerationJob.Status.FAILED)
+
+        self.client.post(reverse('quiz-job-retry', kwargs={'pk': self.job.pk}))
+        job = process_job(QuizGenerationJob.objects.get(pk=self.job.pk))
+
+        self.assertEqual(job.status, QuizGenerationJob.Status.COMPLETED)
+        self.assertEqual(mock_stream.call_count, 2)
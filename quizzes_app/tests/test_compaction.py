@@ -0,0 +1,128 @@
+from django.apps import apps
+from django.test import SimpleTestCase, override_settings
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+import os
+
+from io import StringIO
+from types import SimpleNamespace
+from unittest.mock import patch
+from quizzes_app.api import compaction
+from quizzes_app.api.compaction import compact_transcript, count_tokens, get_encoding, prepare_transcript, split_into_token_chunks
+
+
+@patch('quizzes_app.api.compaction.get_encoding', return_value=None)
+class TranscriptCompactionTests(SimpleTestCase):
+    """Tests for token counting, compaction and map-reduce summarization of transcripts"""
+    
+    def test_count_tokens_estimate_without_encoding(self, mock_encoding):
+        """Test that tokens are estimated from the text length when tiktoken cannot load its encoding"""
+        
+        self.assertEqual(count_tokens('a' * 40), 11)
+    
+    def test_compact_transcript_removes_fillers_and_repetitions(self, mock_encoding):
+        """Test that filler sounds and repeated sentences are removed"""
+        
+        text = "Um, so the cell is, uh, the unit of life. Thank you. Thank you.  Thank you. Mitochondria make energy."
+        
+        self.assertEqual(
+            compact_transcript(text),
+            "so the cell is, the unit of life. Thank you. Mitochondria make energy."
+        )
+    
+    def test_compact_transcript_keeps_sentence_words(self, mock_encoding):
+        """Test that phrases and repeated words that belong to the sentence are kept"""
+        
+        text = "Do you know the capital of France? He had had enough. She said that that was wrong."
+        
+        self.assertEqual(compact_transcript(text), text)
+    
+    def test_split_into_token_chunks_keeps_sentences_whole(self, mock_encoding):
+        """Test that chunks stay under the token limit and end on sentence boundaries"""
+        
+        sentences = [f"Sentence number {i} is here." for i in range(10)]
+        chunks = split_into_token_chunks(' '.join(sentences), max_tokens=20)
+        
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(' '.join(chunks), ' '.join(sentences))
+        for chunk in chunks:
+            self.assertTrue(chunk.endswith('.'))
+            self.assertLessEqual(count_tokens(chunk), 20)
+    
+    @patch('quizzes_app.api.compaction.generate_content')
+    
+    def test_short_transcript_is_not_summarized(self, mock_generate, mock_encoding):
+        """Test that a transcript within the budget goes to the prompt without extra LLM calls"""
+        
+        self.assertEqual(prepare_transcript("Plants need light.", 'test-key'), "Plants need light.")
+        mock_generate.assert_not_called()
+    
+    @override_settings(QUIZ_TRANSCRIPT_TOKEN_BUDGET=50, QUIZ_SUMMARY_CHUNK_TOKENS=40, QUIZ_SUMMARY_MAX_ROUNDS=2)
+    @patch('quizzes_app.api.compaction.generate_content')
+    
+    def test_long_transcript_is_summarized_in_chunks(self, mock_generate, mock_encoding):
+        """Test that a transcript above the budget is replaced by the joined chunk summaries"""
+        
+        mock_generate.return_value = SimpleNamespace(text=' Summary. ')
+        transcript = ' '.join(f"Fact number {i} about photosynthesis." for i in range(20))
+        
+        result = prepare_transcript(transcript, 'test-key')
+        
+        self.assertGreater(mock_generate.call_count, 1)
+        self.assertEqual(result, '\n\n'.join(['Summary.'] * mock_generate.call_count))
+        self.assertIn('Fact number 0 about photosynthesis.', mock_generate.call_args_list[0].args[1])
+
+
+@override_settings(TIKTOKEN_ENCODING='test_encoding')
+class EncodingLoadTests(SimpleTestCase):
+    """Tests for loading the tiktoken encoding"""
+    
+    def setUp(self):
+        compaction._encoding_failed_at.clear()
+        self.addCleanup(compaction._encoding_failed_at.clear)
+    
+    @patch('quizzes_app.api.compaction.tiktoken.get_encoding')
+    
+    def test_failure_not_cached(self, mock_get_encoding):
+        """Test that a failed load is retried after ENCODING_RETRY_SECONDS instead of for the life of the process"""
+        
+        encoding = object()
+        mock_get_encoding.side_effect = [OSError('no network'), encoding]
+        
+        self.assertIsNone(get_encoding())
+        self.assertIsNone(get_encoding())
+        self.assertEqual(mock_get_encoding.call_count, 1)
+        
+        with patch('quizzes_app.api.compaction.time.monotonic', return_value=compaction._encoding_failed_at['test_encoding'] + compaction.ENCODING_RETRY_SECONDS):
+            self.assertIs(get_encoding(), encoding)
+    
+    @override_settings(TIKTOKEN_CACHE_DIR='/srv/tiktoken')
+    @patch('quizzes_app.api.compaction.tiktoken.get_encoding')
+    
+    def test_preload_command(self, mock_get_encoding):
+        """Test that the preload command loads the encoding into TIKTOKEN_CACHE_DIR and fails if it cannot"""
+        
+        out = StringIO()
+        call_command('preload_tiktoken_encoding', stdout=out)
+        self.assertIn('/srv/tiktoken', out.getvalue())
+        mock_get_encoding.assert_called_once_with('test_encoding')
+        
+        compaction._encoding_failed_at.clear()
+        mock_get_encoding.side_effect = OSError('no network')
+        
+        with self.assertRaises(CommandError):
+            call_command('preload_tiktoken_encoding', stdout=StringIO())
+    
+    @override_settings(TIKTOKEN_CACHE_DIR='/srv/tiktoken')
+    @patch('quizzes_app.api.compaction.tiktoken.get_encoding')
+    
+    def test_cache_dir_set_when_app_ready(self, mock_get_encoding):
+        """Test that the tiktoken cache directory is set once at startup, not on every token count"""
+        
+        with patch.dict('os.environ', {'TIKTOKEN_CACHE_DIR': '/elsewhere'}):
+            count_tokens('One sentence.')
+            self.assertEqual(os.environ['TIKTOKEN_CACHE_DIR'], '/elsewhere')
+            
+            apps.get_app_config('quizzes_app').ready()
+            self.assertEqual(os.environ['TIKTOKEN_CACHE_DIR'], '/srv/tiktoken')
@@ -0,0 +1,125 @@
+from django.test import SimpleTestCase, override_settings
+
+import json
+import threading
+
+from google.genai import errors
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from quizzes_app.api.gemini import generate_content, generate_content_stream, get_gemini_client
+
+
+class FakeGeminiHandler(BaseHTTPRequestHandler):
+    """Answers generateContent requests with the queued status codes, then with a text response"""
+    
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.server.requests.append(self.path)
+        status_code = self.server.statuses.pop(0) if self.server.statuses else 200
+        
+        if status_code == 200 and ':streamGenerateContent' in self.path:
+            payload = b''.join(
+                b'data: ' + json.dumps(self.text_body(text)).encode() + b'\r\n\r\n'
+                for text in ['Hello ', 'from ', 'Gemini']
+            )
+            content_type = 'text/event-stream'
+        elif status_code == 200:
+            payload = json.dumps(self.text_body('Hello from Gemini')).encode()
+            content_type = 'application/json'
+        else:
+            payload = json.dumps({'error': {'code': status_code, 'message': 'Fake error', 'status': 'UNAVAILABLE'}}).encode()
+            content_type = 'application/json'
+        
+        self.send_response(status_code)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+    
+    def text_body(self, text):
+        return {'candidates': [{'content': {'role': 'model', 'parts': [{'text': text}]}, 'finishReason': 'STOP'}]}
+    
+    def log_message(self, format, *args):
+        pass
+
+
+class GeminiClientTests(SimpleTestCase):
+    """Tests for the pooled Gemini client against a local fake HTTP server"""
+    
+    def setUp(self):
+        """Start the fake Gemini server and point the client at it"""
+        
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), FakeGeminiHandler)
+        self.server.requests = []
+        self.server.statuses = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        
+        settings_override = override_settings(
+            GEMINI_BASE_URL=f'http://127.0.0.1:{self.server.server_port}/',
+            GEMINI_MAX_ATTEMPTS=3,
+            GEMINI_BACKOFF_BASE=0.01,
+            GEMINI_BACKOFF_MAX=0.05,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+    
+    def test_generate_content(self):
+        """Test that the response text of the fake server is returned"""
+        
+        response = generate_content('test-key', 'Hello')
+        
+        self.assertEqual(response.text, 'Hello from Gemini')
+        self.assertIn(':generateContent', self.server.requests[0])
+    
+    def test_client_reused(self):
+        """Test that the same client (and connection pool) is returned for the same configuration"""
+        
+        self.assertIs(get_gemini_client('test-key'), get_gemini_client('test-key'))
+        self.assertIsNot(get_gemini_client('test-key'), get_gemini_client('other-key'))
+    
+    def test_transient_errors_retried(self):
+        """Test that rate limits and server errors are retried"""
+        
+        self.server.statuses = [429, 503]
+        
+        response = generate_content('test-key', 'Hello')
+        
+        self.assertEqual(response.text, 'Hello from Gemini')
+        self.assertEqual(len(self.server.requests), 3)
+    
+    def test_retries_give_up(self):
+        """Test that the error is raised once GEMINI_MAX_ATTEMPTS is reached"""
+        
+        self.server.statuses = [500, 500, 500]
+        
+        with self.assertRaises(errors.ServerError):
+            generate_content('test-key', 'Hello')
+        self.assertEqual(len(self.server.requests), 3)
+    
+    def test_client_errors_not_retried(self):
+        """Test that non-transient errors fail immediately"""
+        
+        self.server.statuses = [400]
+        
+        with self.assertRaises(errors.ClientError):
+            generate_content('test-key', 'Hello')
+        self.assertEqual(len(self.server.requests), 1)
+    
+    def test_generate_content_stream(self):
+        """Test that the streamed response text is yielded chunk by chunk"""
+        
+        chunks = list(generate_content_stream('test-key', 'Hello'))
+        
+        self.assertEqual(chunks, ['Hello ', 'from ', 'Gemini'])
+        self.assertIn(':streamGenerateContent', self.server.requests[0])
+    
+    def test_stream_retried_before_first_chunk(self):
+        """Test that a transient error when opening the stream is retried"""
+        
+        self.server.statuses = [503]
+        
+        chunks = list(generate_content_stream('test-key', 'Hello'))
+        
+        self.assertEqual(''.join(chunks), 'Hello from Gemini')
+        self.assertEqual(len(self.server.requests), 2)
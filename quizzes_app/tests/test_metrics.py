@@ -0,0 +1,110 @@
+from django.urls import reverse
+from django.test import SimpleTestCase, TestCase, override_settings
+
+import numpy as np
+
+from unittest.mock import patch
+from quizzes_app.api.metrics import MetricsRegistry, registry, stage_span
+from quizzes_app.api.utils import transcribe_audio, TranscriptionError
+
+
+class MetricsRegistryTests(SimpleTestCase):
+    """Tests for the Prometheus text rendering of counters and histograms"""
+    
+    def test_histogram_rendering(self):
+        """Test that histograms render cumulative buckets, sum and count per label set"""
+        
+        metrics = MetricsRegistry(buckets=(1, 5))
+        metrics.observe('duration_seconds', {'stage': 'download'}, 0.5, 'Durations.')
+        metrics.observe('duration_seconds', {'stage': 'download'}, 3)
+        
+        text = metrics.render()
+        
+        self.assertIn('# TYPE duration_seconds histogram', text)
+        self.assertIn('duration_seconds_bucket{stage="download",le="1"} 1', text)
+        self.assertIn('duration_seconds_bucket{stage="download",le="5"} 2', text)
+        self.assertIn('duration_seconds_bucket{stage="download",le="+Inf"} 2', text)
+        self.assertIn('duration_seconds_sum{stage="download"} 3.5', text)
+        self.assertIn('duration_seconds_count{stage="download"} 2', text)
+    
+    def test_counter_rendering(self):
+        """Test that counters are summed per label set and label values are escaped"""
+        
+        metrics = MetricsRegistry()
+        metrics.inc('bytes_total', {'stage': 'a"b'}, 10)
+        metrics.inc('bytes_total', {'stage': 'a"b'}, 5)
+        
+        self.assertIn('bytes_total{stage="a\\"b"} 15', metrics.render())
+
+
+class StageSpanTests(SimpleTestCase):
+    """Tests for the per-stage timing spans of the quiz pipeline"""
+    
+    def setUp(self):
+        """Start every test with an empty process registry"""
+        
+        registry.clear()
+        self.addCleanup(registry.clear)
+    
+    def test_span_records_duration_and_attributes(self):
+        """Test that a span is logged, observed in the stage histogram and its numeric attributes counted"""
+        
+        with self.assertLogs('quizzes_app.api.metrics', level='INFO') as logs:
+            with stage_span('download', streaming=False) as span:
+                span['bytes'] = 2048
+        
+        text = registry.render()
+        
+        self.assertIn('quiz_pipeline_stage_duration_seconds_count{outcome="ok",stage="download"} 1', text)
+        self.assertIn('quiz_pipeline_bytes_total{stage="download"} 2048', text)
+        self.assertNotIn('streaming', text)
+        self.assertIn('stage=download outcome=ok', logs.output[0])
+        self.assertIn('bytes=2048', logs.output[0])
+    
+    @patch('quizzes_app.api.utils.get_whisper_model')
+    
+    def test_failed_stage_recorded_as_error(self, mock_get_model):
+        """Test that a failing stage is observed with outcome="error" and the exception still propagates"""
+        
+        mock_get_model.side_effect = RuntimeError('Model missing')
+        
+        with self.assertRaises(TranscriptionError):
+            transcribe_audio(np.zeros(16000, dtype=np.float32))
+        
+        text = registry.render()
+        self.assertIn('quiz_pipeline_stage_duration_seconds_count{outcome="error",stage="transcribe"} 1', text)
+        self.assertIn('quiz_pipeline_audio_seconds_total{stage="transcribe"} 1.0', text)
+
+
+@override_settings(METRICS_TOKEN='metrics-secret')
+class MetricsEndpointTests(TestCase):
+    """Tests for GET /api/internal/metrics/"""
+    
+    def test_metrics_served_with_token(self):
+        """Test that the metrics are served in the Prometheus text format to clients with the token"""
+        
+        with stage_span('db_write'):
+            pass
+        
+        response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer metrics-secret')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        self.assertIn(b'quiz_pipeline_stage_duration_seconds_bucket{outcome="ok",stage="db_write",le="0.05"}', response.content)
+    
+    def test_metrics_forbidden_without_token(self):
+        """Test that local addresses (e.g. a reverse proxy) cannot read the metrics without the token"""
+        
+        for headers in ({}, {'HTTP_AUTHORIZATION': 'Bearer wrong'}):
+            with self.subTest(headers=headers):
+                response = self.client.get(reverse('metrics'), REMOTE_ADDR='127.0.0.1', **headers)
+                
+                self.assertEqual(response.status_code, 403)
+    
+    @override_settings(METRICS_TOKEN='')
+    def test_metrics_closed_without_configured_token(self):
+        """Test that the endpoint is closed while no token is configured"""
+        
+        response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer ')
+        
+        self.assertEqual(response.status_code, 403)
@@ -0,0 +1,258 @@
+from django.urls import reverse
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.core.management import call_command
+
+import os
+import json
+import tempfile
+import numpy as np
+
+from io import StringIO
+
+from unittest.mock import patch, MagicMock
+from django.contrib.auth.models import User
+from quizzes_app.models import Quiz, Transcript
+from quizzes_app.api.utils import stream_youtube_audio, YouTubeDownloadError
+from quizzes_app.api.pipeline import get_transcript
+from quizzes_app.api.services import create_quiz_with_questions
+from quizzes_app.api.serializers import QuestionDetailSerializer, QuizDetailSerializer
+
+
+class TranscriptCacheTests(TestCase):
+    """Tests for reusing stored transcripts in the quiz generation pipeline"""
+    
+    @patch('quizzes_app.api.backends.cleanup_temp_file')
+    @patch('quizzes_app.api.backends.transcribe_audio')
+    @patch('quizzes_app.api.backends.download_youtube_audio')
+    
+    def test_transcript_stored_and_reused(self, mock_download, mock_transcribe, mock_cleanup):
+        """Test that a second request for the same video skips download and transcription"""
+        
+        mock_download.return_value = '/tmp/test_audio.mp3'
+        mock_transcribe.return_value = 'This is a test transcript'
+        
+        first = get_transcript('https://www.youtube.com/watch?v=dQw4w9WgXcQ')
+        second = get_transcript('https://youtu.be/dQw4w9WgXcQ')
+        
+        self.assertEqual(first, 'This is a test transcript')
+        self.assertEqual(second, 'This is a test transcript')
+        self.assertEqual(Transcript.objects.filter(video_id='dQw4w9WgXcQ').count(), 1)
+        mock_download.assert_called_once()
+        mock_transcribe.assert_called_once()
+    
+    @patch('quizzes_app.api.backends.cleanup_temp_file')
+    @patch('quizzes_app.api.backends.transcribe_audio')
+    @patch('quizzes_app.api.backends.download_youtube_audio')
+    
+    def test_transcript_cached_per_model(self, mock_download, mock_transcribe, mock_cleanup):
+        """Test that a transcript from another Whisper model is not reused"""
+        
+        Transcript.objects.create(video_id='dQw4w9WgXcQ', model_name='tiny', model_version='0', text='Old transcript')
+        mock_download.return_value = '/tmp/test_audio.mp3'
+        mock_transcribe.return_value = 'New transcript'
+        
+        transcript = get_transcript('https://www.youtube.com/watch?v=dQw4w9WgXcQ')
+        
+        self.assertEqual(transcript, 'New transcript')
+        mock_download.assert_called_once()
+
+
+class StreamYouTubeAudioTests(TestCase):
+    """Tests for streaming audio from yt-dlp through ffmpeg into memory"""
+    
+    def fake_processes(self, pcm, download_returncode=0, decode_returncode=0):
+        """Return fake yt-dlp and ffmpeg processes for subprocess.Popen"""
+        
+        downloader = MagicMock(returncode=download_returncode)
+        decoder = MagicMock(returncode=decode_returncode)
+        decoder.communicate.return_value = (pcm, b'decode error')
+        return [downloader, decoder]
+    
+    @patch('quizzes_app.api.utils.subprocess.Popen')
+    
+    def test_pcm_converted_to_float_samples(self, mock_popen):
+        """Test that ffmpeg's 16-bit PCM output is returned as float samples for Whisper"""
+        
+        pcm = np.array([0, 16384, -32768], dtype=np.int16).tobytes()
+        downloader, decoder = self.fake_processes(pcm)
+        mock_popen.side_effect = [downloader, decoder]
+        
+        audio = stream_youtube_audio('https://www.youtube.com/watch?v=dQw4w9WgXcQ')
+        
+        self.assertEqual(audio.dtype, np.float32)
+        np.testing.assert_array_equal(audio, np.array([0.0, 0.5, -1.0], dtype=np.float32))
+        
+        decode_call = mock_popen.call_args_list[1]
+        self.assertIn('16000', decode_call.args[0])
+        self.assertIs(decode_call.kwargs['stdin'], downloader.stdout)
+    
+    @patch('quizzes_app.api.utils.subprocess.Popen')
+    
+    def test_decoder_failure_raises_download_error(self, mock_popen):
+        """Test that a failing ffmpeg process is reported as a download error"""
+        
+        mock_popen.side_effect = self.fake_processes(b'', decode_returncode=1)
+        
+        with self.assertRaises(YouTubeDownloadError):
+            stream_youtube_audio('https://www.youtube.com/watch?v=dQw4w9WgXcQ')
+    
+    @override_settings(AUDIO_STREAMING=True)
+    @patch('quizzes_app.api.backends.download_youtube_audio')
+    @patch('quizzes_app.api.backends.transcribe_audio')
+    @patch('quizzes_app.api.backends.stream_youtube_audio')
+    
+    def test_streaming_mode_skips_temp_file(self, mock_stream, mock_transcribe, mock_download):
+        """Test that AUDIO_STREAMING feeds the in-memory samples straight to Whisper"""
+        
+        samples = np.zeros(16000, dtype=np.float32)
+        mock_stream.return_value = samples
+        mock_transcribe.return_value = 'Streamed transcript'
+        
+        transcript = get_transcript('https://www.youtube.com/watch?v=dQw4w9WgXcQ')
+        
+        self.assertEqual(transcript, 'Streamed transcript')
+        mock_transcribe.assert_called_once_with(samples)
+        mock_download.assert_not_called()
+
+
+class QuizVideoIdTests(TestCase):
+    """Tests for the indexed video ID derived from Quiz.video_url"""
+    
+    def test_video_id_derived_on_save(self):
+        """Test that saving a quiz stores the canonical video ID of its URL"""
+        
+        user = User.objects.create_user(username='user1', password='testpass123')
+        quiz = Quiz.objects.create(user=user, title='Quiz', video_url='https://youtu.be/dQw4w9WgXcQ?t=30')
+        
+        self.assertEqual(quiz.video_id, 'dQw4w9WgXcQ')
+        self.assertTrue(Quiz.objects.filter(video_id='dQw4w9WgXcQ').exists())
+    
+    def test_video_id_updated_with_url(self):
+        """Test that changing the video URL of a quiz updates its video ID"""
+        
+        user = User.objects.create_user(username='user1', password='testpass123')
+        quiz = Quiz.objects.create(user=user, title='Quiz', video_url='https://youtu.be/dQw4w9WgXcQ')
+        
+        quiz.video_url = 'https://www.youtube.com/shorts/abcdefghijk'
+        quiz.save()
+        
+        self.assertEqual(Quiz.objects.get(pk=quiz.pk).video_id, 'abcdefghijk')
+    
+    def test_import_skips_existing_videos(self):
+        """Test that importing skips videos the user already has a quiz for, in any URL form"""
+        
+        user = User.objects.create_user(username='user1', password='testpass123')
+        Quiz.objects.create(user=user, title='Existing', video_url='https://youtu.be/dQw4w9WgXcQ')
+        quiz_data = {
+            'title': 'Imported',
+            'description': 'Imported quiz',
+            'questions': [{'question_title': 'Question', 'question_options': ['A', 'B', 'C', 'D'], 'answer': 'A'}],
+        }
+        quizzes = [
+            {**quiz_data, 'video_url': 'https://www.youtube.com/watch?v=dQw4w9WgXcQ&t=30'},
+            {**quiz_data, 'video_url': 'https://www.youtube.com/watch?v=abcdefghijk'},
+            {**quiz_data, 'video_url': 'https://youtu.be/abcdefghijk'},
+        ]
+        
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as file:
+            json.dump(quizzes, file)
+        self.addCleanup(os.remove, file.name)
+        
+        call_command('import_quizzes', 'user1', file.name, stdout=StringIO())
+        
+        self.assertEqual(Quiz.objects.filter(user=user, video_id='dQw4w9WgXcQ').count(), 1)
+        self.assertEqual(Quiz.objects.filter(user=user, video_id='abcdefghijk').count(), 1)
+        
+        call_command('import_quizzes', 'user1', file.name, '--allow-duplicates', stdout=StringIO())
+        
+        self.assertEqual(Quiz.objects.filter(user=user).count(), 5)
+
+
+class CreateQuizWithQuestionsTests(TestCase):
+    """Tests for the transactional quiz persistence service"""
+    
+    def setUp(self):
+        """Set up test user and generated quiz data"""
+        
+        self.user = User.objects.create_user(username='user1', password='testpass123')
+        self.quiz_data = {
+            'title': 'Test Quiz',
+            'description': 'A quiz about testing',
+            'questions': [
+                {
+                    'question_title': f'Question {i}',
+                    'question_options': ['A', 'B', 'C', 'D'],
+                    'answer': 'A'
+                }
+                for i in range(10)
+            ]
+        }
+    
+    def test_questions_bulk_inserted(self):
+        """Test that the quiz and all questions are written with two INSERT statements"""
+        
+        with CaptureQueriesContext(connection) as queries:
+            quiz, _ = create_quiz_with_questions(self.user, 'https://www.youtube.com/watch?v=dQw4w9WgXcQ', self.quiz_data)
+        
+        inserts = [query for query in queries.captured_queries if query['sql'].startswith('INSERT')]
+        self.assertEqual(len(inserts), 2)
+        self.assertEqual(quiz.questions.count(), 10)
+    
+    def test_returned_questions_serialize_without_queries(self):
+        """Test that the created questions are returned with the quiz, ready to serialize"""
+        
+        quiz, questions = create_quiz_with_questions(self.user, 'https://www.youtube.com/watch?v=dQw4w9WgXcQ', self.quiz_data)
+        
+        with self.assertNumQueries(0):
+            data = QuestionDetailSerializer(questions, many=True).data
+        
+        self.assertEqual(data, QuizDetailSerializer(Quiz.objects.prefetch_related('questions').get(pk=quiz.pk)).data['questions'])
+        self.assertEqual(len(data), 10)
+        self.assertIsNotNone(data[0]['id'])
+        self.assertIsNotNone(data[0]['created_at'])
+    
+    def test_failed_question_rolls_back_quiz(self):
+        """Test that no half-written quiz is left behind when a question cannot be stored"""
+        
+        del self.quiz_data['questions'][5]['answer']
+        
+        with self.assertRaises(KeyError):
+            create_quiz_with_questions(self.user, 'https://www.youtube.com/watch?v=dQw4w9WgXcQ', self.quiz_data)
+        
+        self.assertEqual(Quiz.objects.count(), 0)
+
+
+class QuizAdminTests(TestCase):
+    """Tests for creating quizzes with questions in the admin"""
+    
+    def test_inline_questions_bulk_inserted(self):
+        """Test that the questions added with a new quiz are written with one INSERT"""
+        
+        admin_user = User.objects.create_superuser(username='admin', password='testpass123')
+        self.client.force_login(admin_user)
+        data = {
+            'user': admin_user.pk,
+            'title': 'Admin Quiz',
+            'description': '',
+            'video_url': 'https://youtu.be/dQw4w9WgXcQ',
+            'questions-TOTAL_FORMS': '3',
+            'questions-INITIAL_FORMS': '0',
+            'questions-MIN_NUM_FORMS': '0',
+            'questions-MAX_NUM_FORMS': '1000',
+        }
+        for i in range(3):
+            data[f'questions-{i}-question_title'] = f'Question {i}'
+            data[f'questions-{i}-question_options'] = '["A", "B", "C", "D"]'
+            data[f'questions-{i}-answer'] = 'A'
+        
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('admin:quizzes_app_quiz_add'), data)
+        
+        self.assertEqual(response.status_code, 302)
+        quiz = Quiz.objects.get()
+        self.assertEqual(quiz.video_id, 'dQw4w9WgXcQ')
+        self.assertEqual(quiz.questions.count(), 3)
+        inserts = [query for query in queries.captured_queries if query['sql'].startswith('INSERT INTO "quizzes_app_question"')]
+        self.assertEqual(len(inserts), 1)
@@ -0,0 +1,195 @@
+from django.conf import settings
+from django.urls import reverse
+from django.test import override_settings
+from django.contrib.auth.models import User
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.testing import QueryBudgetTestMixin, url_names
+from quizzes_app.models import Quiz, Question, QuizGenerationJob
+
+
+class QuizQueryBudgetTests(QueryBudgetTestMixin, APITestCase):
+    """
+    Query count and latency budgets of the quiz endpoints.
+    Requests authenticate with the access token cookie, so the user lookup counts against the budget.
+    """
+    
+    def setUp(self):
+        """Create two users, ten quizzes with ten questions each and a job"""
+        
+        self.user1 = User.objects.create_user(username='user1', password='testpass123')
+        self.user2 = User.objects.create_user(username='user2', password='testpass123')
+        
+        for i in range(10):
+            quiz = Quiz.objects.create(user=self.user1, title=f'Quiz {i}', video_url=f'https://www.youtube.com/watch?v=test{i}')
+            Question.objects.bulk_create([
+                Question(quiz=quiz, question_title=f'Question {k}?', question_options=['A', 'B', 'C', 'D'], answer='A')
+                for k in range(10)
+            ])
+        self.quiz = Quiz.objects.filter(user=self.user1).first()
+        self.job = QuizGenerationJob.objects.create(user=self.user1, video_url='https://www.youtube.com/watch?v=dQw4w9WgXcQ')
+        
+        self.client.cookies['access'] = str(AccessToken.for_user(self.user1))
+    
+    def test_every_url_name_has_a_budget(self):
+        """Test that every API route declares a budget"""
+        
+        for urlconf in ('quizzes_app.api.urls', 'auth_app.api.urls'):
+            for name in url_names(urlconf):
+                self.assertIn(name, settings.QUERY_BUDGETS, f"{urlconf}: {name}")
+    
+    def test_quiz_list_budget(self):
+        """Test that listing quizzes does not query per quiz"""
+        
+        response = self.client.get(reverse('quizzes'))
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 10)
+        self.assertWithinBudget(response)
+    
+    def test_quiz_create_budget(self):
+        """Test that queuing a quiz generation job stays within the budget"""
+        
+        response = self.client.post(reverse('quizzes'), {'url': 'https://www.youtube.com/watch?v=dQw4w9WgXcQ'}, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertWithinBudget(response)
+    
+    async def test_quiz_list_budget_async_client(self):
+        """Test that queries running in sync_to_async threads are counted under ASGI"""
+        
+        self.async_client.cookies['access'] = str(AccessToken.for_user(self.user1))
+        
+        response = await self.async_client.get(reverse('quizzes'))
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.assertWithinBudget(response).count, 3)
+    
+    def test_quiz_detail_budget(self):
+        """Test GET, PATCH and DELETE of a quiz stay within the budget"""
+        
+        url = reverse('quiz-detail', kwargs={'pk': self.quiz.pk})
+        
+        self.assertWithinBudget(self.client.get(url))
+        self.assertWithinBudget(self.client.patch(url, {'title': 'Renamed'}, format='json'))
+        
+        response = self.client.delete(url)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertWithinBudget(response)
+    
+    def test_quiz_delete_with_job_budget(self):
+        """Test that deleting a quiz generated by a job, which unlinks the job, stays within the budget"""
+        
+        QuizGenerationJob.objects.filter(pk=self.job.pk).update(status=QuizGenerationJob.Status.COMPLETED, quiz=self.quiz)
+        
+        response = self.client.delete(reverse('quiz-detail', kwargs={'pk': self.quiz.pk}))
+        
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertIsNone(QuizGenerationJob.objects.get(pk=self.job.pk).quiz)
+        self.assertWithinBudget(response)
+    
+    def test_quiz_detail_forbidden_budget(self):
+        """Test that a request for another user's quiz stays within the budget"""
+        
+        self.client.cookies['access'] = str(AccessToken.for_user(self.user2))
+        
+        response = self.client.get(reverse('quiz-detail', kwargs={'pk': self.quiz.pk}))
+        
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertWithinBudget(response)
+    
+    def test_job_detail_budget(self):
+        """Test that polling a job stays within the budget"""
+        
+        response = self.client.get(reverse('quiz-job-detail', kwargs={'pk': self.job.pk}))
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertWithinBudget(response)
+    
+    def test_completed_job_detail_budget(self):
+        """Test that polling a completed job, which returns its quiz, stays within the budget"""
+        
+        QuizGenerationJob.objects.filter(pk=self.job.pk).update(status=QuizGenerationJob.Status.COMPLETED, quiz=self.quiz)
+        
+        response = self.client.get(reverse('quiz-job-detail', kwargs={'pk': self.job.pk}))
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['quiz']['questions']), 10)
+        self.assertEqual(self.assertWithinBudget(response).count, 4)
+    
+    def test_completed_job_long_poll_budget(self):
+        """Test that a long poll of a completed job returns at once and stays within the budget"""
+        
+        QuizGenerationJob.objects.filter(pk=self.job.pk).update(status=QuizGenerationJob.Status.COMPLETED, quiz=self.quiz)
+        
+        response = self.client.get(reverse('quiz-job-detail', kwargs={'pk': self.job.pk}), {'wait': 5})
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.assertWithinBudget(response).count, 4)
+    
+    def test_job_retry_budget(self):
+        """Test that retrying a failed job stays within the budget"""
+        
+        QuizGenerationJob.objects.filter(pk=self.job.pk).update(status=QuizGenerationJob.Status.FAILED)
+        
+        response = self.client.post(reverse('quiz-job-retry', kwargs={'pk': self.job.pk}))
+        
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertWithinBudget(response)
+    
+    def test_quiz_stream_budget(self):
+        """Test that a rejected stream request stays within the budget"""
+        
+        response = self.client.post(reverse('quiz-stream'), {'url': 'not a url'}, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertWithinBudget(response)
+    
+    def test_quiz_stream_accepted_budget(self):
+        """Test that queuing the job of a stream request stays within the budget"""
+        
+        response = self.client.post(reverse('quiz-stream'), {'url': 'https://www.youtube.com/watch?v=dQw4w9WgXcQ'}, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertWithinBudget(response)
+    
+    @override_settings(METRICS_TOKEN='metrics-secret')
+    def test_metrics_budget(self):
+        """Test that the metrics endpoint does not query the database"""
+        
+        del self.client.cookies['access']
+        response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer metrics-secret')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertWithinBudget(response)
+    
+    @override_settings(DEBUG=True)
+    def test_debug_headers(self):
+        """Test that query count and timings are sent as headers in debug mode"""
+        
+        response = self.client.get(reverse('quizzes'))
+        
+        self.assertEqual(response['X-DB-Queries'], str(response.query_stats.count))
+        self.assertIn('X-DB-Time', response)
+        self.assertIn('X-Response-Time', response)
+    
+    def test_no_debug_headers_in_production(self):
+        """Test that the headers are not sent when DEBUG is off"""
+        
+        response = self.client.get(reverse('quizzes'))
+        
+        self.assertNotIn('X-DB-Queries', response)
+    
+    @override_settings(QUERY_BUDGETS={'quizzes': {'queries': 1}})
+    def test_budget_exceeded(self):
+        """Test that a request over its budget fails the assertion and is logged"""
+        
+        with self.assertLogs('core.middleware', level='WARNING') as logs:
+            response = self.client.get(reverse('quizzes'))
+        
+        self.assertIn('exceeded its budget', logs.output[0])
+        with self.assertRaisesMessage(AssertionError, 'quizzes exceeded its budget: 3 queries (budget 1)'):
+            self.assertWithinBudget(response)
@@ -72,6 +72,17 @@ class QuizDetailTests(APITestCase):
         
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
     
+    def test_get_quiz_detail_unauthorized_user_skips_questions(self):
+        """Test that a forbidden request neither loads the quiz's questions nor its owner"""
+        
+        self.client.force_authenticate(user=self.user2)
+        url = reverse('quiz-detail', kwargs={'pk': self.quiz1.pk})
+        
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+        
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+    
     def test_get_quiz_detail_not_found(self):
         """Test retrieval of non-existent quiz (404)"""
         
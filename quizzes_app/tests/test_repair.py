@@ -0,0 +1,183 @@
+from django.test import SimpleTestCase, override_settings
+
+import json
+
+from types import SimpleNamespace
+from unittest.mock import patch
+from quizzes_app.api.utils import (
+    generate_quiz_from_transcript,
+    split_questions,
+    response_config,
+    QuizGenerationError,
+    QUIZ_SCHEMA,
+)
+
+
+def question(i, options=('A', 'B', 'C', 'D')):
+    return {'question_title': f'Question {i}?', 'question_options': list(options), 'answer': 'A'}
+
+
+def quiz_json(questions):
+    return json.dumps({'title': 'Test Quiz', 'description': 'A quiz about testing', 'questions': questions})
+
+
+def responses(*texts):
+    return [SimpleNamespace(text=text) for text in texts]
+
+
+def streams(*texts):
+    return [iter([text]) for text in texts]
+
+
+class QuestionValidationTests(SimpleTestCase):
+    """Tests for splitting valid from invalid questions and the structured output config"""
+
+    def test_split_questions(self):
+        """Test that invalid and repeated questions are reported and valid ones kept"""
+
+        questions = [question(1), question(2, options=('A', 'B')), question(1), {'question_title': 'Q?'}]
+
+        valid, problems = split_questions(questions)
+
+        self.assertEqual(valid, [question(1)])
+        self.assertEqual(problems, [
+            'Question 2 must have exactly 4 options',
+            'Question 3 repeats an earlier question',
+            'Question 4 has invalid structure',
+            'Expected 10 questions, got 1 valid ones',
+        ])
+
+    def test_malformed_questions_invalid(self):
+        """Test that questions with values of the wrong type or an answer outside the options are reported, not raised"""
+
+        questions = [
+            {**question(1), 'question_options': None},
+            {**question(2), 'question_title': None},
+            {**question(3), 'question_options': 'ABCD'},
+            {**question(4), 'question_options': ['A', 'A', 'B', 'C']},
+            {**question(5), 'question_options': ['A', 'B', 'C', 4]},
+            {**question(6), 'answer': 'E'},
+            {**question(7), 'answer': None},
+            question(8),
+        ]
+
+        valid, problems = split_questions(questions)
+
+        self.assertEqual(valid, [question(8)])
+        self.assertEqual(problems, [
+            'Question 1 must have exactly 4 options',
+            'Question 2 must have a title',
+            'Question 3 must have exactly 4 options',
+            'Question 4 must have 4 distinct text options',
+            'Question 5 must have 4 distinct text options',
+            'Question 6 must have an answer that is one of its options',
+            'Question 7 must have an answer that is one of its options',
+            'Expected 10 questions, got 1 valid ones',
+        ])
+
+    def test_split_questions_extra(self):
+        """Test that questions beyond the quiz length are dropped without a problem"""
+
+        valid, problems = split_questions([question(i) for i in range(12)])
+
+        self.assertEqual(len(valid), 10)
+        self.assertEqual(problems, [])
+
+    @override_settings(GEMINI_STRUCTURED_OUTPUT=False)
+    def test_structured_output_disabled(self):
+        """Test that structured output can be turned off"""
+
+        self.assertIsNone(response_config(QUIZ_SCHEMA))
+
+
+@patch('quizzes_app.api.utils.prepare_transcript', side_effect=lambda transcript, api_key: transcript)
+class QuizRepairTests(SimpleTestCase):
+    """Tests for repairing invalid quizzes by asking only for the missing or invalid questions"""
+
+    @patch('quizzes_app.api.utils.generate_content')
+    @patch('quizzes_app.api.utils.generate_content_stream')
+
+    def test_missing_question_repaired(self, mock_stream, mock_generate, mock_prepare):
+        """Test that a quiz with 9 questions is completed with one replacement question"""
+
+        mock_stream.side_effect = streams(quiz_json([question(i) for i in range(9)]))
+        mock_generate.side_effect = responses(json.dumps([question(9)]))
+
+        quiz_data = generate_quiz_from_transcript('transcript', 'test-key')
+
+        self.assertEqual(quiz_data['questions'], [question(i) for i in range(10)])
+        mock_stream.assert_called_once()
+        mock_generate.assert_called_once()
+
+        contents = mock_generate.call_args.args[1]
+        self.assertEqual([content.role for content in contents], ['user', 'model', 'user'])
+        self.assertIn('Expected 10 questions, got 9 valid ones', contents[2].parts[0].text)
+        self.assertIn('Write 1 new question(s)', contents[2].parts[0].text)
+
+    @patch('quizzes_app.api.utils.generate_content')
+    @patch('quizzes_app.api.utils.generate_content_stream')
+
+    def test_invalid_question_replaced(self, mock_stream, mock_generate, mock_prepare):
+        """Test that only the invalid question is replaced and the valid ones are kept"""
+
+        questions = [question(i) for i in range(10)]
+        questions[3] = question(3, options=('A', 'B', 'C'))
+        mock_stream.side_effect = streams(quiz_json(questions))
+        mock_generate.side_effect = responses(json.dumps([question(10)]))
+
+        quiz_data = generate_quiz_from_transcript('transcript', 'test-key')
+
+        titles = [q['question_title'] for q in quiz_data['questions']]
+        self.assertNotIn('Question 3?', titles)
+        self.assertIn('Question 10?', titles)
+        self.assertEqual(len(titles), 10)
+
+        schema = mock_generate.call_args.args[2].response_schema
+        self.assertEqual((schema.min_items, schema.max_items), (1, 1))
+
+    @patch('quizzes_app.api.utils.generate_content')
+    @patch('quizzes_app.api.utils.generate_content_stream')
+
+    def test_null_options_replaced(self, mock_stream, mock_generate, mock_prepare):
+        """Test that a question with null options is replaced instead of failing the whole quiz"""
+
+        questions = [question(i) for i in range(10)]
+        questions[5]['question_options'] = None
+        mock_stream.side_effect = streams(quiz_json(questions))
+        mock_generate.side_effect = responses(json.dumps([question(10)]))
+
+        quiz_data = generate_quiz_from_transcript('transcript', 'test-key')
+
+        self.assertEqual(len(quiz_data['questions']), 10)
+        mock_stream.assert_called_once()
+        mock_generate.assert_called_once()
+
+    @override_settings(QUIZ_GENERATION_ATTEMPTS=2)
+    @patch('quizzes_app.api.utils.generate_content')
+    @patch('quizzes_app.api.utils.generate_content_stream')
+
+    def test_failed_repair(self, mock_stream, mock_generate, mock_prepare):
+        """Test that the quiz fails if the repair returns no usable questions"""
+
+        mock_stream.side_effect = streams(quiz_json([question(i) for i in range(9)]))
+        mock_generate.side_effect = responses('not json')
+
+        with self.assertRaises(QuizGenerationError) as context:
+            generate_quiz_from_transcript('transcript', 'test-key')
+
+        self.assertEqual(str(context.exception), 'Invalid quiz data: Expected 10 questions, got 9')
+
+    @patch('quizzes_app.api.utils.generate_content')
+    @patch('quizzes_app.api.utils.generate_content_stream')
+
+    def test_structured_output(self, mock_stream, mock_generate, mock_prepare):
+        """Test that the quiz is requested as JSON following the quiz schema"""
+
+        mock_stream.side_effect = streams(quiz_json([question(i) for i in range(10)]))
+
+        generate_quiz_from_transcript('transcript', 'test-key')
+
+        mock_generate.assert_not_called()
+        config = mock_stream.call_args.args[2]
+        self.assertEqual(config.response_mime_type, 'application/json')
+        self.assertEqual(config.response_schema, QUIZ_SCHEMA)
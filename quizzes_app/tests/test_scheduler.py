@@ -0,0 +1,148 @@
+from django.urls import reverse
+from django.test import TestCase, SimpleTestCase, override_settings
+from django.contrib.auth.models import User
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework.exceptions import Throttled
+
+import shutil
+import tempfile
+import torch
+
+from unittest.mock import patch
+from quizzes_app.models import QuizGenerationJob
+from quizzes_app.api.jobs import claim_next_job
+from quizzes_app.api.scheduler import admit_quiz_job, fair_order, transcription_slot, try_lock_slot
+
+
+class TranscriptionSlotTests(SimpleTestCase):
+    """Tests for the node-wide transcription slots"""
+
+    def setUp(self):
+        self.lock_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.lock_dir, ignore_errors=True)
+
+    def test_slot_taken_while_transcribing(self):
+        """Test that the slot is locked for other processes while held and free afterwards"""
+
+        with override_settings(TRANSCRIPTION_LOCK_DIR=self.lock_dir, TRANSCRIPTION_MAX_CONCURRENCY=1):
+            with transcription_slot():
+                self.assertIsNone(try_lock_slot(self.lock_dir, 1))
+
+            handle = try_lock_slot(self.lock_dir, 1)
+            self.assertIsNotNone(handle)
+            handle.close()
+
+    def test_second_slot_used(self):
+        """Test that a second transcription gets the next slot when more than one is configured"""
+
+        with override_settings(TRANSCRIPTION_LOCK_DIR=self.lock_dir, TRANSCRIPTION_MAX_CONCURRENCY=2):
+            with transcription_slot():
+                handle = try_lock_slot(self.lock_dir, 2)
+                self.assertIsNotNone(handle)
+                self.assertIsNone(try_lock_slot(self.lock_dir, 2))
+                handle.close()
+
+    def test_torch_threads_pinned(self):
+        """Test that torch keeps the configured thread count, so transcriptions in other threads are not changed"""
+
+        self.addCleanup(torch.set_num_threads, torch.get_num_threads())
+
+        with override_settings(TRANSCRIPTION_LOCK_DIR=self.lock_dir, TRANSCRIPTION_MAX_CONCURRENCY=2, TRANSCRIPTION_TORCH_THREADS=1):
+            with transcription_slot():
+                self.assertEqual(torch.get_num_threads(), 1)
+                with transcription_slot():
+                    pass
+                self.assertEqual(torch.get_num_threads(), 1)
+
+        self.assertEqual(torch.get_num_threads(), 1)
+
+
+class FairQueueTests(TestCase):
+    """Tests for fair per-user ordering of the job queue"""
+
+    def test_fair_order(self):
+        """Test that users take turns and users with running jobs come last"""
+
+        candidates = [(1, 'a'), (2, 'a'), (3, 'a'), (4, 'b'), (5, 'c')]
+
+        self.assertEqual(fair_order(candidates, {}), [1, 4, 5, 2, 3])
+        self.assertEqual(fair_order(candidates, {'b': 1}), [1, 5, 2, 4, 3])
+
+    def test_claim_alternates_users(self):
+        """Test that a user with many queued jobs does not hold up a later user"""
+
+        heavy = User.objects.create_user(username='heavy', password='testpass123')
+        light = User.objects.create_user(username='light', password='testpass123')
+        heavy_jobs = [QuizGenerationJob.objects.create(user=heavy, video_url='https://youtu.be/dQw4w9WgXcQ') for _ in range(3)]
+        light_job = QuizGenerationJob.objects.create(user=light, video_url='https://youtu.be/dQw4w9WgXcQ')
+
+        self.assertEqual(claim_next_job().pk, heavy_jobs[0].pk)
+        self.assertEqual(claim_next_job().pk, light_job.pk)
+        self.assertEqual(claim_next_job().pk, heavy_jobs[1].pk)
+
+
+@override_settings(QUIZ_QUEUE_MAX_PENDING=3, QUIZ_QUEUE_MAX_PENDING_PER_USER=2, QUIZ_QUEUE_RETRY_AFTER=30)
+class AdmissionControlTests(APITestCase):
+    """Tests for back-pressure on quiz creation when the job queue is full"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.other = User.objects.create_user(username='otheruser', password='testpass123')
+        self.url = reverse('quizzes')
+        self.client.force_authenticate(user=self.user)
+
+    def queue_jobs(self, user, count):
+        for _ in range(count):
+            QuizGenerationJob.objects.create(user=user, video_url='https://youtu.be/dQw4w9WgXcQ')
+
+    @patch('quizzes_app.api.serializers.validate_youtube_url', return_value=True)
+
+    def test_user_limit(self, mock_validate):
+        """Test that a user with too many waiting jobs gets 429 with Retry-After"""
+
+        self.queue_jobs(self.user, 2)
+
+        response = self.client.post(self.url, {'url': 'https://www.youtube.com/watch?v=dQw4w9WgXcQ'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response['Retry-After'], '30')
+        self.assertEqual(QuizGenerationJob.objects.filter(user=self.user).count(), 2)
+
+    @patch('quizzes_app.api.serializers.validate_youtube_url', return_value=True)
+
+    def test_queue_limit(self, mock_validate):
+        """Test that new jobs are rejected while the queue is full"""
+
+        self.queue_jobs(self.other, 3)
+
+        response = self.client.post(self.url, {'url': 'https://www.youtube.com/watch?v=dQw4w9WgXcQ'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', response)
+
+    @patch('quizzes_app.api.serializers.validate_youtube_url', return_value=True)
+
+    def test_running_jobs_not_counted(self, mock_validate):
+        """Test that jobs already being processed do not count against the queue"""
+
+        self.queue_jobs(self.user, 2)
+        QuizGenerationJob.objects.update(status=QuizGenerationJob.Status.RUNNING)
+
+        response = self.client.post(self.url, {'url': 'https://www.youtube.com/watch?v=dQw4w9WgXcQ'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+
+    @patch('quizzes_app.api.scheduler.lock_job_queue')
+
+    def test_job_created_under_queue_lock(self, mock_lock):
+        """Test that the job is created after the queue lock was taken, and not at all when the queue is full"""
+
+        create = lambda: mock_lock.assert_called_once_with(self.user.id) or 'job'
+
+        self.assertEqual(admit_quiz_job(self.user.id, create), 'job')
+
+        self.queue_jobs(self.user, 2)
+        with self.assertRaises(Throttled):
+            admit_quiz_job(self.user.id, lambda: self.fail('Job created although the user limit was reached'))
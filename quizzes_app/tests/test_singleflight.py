@@ -0,0 +1,113 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from unittest.mock import patch, MagicMock
+from django.contrib.auth.models import User
+from quizzes_app.models import Quiz, QuizGenerationJob, QuizPipelineRun
+from quizzes_app.api.jobs import process_job
+from quizzes_app.api.pipeline import describe_pipeline_error
+from quizzes_app.api.singleflight import SingleFlightError, run_single_flight
+
+
+class SingleFlightTests(TestCase):
+    """Tests for sharing one pipeline run between concurrent requests for the same video"""
+    
+    def create_running_run(self, lease_seconds=60):
+        """Create a run held by another process"""
+        
+        return QuizPipelineRun.objects.create(
+            video_id='dQw4w9WgXcQ',
+            owner='other-process',
+            lease_expires_at=timezone.now() + timedelta(seconds=lease_seconds),
+            started_at=timezone.now(),
+        )
+    
+    def finish_run(self, **fields):
+        """Return a sleep replacement that lets the other process finish its run"""
+        
+        def finish(seconds):
+            QuizPipelineRun.objects.filter(video_id='dQw4w9WgXcQ').update(finished_at=timezone.now(), **fields)
+        return finish
+    
+    def test_leader_runs_and_stores_result(self):
+        """Test that the first request runs the function and stores its result"""
+        
+        func = MagicMock(return_value={'title': 'Quiz'})
+        
+        result = run_single_flight('dQw4w9WgXcQ', func)
+        
+        self.assertEqual(result, {'title': 'Quiz'})
+        func.assert_called_once()
+        run = QuizPipelineRun.objects.get(video_id='dQw4w9WgXcQ')
+        self.assertEqual(run.status, QuizPipelineRun.Status.COMPLETED)
+        self.assertEqual(run.result, {'title': 'Quiz'})
+    
+    def test_follower_receives_leader_result(self):
+        """Test that a request arriving during a run waits for it instead of running the pipeline again"""
+        
+        self.create_running_run()
+        func = MagicMock()
+        
+        with patch('quizzes_app.api.singleflight.time.sleep', side_effect=self.finish_run(status=QuizPipelineRun.Status.COMPLETED, result={'title': 'Shared'})) as mock_sleep:
+            result = run_single_flight('dQw4w9WgXcQ', func)
+        
+        self.assertEqual(result, {'title': 'Shared'})
+        mock_sleep.assert_called_once()
+        func.assert_not_called()
+    
+    def test_follower_receives_leader_failure(self):
+        """Test that the error of a failed run is passed on to the requests that waited for it"""
+        
+        self.create_running_run()
+        
+        with patch('quizzes_app.api.singleflight.time.sleep', side_effect=self.finish_run(status=QuizPipelineRun.Status.FAILED, error='YouTube download failed: private video')):
+            with self.assertRaises(SingleFlightError) as context:
+                run_single_flight('dQw4w9WgXcQ', MagicMock())
+        
+        self.assertEqual(describe_pipeline_error(context.exception), 'YouTube download failed: private video')
+    
+    def test_expired_lease_taken_over(self):
+        """Test that a run abandoned by a crashed process is taken over"""
+        
+        self.create_running_run(lease_seconds=-1)
+        func = MagicMock(return_value={'title': 'Quiz'})
+        
+        self.assertEqual(run_single_flight('dQw4w9WgXcQ', func), {'title': 'Quiz'})
+        func.assert_called_once()
+        self.assertNotEqual(QuizPipelineRun.objects.get(video_id='dQw4w9WgXcQ').owner, 'other-process')
+    
+    def test_result_finished_before_request_not_reused(self):
+        """Test that a later request for the same video starts a new run"""
+        
+        run_single_flight('dQw4w9WgXcQ', MagicMock(return_value={'title': 'Old'}))
+        func = MagicMock(return_value={'title': 'New'})
+        
+        result = run_single_flight('dQw4w9WgXcQ', func, requested_at=timezone.now() + timedelta(seconds=1))
+        
+        self.assertEqual(result, {'title': 'New'})
+        func.assert_called_once()
+    
+    @patch('quizzes_app.api.pipeline.generate_quiz_from_transcript')
+    @patch('quizzes_app.api.pipeline.get_transcript')
+    
+    def test_jobs_for_same_video_share_pipeline(self, mock_transcript, mock_generate):
+        """Test that jobs queued while a run was in flight get their own quiz from the shared result"""
+        
+        mock_transcript.return_value = 'This is a test transcript'
+        mock_generate.return_value = {
+            'title': 'Test Quiz',
+            'description': 'A quiz about testing',
+            'questions': [{'question_title': 'Q?', 'question_options': ['A', 'B', 'C', 'D'], 'answer': 'A'}],
+        }
+        users = [User.objects.create_user(username=f'student{i}', password='testpass123') for i in range(3)]
+        jobs = [QuizGenerationJob.objects.create(user=user, video_url='https://youtu.be/dQw4w9WgXcQ') for user in users]
+        
+        for job in jobs:
+            job = process_job(job)
+            self.assertEqual(job.status, QuizGenerationJob.Status.COMPLETED)
+        
+        mock_generate.assert_called_once()
+        self.assertEqual(Quiz.objects.count(), 3)
+        self.assertEqual(set(Quiz.objects.values_list('user', flat=True)), {user.id for user in users})
@@ -0,0 +1,84 @@
+from django.test import SimpleTestCase
+
+import json
+
+from quizzes_app.api.streaming import QuizStreamParser, format_sse
+
+
+QUIZ = {
+    'title': 'Photosynthesis',
+    'description': 'How plants turn light into energy',
+    'questions': [
+        {
+            'question_title': f'Question {i}?',
+            'question_options': ['A', 'B', 'C "quoted" {braces}'],
+            'answer': 'A'
+        }
+        for i in range(3)
+    ]
+}
+
+
+class QuizStreamParserTests(SimpleTestCase):
+    """Tests for incremental parsing of the streamed quiz JSON"""
+    
+    def feed_in_pieces(self, text, size):
+        parser = QuizStreamParser()
+        events = []
+        for start in range(0, len(text), size):
+            events.extend(parser.feed(text[start:start + size]))
+        return parser, events
+    
+    def test_events_emitted_as_values_complete(self):
+        """Test that fields and questions are returned as soon as they are complete, whatever the chunking"""
+        
+        text = json.dumps(QUIZ, indent=2)
+        
+        for size in (1, 7, len(text)):
+            parser, events = self.feed_in_pieces(text, size)
+            
+            self.assertEqual(events, [
+                ('field', ('title', QUIZ['title'])),
+                ('field', ('description', QUIZ['description'])),
+                *[('question', question) for question in QUIZ['questions']],
+            ])
+            self.assertEqual(parser.finish(), QUIZ)
+    
+    def test_question_not_emitted_before_it_is_complete(self):
+        """Test that a partially streamed question is held back until its closing brace arrives"""
+        
+        text = json.dumps(QUIZ)
+        cut = text.index('Question 1') + 3
+        parser = QuizStreamParser()
+        
+        first_events = parser.feed(text[:cut])
+        rest_events = parser.feed(text[cut:])
+        
+        self.assertEqual([event for event, _ in first_events].count('question'), 1)
+        self.assertEqual([event for event, _ in rest_events].count('question'), 2)
+    
+    def test_markdown_fence_ignored(self):
+        """Test that a ```json fence around the object is skipped"""
+        
+        parser = QuizStreamParser()
+        parser.feed('```json\n' + json.dumps(QUIZ) + '\n```')
+        
+        self.assertEqual(parser.finish(), QUIZ)
+    
+    def test_incomplete_stream(self):
+        """Test that finish() fails when the stream ended in the middle of the object"""
+        
+        parser = QuizStreamParser()
+        parser.feed(json.dumps(QUIZ)[:-20])
+        
+        with self.assertRaises(ValueError):
+            parser.finish()
+
+
+class ServerSentEventTests(SimpleTestCase):
+    """Tests for the Server-Sent Event framing"""
+    
+    def test_format_sse(self):
+        """Test the Server-Sent Event framing"""
+        
+        self.assertEqual(format_sse('question', {'a': 1}), 'event: question\ndata: {"a": 1}\n\n')
@@ -0,0 +1,163 @@
+from django.urls import reverse
+from django.test import override_settings
+from django.utils import timezone
+from django.contrib.auth.models import User
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+import os
+import json
+import time
+import shutil
+import tempfile
+
+from datetime import timedelta
+
+from unittest.mock import patch
+from quizzes_app.api.throttling import shard_index
+
+
+class QuizRateLimitTests(APITestCase):
+    """Tests for the per-user token bucket and daily quota on quiz creation"""
+
+    def setUp(self):
+        """Enable the rate limit with its shard files in a temporary directory"""
+
+        self.tempdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tempdir, ignore_errors=True)
+
+        rate_limit_settings = override_settings(
+            QUIZ_RATE_LIMIT=True,
+            QUIZ_RATE_LIMIT_BURST=2,
+            QUIZ_RATE_LIMIT_REFILL_SECONDS=60,
+            QUIZ_DAILY_QUOTA=3,
+            QUIZ_RATE_LIMIT_LOCK_DIR=self.tempdir,
+            QUIZ_QUEUE_MAX_PENDING_PER_USER=10,
+        )
+        rate_limit_settings.enable()
+        self.addCleanup(rate_limit_settings.disable)
+
+        validate_patcher = patch('quizzes_app.api.serializers.validate_youtube_url', return_value=True)
+        validate_patcher.start()
+        self.addCleanup(validate_patcher.stop)
+
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('quizzes')
+        self.data = {'url': 'https://www.youtube.com/watch?v=dQw4w9WgXcQ'}
+
+    def test_headers_show_remaining_budget(self):
+        """Test that accepted requests report the remaining tokens and quota"""
+
+        response = self.client.post(self.url, self.data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response['X-RateLimit-Limit'], '2')
+        self.assertEqual(response['X-RateLimit-Remaining'], '1')
+        self.assertEqual(response['X-RateLimit-Reset'], '60')
+        self.assertEqual(response['X-Quota-Limit'], '3')
+        self.assertEqual(response['X-Quota-Remaining'], '2')
+
+    def test_burst_exhausted(self):
+        """Test that requests beyond the burst get 429 until a token has refilled"""
+
+        for _ in range(2):
+            self.assertEqual(self.client.post(self.url, self.data, format='json').status_code, status.HTTP_202_ACCEPTED)
+
+        response = self.client.post(self.url, self.data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response['X-RateLimit-Remaining'], '0')
+        self.assertLessEqual(int(response['Retry-After']), 60)
+
+        with patch('quizzes_app.api.throttling.time.time', return_value=time.time() + 61):
+            response = self.client.post(self.url, self.data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+
+    def test_daily_quota_exhausted(self):
+        """Test that the daily quota is enforced even when the bucket has tokens"""
+
+        with override_settings(QUIZ_RATE_LIMIT_BURST=10):
+            for _ in range(3):
+                self.assertEqual(self.client.post(self.url, self.data, format='json').status_code, status.HTTP_202_ACCEPTED)
+
+            response = self.client.post(self.url, self.data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response['X-Quota-Remaining'], '0')
+        self.assertLessEqual(int(response['Retry-After']), 86400)
+
+    def test_failed_request_refunds_quota(self):
+        """Test that a rejected quiz uses up neither a bucket token nor the daily quota"""
+
+        response = self.client.post(self.url, {'url': ''}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response['X-RateLimit-Remaining'], '2')
+        self.assertEqual(response['X-Quota-Remaining'], '3')
+
+        response = self.client.post(self.url, self.data, format='json')
+        self.assertEqual(response['X-RateLimit-Remaining'], '1')
+        self.assertEqual(response['X-Quota-Remaining'], '2')
+
+    def test_failed_requests_do_not_exhaust_burst(self):
+        """Test that a burst of rejected requests leaves the tokens for valid ones"""
+
+        for _ in range(3):
+            self.assertEqual(self.client.post(self.url, {'url': ''}, format='json').status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(self.url, self.data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+
+    def test_users_limited_separately(self):
+        """Test that one user's requests do not use up another user's budget"""
+
+        for _ in range(2):
+            self.client.post(self.url, self.data, format='json')
+
+        other = User.objects.create_user(username='otheruser', password='testpass123')
+        self.client.force_authenticate(user=other)
+
+        response = self.client.post(self.url, self.data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+
+    def test_list_not_limited(self):
+        """Test that listing quizzes is not rate limited"""
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('X-RateLimit-Limit', response)
+
+    @override_settings(QUIZ_RATE_LIMIT=False)
+    def test_disabled(self):
+        """Test that quiz creation is not limited when the rate limit is off"""
+
+        response = self.client.post(self.url, self.data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertNotIn('X-RateLimit-Limit', response)
+
+    def test_idle_records_dropped(self):
+        """Test that a shard file only keeps users whose bucket is refilling or who used quota today"""
+
+        self.client.post(self.url, self.data, format='json')
+        path = os.path.join(self.tempdir, f'shard-{shard_index(self.user.id)}.json')
+
+        with open(path) as handle:
+            self.assertIn(str(self.user.id), json.load(handle))
+
+        tomorrow = timezone.now() + timedelta(days=1)
+        other = User.objects.create_user(username='otheruser', password='testpass123')
+        with patch('quizzes_app.api.throttling.time.time', return_value=time.time() + 86400), \
+                patch('quizzes_app.api.throttling.timezone.now', return_value=tomorrow), \
+                patch('quizzes_app.api.throttling.shard_index', return_value=shard_index(self.user.id)):
+            self.client.force_authenticate(user=other)
+            self.client.post(self.url, {'url': ''}, format='json')
+
+        with open(path) as handle:
+            self.assertEqual(json.load(handle), {})
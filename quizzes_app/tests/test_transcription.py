@@ -0,0 +1,110 @@
+from django.test import SimpleTestCase, override_settings
+
+import numpy as np
+
+from unittest.mock import patch, MagicMock
+from concurrent.futures import ThreadPoolExecutor
+from quizzes_app.api.transcription import (
+    SAMPLE_RATE,
+    find_split_points,
+    split_audio,
+    merge_transcripts,
+    transcribe_chunked,
+    get_chunk_pool,
+    reset_chunk_pool,
+)
+
+
+def speech_with_pauses(segment_seconds: list[float], pause_seconds: float = 0.5) -> np.ndarray:
+    """Build noise segments ("speech") separated by silent pauses"""
+    
+    rng = np.random.default_rng(0)
+    parts = []
+    for seconds in segment_seconds:
+        parts.append(rng.normal(0, 0.3, int(seconds * SAMPLE_RATE)).astype(np.float32))
+        parts.append(np.zeros(int(pause_seconds * SAMPLE_RATE), dtype=np.float32))
+    return np.concatenate(parts)
+
+
+class ChunkedTranscriptionTests(SimpleTestCase):
+    """Tests for splitting long audio on silence and stitching the chunk transcripts"""
+    
+    def test_split_points_fall_into_pauses(self):
+        """Test that chunks are cut inside the pause closest to the target chunk length"""
+        
+        samples = speech_with_pauses([55, 57, 62, 50])
+        
+        split_points = find_split_points(samples, chunk_seconds=60, search_seconds=8)
+        
+        self.assertEqual(len(split_points), 3)
+        for point in split_points:
+            self.assertEqual(samples[point], 0.0)
+    
+    def test_chunks_overlap(self):
+        """Test that each chunk extends into the following one by the overlap"""
+        
+        samples = speech_with_pauses([55, 57, 62])
+        
+        chunks = split_audio(samples, chunk_seconds=60, overlap_seconds=2)
+        
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(sum(len(chunk) for chunk in chunks), len(samples) + 2 * 2 * SAMPLE_RATE)
+    
+    def test_merge_drops_overlapping_words(self):
+        """Test that words repeated at chunk boundaries appear only once"""
+        
+        texts = ['Hello world, this is a test of the', 'Of the chunking system. It works', 'it works well.']
+        
+        self.assertEqual(merge_transcripts(texts), 'Hello world, this is a test of the chunking system. It works well.')
+    
+    def test_merge_keeps_text_without_overlap(self):
+        """Test that chunks without shared words are simply joined"""
+        
+        self.assertEqual(merge_transcripts(['First part.', 'Second part.']), 'First part. Second part.')
+    
+    @override_settings(WHISPER_CHUNK_SECONDS=60, WHISPER_CHUNK_OVERLAP_SECONDS=1)
+    @patch('quizzes_app.api.transcription.get_whisper_model')
+    
+    def test_transcribe_chunked(self, mock_get_model):
+        """Test that every chunk is transcribed and the texts are stitched in order"""
+        
+        model = MagicMock()
+        model.transcribe.side_effect = [{'text': ' one two'}, {'text': ' two three'}, {'text': ' four'}]
+        mock_get_model.return_value = model
+        samples = speech_with_pauses([55, 57, 62])
+        
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            transcript = transcribe_chunked(samples, 'base', executor=executor)
+        
+        self.assertEqual(transcript, 'one two three four')
+        self.assertEqual(model.transcribe.call_count, 3)
+    
+    @override_settings(WHISPER_CHUNKED=True, WHISPER_CHUNK_MIN_DURATION=60)
+    @patch('quizzes_app.api.utils.transcribe_chunked')
+    @patch('quizzes_app.api.utils.get_whisper_model')
+    
+    def test_transcribe_audio_uses_chunks_for_long_audio(self, mock_get_model, mock_transcribe_chunked):
+        """Test that only audio above WHISPER_CHUNK_MIN_DURATION is transcribed in chunks"""
+        
+        from quizzes_app.api.utils import transcribe_audio
+        
+        mock_get_model.return_value.transcribe.return_value = {'text': 'short'}
+        mock_transcribe_chunked.return_value = 'long'
+        
+        self.assertEqual(transcribe_audio(np.zeros(30 * SAMPLE_RATE, dtype=np.float32)), 'short')
+        self.assertEqual(transcribe_audio(np.zeros(90 * SAMPLE_RATE, dtype=np.float32)), 'long')
+    
+    @override_settings(WHISPER_CHUNK_WORKERS=4, TRANSCRIPTION_TORCH_THREADS=2)
+    @patch('quizzes_app.api.transcription.ProcessPoolExecutor')
+    
+    def test_chunk_pool_shares_slot_cores(self, mock_pool):
+        """Test that the chunk pool of a transcription does not use more cores than its slot"""
+        
+        reset_chunk_pool()
+        self.addCleanup(reset_chunk_pool)
+        
+        get_chunk_pool()
+        
+        _, kwargs = mock_pool.call_args
+        self.assertEqual(kwargs['max_workers'], 2)
+        self.assertEqual(kwargs['initargs'][1], 1)
@@ -0,0 +1,55 @@
+from django.test import SimpleTestCase
+
+from torch import nn
+from unittest.mock import patch
+from quizzes_app.api.whisper_models import WhisperModelRegistry, model_memory_bytes
+
+
+class WhisperModelRegistryTests(SimpleTestCase):
+    """Tests for the process-wide Whisper model cache"""
+    
+    def setUp(self):
+        """Set up fake models of known size instead of real Whisper weights"""
+        
+        self.fake_models = {
+            'tiny': nn.Linear(10, 10),
+            'base': nn.Linear(20, 20),
+            'small': nn.Linear(30, 30),
+        }
+        self.model_size = model_memory_bytes(self.fake_models['small'])
+        
+        patcher = patch('quizzes_app.api.whisper_models.whisper.load_model', side_effect=lambda name: self.fake_models[name])
+        self.mock_load_model = patcher.start()
+        self.addCleanup(patcher.stop)
+    
+    def test_model_loaded_once(self):
+        """Test that repeated lookups reuse the resident model"""
+        
+        registry = WhisperModelRegistry(max_bytes=10 * self.model_size)
+        
+        first = registry.get('base')
+        second = registry.get('base')
+        
+        self.assertIs(first, second)
+        self.mock_load_model.assert_called_once_with('base')
+    
+    def test_least_recently_used_model_evicted(self):
+        """Test that the least recently used model is evicted above the memory cap"""
+        
+        registry = WhisperModelRegistry(max_bytes=self.model_size + model_memory_bytes(self.fake_models['tiny']))
+        
+        registry.get('tiny')
+        registry.get('base')
+        registry.get('tiny')
+        registry.get('small')
+        
+        self.assertEqual(registry.loaded(), ['tiny', 'small'])
+    
+    def test_model_larger_than_cap_stays_resident(self):
+        """Test that a single model above the cap is still kept"""
+        
+        registry = WhisperModelRegistry(max_bytes=1)
+        
+        registry.preload(['tiny', 'base'])
+        
+        self.assertEqual(registry.loaded(), ['base'])
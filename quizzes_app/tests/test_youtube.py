@@ -0,0 +1,51 @@
+from django.test import SimpleTestCase
+
+from quizzes_app.api.youtube import parse_youtube_url, VideoRef
+
+
+class ParseYouTubeUrlTests(SimpleTestCase):
+    """Tests for normalising YouTube URLs into a VideoRef"""
+    
+    def test_url_variants_resolve_to_same_video(self):
+        """Test that watch, youtu.be, embed and shorts URLs yield the same video ID"""
+        
+        urls = [
+            'https://www.youtube.com/watch?v=dQw4w9WgXcQ',
+            'https://youtube.com/watch?feature=share&v=dQw4w9WgXcQ',
+            'youtube.com/watch?v=dQw4w9WgXcQ',
+            'https://m.youtube.com/watch?v=dQw4w9WgXcQ',
+            'https://youtu.be/dQw4w9WgXcQ',
+            'https://www.youtube.com/embed/dQw4w9WgXcQ',
+            'https://www.youtube.com/shorts/dQw4w9WgXcQ',
+        ]
+        
+        for url in urls:
+            with self.subTest(url=url):
+                video_ref = parse_youtube_url(url)
+                self.assertEqual(video_ref.video_id, 'dQw4w9WgXcQ')
+                self.assertEqual(video_ref.canonical_url, 'https://www.youtube.com/watch?v=dQw4w9WgXcQ')
+    
+    def test_start_offset(self):
+        """Test that t/start parameters are converted to seconds"""
+        
+        self.assertEqual(parse_youtube_url('https://www.youtube.com/watch?v=dQw4w9WgXcQ&t=30'), VideoRef('dQw4w9WgXcQ', 30))
+        self.assertEqual(parse_youtube_url('https://youtu.be/dQw4w9WgXcQ?t=1m30s').start_seconds, 90)
+        self.assertEqual(parse_youtube_url('https://www.youtube.com/embed/dQw4w9WgXcQ?start=45').start_seconds, 45)
+        self.assertEqual(parse_youtube_url('https://www.youtube.com/watch?v=dQw4w9WgXcQ#t=1h').start_seconds, 3600)
+    
+    def test_invalid_urls(self):
+        """Test that non-video and non-YouTube URLs are rejected"""
+        
+        urls = [
+            '',
+            'https://invalid-url.com',
+            'https://vimeo.com/watch?v=dQw4w9WgXcQ',
+            'https://www.youtube.com/watch',
+            'https://www.youtube.com/watch?v=short',
+            'https://www.youtube.com/channel/dQw4w9WgXcQ',
+            'ftp://youtube.com/watch?v=dQw4w9WgXcQ',
+        ]
+        
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertIsNone(parse_youtube_url(url))
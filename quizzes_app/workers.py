@@ -0,0 +1,39 @@
+import django
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+def quiz_worker_main(poll_interval: float, metrics_port: int | None = None) -> None:
+    """
+    Entry point of a quiz generation worker process.
+    Kept free of model imports so it can be started with the 'spawn' method before Django is set up.
+    """
+
+    django.setup()
+
+    from django.conf import settings
+    from quizzes_app.api.jobs import run_worker
+    from quizzes_app.api.metrics import start_metrics_server
+    from quizzes_app.api.audio_cache import get_audio_cache
+    from quizzes_app.api.whisper_models import preload_whisper_models
+
+    if metrics_port:
+        try:
+            start_metrics_server(metrics_port)
+        except OSError as e:
+            logger.warning(f"Failed to serve metrics on port {metrics_port}: {str(e)}")
+
+    try:
+        get_audio_cache().sweep()
+    except OSError as e:
+        logger.warning(f"Failed to sweep partial audio downloads: {str(e)}")
+
+    if 'whisper' in settings.TRANSCRIPTION_BACKENDS:
+        try:
+            preload_whisper_models()
+        except Exception as e:
+            logger.warning(f"Failed to preload Whisper models, loading on first use instead: {str(e)}")
+
+    run_worker(poll_interval)